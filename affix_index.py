@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+定位精确前缀/后缀索引
+客户提供的大批量精确前缀/后缀列表（名字、日期、手机尾号等）只可能出现在固定位置，
+不需要子串扫描。条目按 (位置, 长度) 分组，每组的Base58字符串按位值编码成uint64，
+排序去重后打包存放；整批地址对每个不同长度只做一次向量化二分查找，每个候选地址的
+代价只取决于不同长度的个数，与列表大小无关。
+"""
+
+import argparse
+import time
+from typing import Dict, Optional
+
+import base58
+import numpy as np
+
+MAX_ENTRY_LENGTH = 10  # 58**10 < 2**64，超过此长度的条目无法打包（实际上也不可能找到）
+KINDS = ("prefix", "suffix")
+
+
+class AffixIndex:
+    """精确前缀/后缀索引
+
+    prefix条目匹配地址主体（去掉链前缀字符后）的开头 body[:k]，suffix条目匹配
+    结尾 body[-k:]。add() 收集条目，第一次查询前自动打包成排序的uint64数组，
+    每个条目只占8字节。
+    """
+
+    def __init__(self, alphabet: bytes = base58.alphabet):
+        self.alphabet = alphabet
+        self._base = len(alphabet)
+        self._lut = np.full(256, -1, dtype=np.int64)
+        self._lut[np.frombuffer(alphabet, dtype=np.uint8)] = np.arange(self._base)
+        self._pending: Dict[str, Dict[int, set]] = {kind: {} for kind in KINDS}
+        self._tables: Dict[str, Dict[int, np.ndarray]] = {kind: {} for kind in KINDS}
+
+    def _encode(self, text: str) -> int:
+        value = 0
+        for char in text.encode('ascii', 'replace'):
+            digit = int(self._lut[char])
+            if digit < 0:
+                raise ValueError(f"条目 {text!r} 含有字母表之外的字符")
+            value = value * self._base + digit
+        return value
+
+    def add(self, kind: str, text: str):
+        """添加一个精确前缀/后缀条目"""
+        if kind not in KINDS:
+            raise ValueError(f"未知的条目类型 {kind!r}，应为 prefix 或 suffix")
+        if not 0 < len(text) <= MAX_ENTRY_LENGTH:
+            raise ValueError(f"条目 {text!r} 的长度必须在1到{MAX_ENTRY_LENGTH}之间")
+        self._pending[kind].setdefault(len(text), set()).add(self._encode(text))
+
+    @classmethod
+    def from_file(cls, filename: str, default_kind: str = "suffix", **kwargs) -> 'AffixIndex':
+        """从文本文件加载：每行一个 prefix:XXX / suffix:XXX，不带类型的行按default_kind处理
+
+        空行和 # 开头的注释行忽略。
+        """
+        index = cls(**kwargs)
+        with open(filename, 'r', encoding='utf-8') as f:
+            for lineno, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                kind, sep, text = line.partition(':')
+                if not sep:
+                    kind, text = default_kind, line
+                try:
+                    index.add(kind.strip(), text.strip())
+                except ValueError as e:
+                    raise ValueError(f"{filename}:{lineno}: {e}") from None
+        index.freeze()
+        return index
+
+    def freeze(self):
+        """把新增条目合并进排序的打包数组"""
+        for kind in KINDS:
+            for length, values in self._pending[kind].items():
+                packed = np.fromiter(values, dtype=np.uint64, count=len(values))
+                old = self._tables[kind].get(length)
+                if old is not None:
+                    packed = np.concatenate([old, packed])
+                self._tables[kind][length] = np.unique(packed)
+            self._pending[kind] = {}
+
+    def __len__(self) -> int:
+        self.freeze()
+        return sum(table.size for tables in self._tables.values() for table in tables.values())
+
+    @property
+    def nbytes(self) -> int:
+        self.freeze()
+        return sum(table.nbytes for tables in self._tables.values() for table in tables.values())
+
+    def mask(self, matrix: np.ndarray) -> np.ndarray:
+        """(N, L) 地址主体字符矩阵中命中任一条目的行
+
+        同一位置的不同长度按长度升序增量编码：前缀 key(k) = key(k-1)*58 + d[k-1]，
+        后缀 key(k) = d[-k]*58^(k-1) + key(k-1)，每个字符只参与一次乘加。
+        """
+        self.freeze()
+        n, width = matrix.shape
+        hit = np.zeros(n, dtype=bool)
+        digits = self._lut[matrix]
+        invalid = digits < 0
+        for kind in KINDS:
+            keys = np.zeros(n, dtype=np.int64)
+            bad = np.zeros(n, dtype=bool)
+            done = 0
+            for length in sorted(self._tables[kind]):
+                if length > width:
+                    break
+                for k in range(done + 1, length + 1):
+                    if kind == "prefix":
+                        keys = keys * self._base + digits[:, k - 1]
+                        bad |= invalid[:, k - 1]
+                    else:
+                        keys = keys + digits[:, width - k] * self._base ** (k - 1)
+                        bad |= invalid[:, width - k]
+                done = length
+                table = self._tables[kind][length]
+                probe = np.where(bad, -1, keys).astype(np.uint64)  # -1 → 2**64-1，不可能在表中
+                pos = np.minimum(np.searchsorted(table, probe), table.size - 1)
+                hit |= table[pos] == probe
+        return hit
+
+    def match_batch(self, matrix: np.ndarray) -> np.ndarray:
+        """命中行的下标（升序）"""
+        return np.flatnonzero(self.mask(matrix))
+
+    def _contains(self, kind: str, text: str) -> bool:
+        table = self._tables[kind].get(len(text))
+        if table is None:
+            return False
+        try:
+            key = np.uint64(self._encode(text))
+        except ValueError:
+            return False
+        pos = int(np.searchsorted(table, key))
+        return pos < table.size and table[pos] == key
+
+    def match(self, body: str) -> Optional[str]:
+        """单个地址主体命中的最长条目，标签形如 prefix:XXX / suffix:XXX，未命中返回None"""
+        self.freeze()
+        best = None
+        for kind in KINDS:
+            for length in self._tables[kind]:
+                if length > len(body) or (best is not None and length <= len(best[1])):
+                    continue
+                text = body[:length] if kind == "prefix" else body[-length:]
+                if self._contains(kind, text):
+                    best = (kind, text)
+        return None if best is None else f"{best[0]}:{best[1]}"
+
+    def stats(self) -> Dict[str, Dict[int, int]]:
+        """各类型每个长度的条目数"""
+        self.freeze()
+        return {kind: {length: int(table.size) for length, table in sorted(self._tables[kind].items())}
+                for kind in KINDS}
+
+
+def main():
+    """索引统计与查询基准"""
+    parser = argparse.ArgumentParser(description='精确前缀/后缀索引')
+    parser.add_argument('patterns_file', help='条目文件（每行 prefix:XXX / suffix:XXX）')
+    parser.add_argument('--rows', type=int, default=100000, help='基准测试的随机地址数')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = AffixIndex.from_file(args.patterns_file)
+    build = time.perf_counter() - start
+    print(f"📇 {len(index):,} 个条目，打包 {index.nbytes / 1e6:.2f} MB，构建 {build:.2f}s")
+    for kind, lengths in index.stats().items():
+        if lengths:
+            print(f"  {kind}: " + ", ".join(f"{length}位 {count:,}" for length, count in lengths.items()))
+
+    rng = np.random.default_rng()
+    alphabet = np.frombuffer(index.alphabet, dtype=np.uint8)
+    matrix = alphabet[rng.integers(0, len(alphabet), size=(args.rows, 33))]
+    start = time.perf_counter()
+    hits = index.match_batch(matrix)
+    elapsed = time.perf_counter() - start
+    print(f"  {args.rows:,} 个随机地址: {elapsed / args.rows * 1e6:.3f}µs/地址，命中 {hits.size}")
+
+
+if __name__ == "__main__":
+    main()
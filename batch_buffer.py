@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预分配批次缓冲区
+私钥/seed和派生结果（TRX地址字符、onion公钥）保存在固定容量的uint8数组中，
+跨批次复用；大批次按容量分块填充，只有命中的行才复制成Python对象，
+因此峰值内存与 --batch-size 无关。
+"""
+
+import os
+from typing import Dict, List
+
+import numpy as np
+
+DEFAULT_BUFFER_ROWS = 4096
+
+
+class BatchBuffer:
+    """固定容量、跨批次复用的批次缓冲区
+
+    keys为 (capacity, key_size) 的私钥/seed矩阵，outputs为 (capacity, output_width)
+    的派生结果矩阵；两者都是bytearray上的NumPy视图，逐行写入时不产生新数组。
+    digest_width大于0时另有 (capacity, digest_width) 的digests矩阵保存派生的中间
+    摘要（如TRX的Keccak-256），供后续阶段整批处理。channels为附加的命名输出矩阵
+    {名称: 宽度}（如多链模式下各链的地址字符）。size为当前分块实际填充的行数。
+    """
+
+    def __init__(self, capacity: int = DEFAULT_BUFFER_ROWS, key_size: int = 32,
+                 output_width: int = 34, with_mnemonics: bool = False, digest_width: int = 0,
+                 channels: Dict[str, int] = None):
+        self.capacity = capacity
+        self.key_size = key_size
+        self.output_width = output_width
+        self.size = 0
+        self._keys = bytearray(capacity * key_size)
+        self._outputs = bytearray(capacity * output_width)
+        self.keys = np.frombuffer(self._keys, dtype=np.uint8).reshape(capacity, key_size)
+        self.outputs = np.frombuffer(self._outputs, dtype=np.uint8).reshape(capacity, output_width)
+        self.mnemonics: List[str] = [""] * capacity if with_mnemonics else None
+        self.digests = np.zeros((capacity, digest_width), dtype=np.uint8) if digest_width else None
+        self.channels = {name: np.zeros((capacity, width), dtype=np.uint8)
+                         for name, width in (channels or {}).items()}
+
+    def fill_random_keys(self, n: int, xp=None):
+        """填充前n行随机私钥（xp为CuPy时在GPU上生成后直接拷入缓冲区）"""
+        if n > self.capacity:
+            raise ValueError(f"分块大小 {n} 超过缓冲区容量 {self.capacity}")
+        self.size = n
+        if xp is not None:
+            xp.random.randint(0, 256, size=(n, self.key_size), dtype=xp.uint8).get(out=self.keys[:n])
+        else:
+            self._keys[:n * self.key_size] = os.urandom(n * self.key_size)
+
+    def key(self, row: int) -> bytes:
+        start = row * self.key_size
+        return bytes(self._keys[start:start + self.key_size])
+
+    def set_output(self, row: int, data: bytes):
+        start = row * self.output_width
+        self._outputs[start:start + self.output_width] = data
+
+    def output(self, row: int) -> bytes:
+        start = row * self.output_width
+        return bytes(self._outputs[start:start + self.output_width])
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """已填充行的派生结果矩阵（视图）"""
+        return self.outputs[:self.size]
+
+    def chunks(self, total: int):
+        """把total行拆成不超过容量的分块大小"""
+        while total > 0:
+            n = min(total, self.capacity)
+            yield n
+            total -= n
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量靓号模式匹配
+把一批等长地址表示为 (N, L) 的uint8字符矩阵，用NumPy一次性完成整批地址的
+连续字符、尾号、重复次数、子串、回文和字母表顺序检查，只返回命中的行下标
+"""
+
+import time
+from typing import Callable, List
+
+import numpy as np
+
+BASE58_ALPHABET = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+# 字符 -> Base58字母表下标；字母表外的字符取远离 0..57 的值，与任何字符的差都不会是±1
+_BASE58_INDEX = np.full(256, -1000, dtype=np.int16)
+_BASE58_INDEX[np.frombuffer(BASE58_ALPHABET, dtype=np.uint8)] = np.arange(len(BASE58_ALPHABET))
+
+
+def addresses_to_matrix(addresses: List[str]) -> np.ndarray:
+    """等长地址列表 -> (N, L) uint8字符矩阵"""
+    if not addresses:
+        return np.zeros((0, 0), dtype=np.uint8)
+    width = len(addresses[0])
+    blob = "".join(addresses).encode("ascii")
+    if len(blob) != width * len(addresses):
+        raise ValueError("批量匹配要求所有地址长度相同")
+    return np.frombuffer(blob, dtype=np.uint8).reshape(len(addresses), width)
+
+
+def _longest_true_runs(flags: np.ndarray) -> np.ndarray:
+    """布尔矩阵每行最长的连续True段长度（用np.diff找出各段的起止位置）"""
+    n, width = flags.shape
+    runs = np.zeros(n, dtype=np.int64)
+    padded = np.zeros((n, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = flags
+    edges = np.diff(padded, axis=1)
+    start_rows, start_cols = np.nonzero(edges == 1)
+    _, end_cols = np.nonzero(edges == -1)
+    # 行优先遍历，每个起点与同序号的终点成对
+    np.maximum.at(runs, start_rows, end_cols - start_cols)
+    return runs
+
+
+def max_run_lengths(matrix: np.ndarray) -> np.ndarray:
+    """每行最长连续相同字符的长度"""
+    if matrix.shape[1] == 0:
+        return np.zeros(matrix.shape[0], dtype=np.int64)
+    return _longest_true_runs(matrix[:, 1:] == matrix[:, :-1]) + 1
+
+
+def step_run_lengths(matrix: np.ndarray, step: int) -> np.ndarray:
+    """每行按Base58字母表顺序每步前进step的最长连续段长度（1为递增如 6789AB，-1为递减）"""
+    if matrix.shape[1] == 0:
+        return np.zeros(matrix.shape[0], dtype=np.int64)
+    index = _BASE58_INDEX[matrix]
+    return _longest_true_runs(index[:, 1:] - index[:, :-1] == step) + 1
+
+
+def trailing_run_lengths(matrix: np.ndarray) -> np.ndarray:
+    """每行末尾连续相同字符的长度"""
+    if matrix.shape[1] == 0:
+        return np.zeros(matrix.shape[0], dtype=np.int64)
+    same = matrix == matrix[:, -1:]
+    return np.cumprod(same[:, ::-1], axis=1).sum(axis=1)
+
+
+def has_run_mask(matrix: np.ndarray, count: int, runs: np.ndarray = None) -> np.ndarray:
+    """consecutive_N：任意位置存在N个连续相同字符"""
+    if count <= 0 or matrix.shape[1] == 0:
+        return np.zeros(matrix.shape[0], dtype=bool)
+    if runs is None:
+        runs = max_run_lengths(matrix)
+    return runs >= count
+
+
+def tail_run_mask(matrix: np.ndarray, count: int) -> np.ndarray:
+    """ends_consecutive_N：末尾N个字符相同"""
+    if count <= 0 or count > matrix.shape[1]:
+        return np.zeros(matrix.shape[0], dtype=bool)
+    return np.all(matrix[:, -count:] == matrix[:, -1:], axis=1)
+
+
+def char_counts(matrix: np.ndarray, char: str) -> np.ndarray:
+    """每行中字符char出现的次数（非单字节字符在ASCII地址中出现0次）"""
+    encoded = char.encode("utf-8")
+    if len(encoded) != 1:
+        return np.zeros(matrix.shape[0], dtype=np.int64)
+    return np.count_nonzero(matrix == encoded[0], axis=1)
+
+
+def contains_mask(matrix: np.ndarray, needle: str) -> np.ndarray:
+    """每行是否包含子串needle"""
+    n, width = matrix.shape
+    encoded = needle.encode("utf-8")
+    k = len(encoded)
+    if k == 0:
+        return np.ones(n, dtype=bool)
+    if k > width:
+        return np.zeros(n, dtype=bool)
+    windows = width - k + 1
+    mask = matrix[:, :windows] == encoded[0]
+    for j in range(1, k):
+        mask &= matrix[:, j:j + windows] == encoded[j]
+    return mask.any(axis=1)
+
+
+def palindrome_mask(matrix: np.ndarray, count: int) -> np.ndarray:
+    """palindrome_N：存在长度不小于N的回文段
+
+    长度m≥N的回文两端各去掉 (m-N)//2 个字符后仍是回文，长度为N或N+1，
+    所以只需检查这两种长度的窗口，每种长度做 长度//2 次整列比较。
+    """
+    n, width = matrix.shape
+    if count <= 1:
+        return np.full(n, width >= count, dtype=bool)
+    mask = np.zeros(n, dtype=bool)
+    for k in (count, count + 1):
+        windows = width - k + 1
+        if windows <= 0:
+            continue
+        hit = np.ones((n, windows), dtype=bool)
+        for j in range(k // 2):
+            hit &= matrix[:, j:j + windows] == matrix[:, k - 1 - j:k - 1 - j + windows]
+        mask |= hit.any(axis=1)
+    return mask
+
+
+class _BatchContext:
+    """单个批次的共享中间结果（最长连续段只计算一次）"""
+
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = matrix
+        self._runs = None
+
+    @property
+    def runs(self) -> np.ndarray:
+        if self._runs is None:
+            self._runs = max_run_lengths(self.matrix)
+        return self._runs
+
+
+class BatchPatternMatcher:
+    """按TRX靓号模式语法整批匹配（语义与 TRXVanityGenerator._matches_pattern 一致）
+
+    第一个批次对所有模式计时并统计命中率，之后按 耗时/命中率 升序在逐步缩小
+    的未命中行集合上求值。
+    """
+
+    def __init__(self, patterns: List[str], sample_batches: int = 1):
+        self.patterns = list(patterns)
+        self._checks = [self._compile(p) for p in self.patterns]
+        self.order = list(range(len(self.patterns)))
+        self._sample_batches = sample_batches if len(self.patterns) > 1 else 0
+        self._sampled_batches = 0
+        self._samples = 0
+        self._times = [0.0] * len(self.patterns)
+        self._hits = [0] * len(self.patterns)
+
+    @staticmethod
+    def _compile(pattern: str) -> Callable[[_BatchContext, np.ndarray], np.ndarray]:
+        """把单个模式编译成 (ctx, rows) -> bool掩码 的检查函数"""
+        if pattern.startswith('ends_consecutive_'):
+            count = int(pattern.split('_')[-1])
+            return lambda ctx, rows: tail_run_mask(ctx.matrix[rows], count)
+        if pattern.startswith('consecutive_'):
+            count = int(pattern.split('_')[1])
+            return lambda ctx, rows: has_run_mask(ctx.matrix[rows], count, ctx.runs[rows])
+        if pattern.startswith('repeat_'):
+            digit = pattern.split('_')[1]
+            count = int(pattern.split('_')[2])
+            return lambda ctx, rows: char_counts(ctx.matrix[rows], digit) >= count
+        if pattern.startswith('palindrome_'):
+            count = int(pattern.split('_')[1])
+            return lambda ctx, rows: palindrome_mask(ctx.matrix[rows], count)
+        if pattern.startswith(('ascending_', 'descending_')):
+            step = 1 if pattern.startswith('ascending_') else -1
+            count = int(pattern.split('_')[1])
+            return lambda ctx, rows: step_run_lengths(ctx.matrix[rows], step) >= count
+        if pattern.startswith('custom_'):
+            custom = pattern.split('_', 1)[1]
+            return lambda ctx, rows: contains_mask(ctx.matrix[rows], custom)
+        return lambda ctx, rows: contains_mask(ctx.matrix[rows], pattern)
+
+    def pattern_mask(self, matrix: np.ndarray, pattern_index: int) -> np.ndarray:
+        """单个模式在整批上的命中掩码"""
+        ctx = _BatchContext(matrix)
+        return self._checks[pattern_index](ctx, np.arange(matrix.shape[0]))
+
+    def match_batch(self, matrix: np.ndarray) -> np.ndarray:
+        """返回命中任一模式的行下标（升序）"""
+        ctx = _BatchContext(matrix)
+        rows = np.arange(matrix.shape[0])
+        if self._sampled_batches < self._sample_batches:
+            return self._sample(ctx, rows)
+        hits = []
+        for idx in self.order:
+            if rows.size == 0:
+                break
+            mask = self._checks[idx](ctx, rows)
+            hits.append(rows[mask])
+            rows = rows[~mask]
+        if not hits:
+            return rows[:0]
+        return np.sort(np.concatenate(hits))
+
+    def _sample(self, ctx: _BatchContext, rows: np.ndarray) -> np.ndarray:
+        """对所有模式在整批上计时求值，用于估计代价与命中率"""
+        any_hit = np.zeros(rows.size, dtype=bool)
+        perf = time.perf_counter
+        for idx, check in enumerate(self._checks):
+            start = perf()
+            mask = check(ctx, rows)
+            self._times[idx] += perf() - start
+            self._hits[idx] += int(np.count_nonzero(mask))
+            any_hit |= mask
+        self._samples += rows.size
+        self._sampled_batches += 1
+        if self._sampled_batches >= self._sample_batches:
+            self.order = sorted(range(len(self.patterns)), key=lambda i: self._cost(i) / self._hit_rate(i))
+        return rows[any_hit]
+
+    def _cost(self, idx: int) -> float:
+        return self._times[idx] / self._samples if self._samples else 0.0
+
+    def _hit_rate(self, idx: int) -> float:
+        return (self._hits[idx] + 1) / (self._samples + 2)
+
+    def expected_cost(self) -> float:
+        """当前求值顺序下每个地址的期望耗时（秒）"""
+        cost = 0.0
+        miss = 1.0
+        for idx in self.order:
+            cost += miss * self._cost(idx)
+            miss *= 1.0 - self._hit_rate(idx)
+        return cost
+
+    def plan_stats(self) -> dict:
+        """当前求值计划（用于统计信息输出）"""
+        return {
+            'adaptive': self._samples > 0 and self._sampled_batches >= self._sample_batches,
+            'samples': self._samples,
+            'expected_cost_us': round(self.expected_cost() * 1e6, 3),
+            'order': [
+                {
+                    'pattern': self.patterns[idx],
+                    'hit_rate': round(self._hit_rate(idx), 6),
+                    'cost_us': round(self._cost(idx) * 1e6, 3),
+                }
+                for idx in self.order
+            ],
+        }
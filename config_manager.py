@@ -5,8 +5,26 @@ TRX靓号生成器配置管理器
 """
 
 import json
+import multiprocessing
 import os
-from typing import Dict, List, Any
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 搜索引擎按缓冲区容量（batch_buffer.DEFAULT_BUFFER_ROWS=4096行）分块，更大的batch_size不会改变单块工作量
+CALIBRATION_BATCH_SIZES = [512, 1024, 2048, 4096]
+CALIBRATION_PATTERNS = {
+    "trx": ['consecutive_3', 'consecutive_4', 'repeat_8_3', 'repeat_9_3'],
+    "onion": ['consecutive_4'],
+}
 
 class ConfigManager:
     """配置管理器"""
@@ -45,10 +63,15 @@ class ConfigManager:
                 "use_gpu": True,
                 "save_results": True
             },
+            "secondary_patterns": {
+                "consecutive_5": "连续5个相同字符（备货）",
+                "ends_consecutive_4": "尾号连续4个相同字符（备货）",
+                "repeat_8_6": "包含至少6个数字8（备货）"
+            },
             "advanced_patterns": {
-                "palindrome": "回文数字",
-                "ascending": "递增数字",
-                "descending": "递减数字"
+                "palindrome_7": "包含长度至少7的回文段",
+                "ascending_5": "按Base58字母表顺序连续递增5个字符（如6789A）",
+                "descending_5": "按Base58字母表顺序连续递减5个字符（如edcba）"
             }
         }
     
@@ -85,9 +108,78 @@ class ConfigManager:
         else:
             print(f"❌ 模式 {pattern} 不存在")
     
+    def get_secondary_patterns(self) -> Dict[str, str]:
+        """获取次级模式（搜索时顺带收集写入库存）"""
+        return self.config.get("secondary_patterns", {})
+
     def get_default_settings(self) -> Dict[str, Any]:
         """获取默认设置"""
         return self.config.get("default_settings", {})
+
+    def get_host_profile(self, generator: str = "trx", hostname: str = None) -> Dict[str, Any]:
+        """获取本机（或指定主机）针对某个生成器的校准配置，没有则返回空字典"""
+        hostname = hostname or socket.gethostname()
+        return self.config.get("host_profiles", {}).get(hostname, {}).get(generator, {})
+
+    def get_effective_settings(self, generator: str = "trx") -> Dict[str, Any]:
+        """默认设置叠加本机校准配置"""
+        settings = dict(self.get_default_settings())
+        profile = self.get_host_profile(generator)
+        settings.update({k: profile[k] for k in ("batch_size", "processes", "use_gpu") if k in profile})
+        return settings
+
+    def get_default_processes(self, generator: str = "trx") -> int:
+        """本机校准的共享内存生产进程数（0表示主进程自己生成最快）"""
+        return int(self.get_effective_settings(generator).get("processes", 0))
+
+    def save_host_profile(self, generator: str, profile: Dict[str, Any], hostname: str = None):
+        """保存本机校准配置"""
+        hostname = hostname or socket.gethostname()
+        self.config.setdefault("host_profiles", {}).setdefault(hostname, {})[generator] = profile
+        self.save_config()
+
+    def calibrate(self, generator: str = "trx", duration: float = 3.0,
+                  batch_sizes: List[int] = None, process_counts: List[int] = None) -> Dict[str, Any]:
+        """在本机上用真实搜索引擎扫描后端、分块大小和生产进程数，测量持续吞吐量和峰值内存
+
+        先在单进程模式（processes=0）下为每个后端扫描分块大小，再用最佳分块大小
+        扫描共享内存生产进程数。吞吐量在最佳值2%以内的组合中选峰值内存最小的一个，写入本机配置。
+        """
+        from batch_buffer import DEFAULT_BUFFER_ROWS
+        batch_sizes = sorted({min(b, DEFAULT_BUFFER_ROWS) for b in batch_sizes or CALIBRATION_BATCH_SIZES})
+        cpus = os.cpu_count() or 1
+        process_counts = process_counts or sorted({0, 1, max(1, cpus // 2), cpus})
+        backends = ["cpu"]
+        try:
+            import cupy
+            cupy.cuda.Device(0)
+            backends.append("gpu")
+        except Exception:
+            pass
+
+        print(f"🔧 校准 {generator} 生成器 (主机: {socket.gethostname()}, CPU: {cpus}, 后端: {backends})")
+        results = []
+        for backend in backends:
+            for batch_size in batch_sizes:
+                results.append(_measure(generator, backend, batch_size, 0, duration))
+            best_batch = _best_result(results, backend)["batch_size"]
+            for processes in process_counts:
+                if processes > 0:
+                    results.append(_measure(generator, backend, best_batch, processes, duration))
+
+        best = _best_result(results)
+        profile = {
+            "batch_size": best["batch_size"],
+            "processes": best["processes"],
+            "use_gpu": best["backend"] == "gpu",
+            "throughput": round(best["throughput"]),
+            "peak_rss_mb": best["peak_rss_mb"],
+            "calibrated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.save_host_profile(generator, profile)
+        print(f"✅ 最佳配置: 后端={best['backend']} batch_size={best['batch_size']} "
+              f"processes={best['processes']} ({best['throughput']:,.0f} 地址/秒, 峰值内存 {best['peak_rss_mb']}MB)")
+        return profile
     
     def update_default_settings(self, settings: Dict[str, Any]):
         """更新默认设置"""
@@ -106,7 +198,8 @@ class ConfigManager:
         
         print(f"\n总计: {len(patterns)} 个模式")
     
-    def validate_pattern(self, pattern: str) -> bool:
+    @staticmethod
+    def validate_pattern(pattern: str) -> bool:
         """验证模式格式"""
         if pattern.startswith('ends_consecutive_'):
             try:
@@ -130,6 +223,18 @@ class ConfigManager:
                 return digit.isdigit() and 0 <= int(digit) <= 9 and 1 <= count <= 10
             except:
                 return False
+        elif pattern.startswith('palindrome_'):
+            try:
+                count = int(pattern.split('_')[1])
+                return 2 <= count <= 20
+            except:
+                return False
+        elif pattern.startswith(('ascending_', 'descending_')):
+            try:
+                count = int(pattern.split('_')[1])
+                return 2 <= count <= 10
+            except:
+                return False
         elif pattern.startswith('custom_'):
             return len(pattern.split('_')[1]) > 0
         else:
@@ -167,6 +272,154 @@ class ConfigManager:
         description = f"尾号连续{count}个相同字符"
         self.add_pattern(pattern, description)
 
+def _peak_rss_mb(who: int = None) -> float:
+    """当前进程（或已回收子进程中最大的一个）的峰值常驻内存（MB）"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF if who is None else who).ru_maxrss
+    # Linux以KB为单位，macOS以字节为单位
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def _calibration_run(conn, generator: str, backend: str, batch_size: int, processes: int, duration: float):
+    """单个校准组合（独立的spawn进程）：用search_iter实际搜索duration秒
+
+    从第一块地址完成后开始计时，不计入生产进程启动和首块预热；
+    结果 (地址数, 耗时, 主进程峰值内存MB, 生产进程峰值内存MB) 通过conn发回。
+    """
+    use_gpu = backend == "gpu"
+    stop = threading.Event()
+    if generator == "onion":
+        from onion_finder import OnionVanityGenerator
+        gen = OnionVanityGenerator(use_gpu=use_gpu, quiet=True)
+        hits = gen.search_iter(general_patterns=CALIBRATION_PATTERNS["onion"], max_addresses=None,
+                               batch_size=batch_size, processes=processes, stop=stop)
+    else:
+        from trx_vanity_address import TRXVanityGenerator
+        gen = TRXVanityGenerator(use_gpu=use_gpu, quiet=True)
+        hits = gen.search_iter(CALIBRATION_PATTERNS["trx"], max_addresses=None,
+                               batch_size=batch_size, processes=processes, stop=stop)
+    window = {}
+
+    def boundary(after: int) -> Tuple[float, int]:
+        # 统计在每块结束时更新：等到计数变化，让测量窗口落在分块边界上
+        while gen.stats['total_generated'] == after:
+            time.sleep(0.001)
+        return time.perf_counter(), gen.stats['total_generated']
+
+    def timer():
+        window["start"] = boundary(0)
+        time.sleep(duration)
+        window["end"] = boundary(gen.stats['total_generated'])
+        stop.set()
+
+    thread = threading.Thread(target=timer, daemon=True)
+    thread.start()
+    for _ in hits:
+        gen.found_addresses.clear()  # 只测吞吐量，不累积命中
+    thread.join()
+    (t0, n0), (t1, n1) = window["start"], window["end"]
+    children_rss = _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource is not None and processes else 0.0
+    conn.send((n1 - n0, t1 - t0, _peak_rss_mb(), children_rss))
+    conn.close()
+
+
+def _measure(generator: str, backend: str, batch_size: int, processes: int, duration: float) -> Dict[str, Any]:
+    """在全新的spawn进程中按给定分块大小和生产进程数测量，返回吞吐量和峰值内存
+
+    峰值内存按主进程加processes个生产进程估算（子进程只能取到其中最大的一个）。
+    """
+    ctx = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_calibration_run,
+                       args=(child_conn, generator, backend, batch_size, processes, duration))
+    proc.start()
+    child_conn.close()
+    try:
+        count, elapsed, main_rss, children_rss = parent_conn.recv()
+    finally:
+        proc.join()
+    result = {
+        "backend": backend,
+        "batch_size": batch_size,
+        "processes": processes,
+        "throughput": count / elapsed if elapsed > 0 else 0.0,
+        "peak_rss_mb": round(main_rss + children_rss * processes, 1),
+    }
+    print(f"  {backend:<4} batch_size={batch_size:<6} processes={processes:<3} "
+          f"{result['throughput']:>12,.0f} 地址/秒  峰值内存 {result['peak_rss_mb']}MB")
+    return result
+
+
+def _best_result(results: List[Dict[str, Any]], backend: str = None) -> Dict[str, Any]:
+    """吞吐量在最佳值2%以内的组合中取峰值内存最小的"""
+    candidates = [r for r in results if backend is None or r["backend"] == backend]
+    top = max(r["throughput"] for r in candidates)
+    close = [r for r in candidates if r["throughput"] >= top * 0.98]
+    return min(close, key=lambda r: (r["peak_rss_mb"], -r["throughput"]))
+
+
+class PatternWatcher:
+    """监视配置文件中的模式集合（mtime轮询）
+
+    poll() 每隔interval秒检查一次文件的修改时间和大小，内容变化且所有模式
+    都通过 validate_pattern 时返回新的 (patterns, secondary_patterns)；
+    文件无法解析或包含无效模式时整体拒绝本次修改并抛出ValueError，
+    调用方继续使用原模式。
+    """
+
+    def __init__(self, config_file: str = "config.json", interval: float = 1.0):
+        self.config_file = config_file
+        self.interval = interval
+        self._signature = self._stat()
+        self._next_check = time.monotonic() + interval
+        self._current = self._read()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.config_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read(self) -> Tuple[List[str], List[str]]:
+        """读取并校验模式集合"""
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            patterns = list(config.get("patterns", {}))
+            secondary = list(config.get("secondary_patterns", {}))
+        except (OSError, ValueError, AttributeError) as e:
+            raise ValueError(f"无法加载配置文件 {self.config_file}: {e}")
+        invalid = [p for p in patterns + secondary if not ConfigManager.validate_pattern(p)]
+        if invalid:
+            raise ValueError(f"配置文件中有无效模式: {invalid}")
+        if not patterns:
+            raise ValueError("配置文件中没有模式")
+        return patterns, secondary
+
+    @property
+    def current(self) -> Tuple[List[str], List[str]]:
+        """最近一次有效的 (patterns, secondary_patterns)"""
+        return self._current
+
+    def poll(self) -> Optional[Tuple[List[str], List[str]]]:
+        """模式集合发生有效变化时返回新集合，否则返回None"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return None
+        self._next_check = now + self.interval
+        signature = self._stat()
+        if signature == self._signature:
+            return None
+        self._signature = signature
+        loaded = self._read()
+        if loaded == self._current:
+            return None
+        self._current = loaded
+        return loaded
+
+
 def main():
     """配置管理器主函数"""
     import argparse
@@ -178,12 +431,18 @@ def main():
     parser.add_argument('--custom-repeat', nargs=2, metavar=('DIGIT', 'COUNT'), help='创建重复数字模式')
     parser.add_argument('--consecutive', type=int, metavar='COUNT', help='创建连续数字模式')
     parser.add_argument('--ends-consecutive', type=int, metavar='COUNT', help='创建尾号连续字符模式')
+    parser.add_argument('--calibrate', nargs='?', const='trx', choices=['trx', 'onion'],
+                        help='校准本机批次大小、进程数和后端，写入本机配置 (默认trx)')
+    parser.add_argument('--calibrate-duration', type=float, default=3.0,
+                        help='每个校准组合的测量时长（秒）')
     
     args = parser.parse_args()
     
     config = ConfigManager()
     
-    if args.list:
+    if args.calibrate:
+        config.calibrate(args.calibrate, duration=args.calibrate_duration)
+    elif args.list:
         config.list_patterns()
     elif args.add:
         pattern, description = args.add
@@ -214,6 +473,7 @@ def main():
         print("  python config_manager.py --custom-repeat DIGIT COUNT  # 创建重复数字模式")
         print("  python config_manager.py --consecutive COUNT       # 创建连续数字模式")
         print("  python config_manager.py --ends-consecutive COUNT    # 创建尾号连续字符模式")
+        print("  python config_manager.py --calibrate [trx|onion]   # 校准本机最佳批次大小/进程数/后端")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量匹配插件示例：地址最后6位全是数字
+python trx_vanity_address.py --plugin example_plugin.py --max-addresses 3
+"""
+
+import numpy as np
+
+NAME = "digit_tail_6"
+SCORE = 60
+TAIL = 6
+
+
+def match_matrix(matrix: np.ndarray) -> np.ndarray:
+    """(N, 34) 地址字符矩阵 → 布尔掩码（Base58中的数字为 1-9）"""
+    tail = matrix[:, -TAIL:]
+    return ((tail >= ord('1')) & (tail <= ord('9'))).all(axis=1)
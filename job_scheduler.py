@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨引擎任务调度器
+TRX与onion任务共用同一组工作进程，不再手工划分CPU核心。调度以分块为时间片：空闲的
+工作进程每次领取一个约quantum秒的分块（派生 + 整批匹配，见 vanity_engines.py），
+分块结束时重新选择任务，因此新到的紧急任务最多等待一个时间片就能抢占CPU。
+
+选择顺序：
+1. 优先级高的任务先运行（严格优先级：有更高优先级的任务未完成时，低优先级任务不运行）；
+2. 同一优先级内按CPU份额公平分配：虚拟时间 = 已用CPU时间 / 份额，选择虚拟时间最小的
+   任务；新任务从同级任务当前的最小虚拟时间开始，不会补偿性地独占CPU，便宜的加急单
+   不必排在长达数周的8字符搜索后面；虚拟时间相同时截止时间早的先运行。
+截止时间已过仍未完成的任务标记为 expired，保留已找到的结果并释放CPU。
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from batch_buffer import DEFAULT_BUFFER_ROWS
+from vanity_engines import ENGINES, new_engine
+
+DEFAULT_QUANTUM = 0.1  # 时间片目标长度（CPU秒）
+MIN_SLICE_ROWS = 256
+INITIAL_SLICE_ROWS = 1024  # 尚未测得引擎速度时的分块大小
+WORKER_JOB_CACHE = 16  # 每个工作进程缓存的任务状态（生成器、缓冲区、匹配器）数量
+JOB_FIELDS = ('id', 'engine', 'count', 'priority', 'deadline', 'share')
+
+
+@dataclass
+class Job:
+    """一个调度任务及其进度统计"""
+    job_id: str
+    engine: str
+    request: Dict
+    count: int = 1
+    priority: int = 0
+    deadline: Optional[float] = None  # 绝对时间（time.time()）
+    share: float = 1.0
+    status: str = "queued"  # queued / running / done / expired / cancelled
+    hits: List[Dict] = field(default_factory=list)
+    checked: int = 0
+    cpu_time: float = 0.0
+    slices: int = 0
+    vtime: float = 0.0
+    probability: Optional[float] = None
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def open(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def eta(self, now: float) -> Optional[float]:
+        """按估计命中概率和本任务实测速度估计的剩余秒数"""
+        if not self.open or not self.probability or not self.started or not self.checked:
+            return None
+        rate = self.checked / max(now - self.started, 1e-9)
+        return (self.count - len(self.hits)) / (rate * self.probability)
+
+    def progress(self, now: float = None) -> Dict:
+        now = now or time.time()
+        end = self.finished or now
+        return {
+            'id': self.job_id,
+            'engine': self.engine,
+            'status': self.status,
+            'priority': self.priority,
+            'share': self.share,
+            'found': len(self.hits),
+            'count': self.count,
+            'checked': self.checked,
+            'slices': self.slices,
+            'cpu_time': self.cpu_time,
+            'elapsed': end - self.submitted,
+            'wait': (self.started or end) - self.submitted,
+            'eta': self.eta(now),
+        }
+
+
+_worker_state = {'use_gpu': False, 'engines': {}, 'jobs': OrderedDict()}
+
+
+def _init_worker(use_gpu: bool):
+    """工作进程启动时导入并初始化各引擎，导入开销不计入任何任务的CPU时间"""
+    _worker_state['use_gpu'] = use_gpu
+    for name in ENGINES:
+        if name not in _worker_state['engines']:
+            _worker_state['engines'][name] = new_engine(name, use_gpu)
+
+
+def _run_slice(job_id: str, engine_name: str, request: Dict, rows: int) -> tuple:
+    """运行一个时间片：派生rows行并整批匹配，返回 (任务ID, 命中, 行数, CPU秒)
+
+    生成器、缓冲区和编译好的匹配器按任务缓存在工作进程中，同一任务的后续时间片直接复用。
+    """
+    began = time.process_time()
+    engine = _worker_state['engines'][engine_name]
+    jobs = _worker_state['jobs']
+    state = jobs.pop(job_id, None)
+    if state is None:
+        state = (engine.new_generator(), engine.new_buffer(DEFAULT_BUFFER_ROWS), engine.compile(request))
+    jobs[job_id] = state
+    while len(jobs) > WORKER_JOB_CACHE:
+        jobs.popitem(last=False)
+    generator, buffer, compiled = state
+    generator.fill_buffer(buffer, rows)
+    hits = engine.hits(compiled, buffer, engine.prepare(buffer), np.zeros(rows, dtype=bool))
+    return job_id, [asdict(hit) for _, hit in hits], rows, time.process_time() - began
+
+
+class JobScheduler:
+    """按优先级、截止时间和CPU份额在TRX/onion任务之间分配时间片
+
+    processes为0时在调用线程中依次运行时间片（一个CPU），否则使用processes个工作进程。
+    submit()/cancel() 可以在 run() 运行期间从其他线程调用。
+    """
+
+    def __init__(self, processes: int = 0, quantum: float = DEFAULT_QUANTUM, use_gpu: bool = False):
+        self.processes = processes
+        self.quantum = quantum
+        self.use_gpu = use_gpu
+        self.jobs: Dict[str, Job] = {}
+        self._rates: Dict[str, float] = {}  # 各引擎每CPU秒派生的行数（滑动平均）
+        self._engines = {}
+        self._lock = threading.Lock()
+
+    def submit(self, job_id: str, engine: str, request: Dict, count: int = 1, priority: int = 0,
+               deadline: float = None, share: float = 1.0) -> Job:
+        """提交任务；deadline为绝对时间，请求无效时抛出ValueError"""
+        if engine not in ENGINES:
+            raise ValueError(f"任务 {job_id}: 未知的引擎 {engine!r}")
+        if count < 1 or share <= 0:
+            raise ValueError(f"任务 {job_id}: 数量至少为1，份额必须大于0")
+        adapter = self._engines.get(engine)
+        if adapter is None:
+            adapter = self._engines[engine] = new_engine(engine, self.use_gpu)
+        try:
+            adapter.compile(request)
+        except ValueError as e:
+            raise ValueError(f"任务 {job_id}: {e}") from None
+        with self._lock:
+            if job_id in self.jobs:
+                raise ValueError(f"任务 {job_id} 已存在")
+            peers = [job.vtime for job in self.jobs.values() if job.open and job.priority == priority]
+            job = Job(job_id, engine, dict(request), count, priority, deadline, share,
+                      vtime=min(peers, default=0.0), probability=adapter.probability(request))
+            self.jobs[job_id] = job
+        return job
+
+    def load(self, filename: str, now: float = None) -> List[Job]:
+        """从JSON文件加载任务：[{"id", "engine", "count", "priority", "deadline"(秒), "share", 请求字段...}]"""
+        now = now or time.time()
+        with open(filename, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        jobs = []
+        for entry in entries:
+            request = {key: value for key, value in entry.items() if key not in JOB_FIELDS}
+            deadline = entry.get('deadline')
+            jobs.append(self.submit(str(entry['id']), entry.get('engine', 'trx'), request,
+                                    int(entry.get('count', 1)), int(entry.get('priority', 0)),
+                                    now + float(deadline) if deadline is not None else None,
+                                    float(entry.get('share', 1.0))))
+        return jobs
+
+    def cancel(self, job_id: str):
+        with self._lock:
+            job = self.jobs[job_id]
+            if job.open:
+                job.status = "cancelled"
+                job.finished = time.time()
+
+    @property
+    def pending(self) -> bool:
+        with self._lock:
+            return any(job.open for job in self.jobs.values())
+
+    def progress(self) -> List[Dict]:
+        now = time.time()
+        with self._lock:
+            return [job.progress(now) for job in self.jobs.values()]
+
+    def _pick(self) -> Optional[Job]:
+        """选择下一个时间片的任务（调用方持有锁），顺便让过期任务结束"""
+        now = time.time()
+        candidates = []
+        for job in self.jobs.values():
+            if job.open and job.deadline is not None and now > job.deadline:
+                job.status = "expired"
+                job.finished = now
+            elif job.open:
+                candidates.append(job)
+        if not candidates:
+            return None
+        top = max(job.priority for job in candidates)
+        return min((job for job in candidates if job.priority == top),
+                   key=lambda job: (job.vtime, job.deadline if job.deadline is not None else float('inf'),
+                                    job.submitted))
+
+    def _dispatch(self) -> Optional[tuple]:
+        """领取一个时间片：(任务ID, 引擎, 请求, 行数)，没有可运行的任务时返回None"""
+        with self._lock:
+            job = self._pick()
+            if job is None:
+                return None
+            rate = self._rates.get(job.engine)
+            rows = INITIAL_SLICE_ROWS if rate is None else \
+                int(min(max(rate * self.quantum, MIN_SLICE_ROWS), DEFAULT_BUFFER_ROWS))
+            if job.started is None:
+                job.started = time.time()
+            job.status = "running"
+            # 预先计入一个时间片，避免多个空闲工作进程同时领取同一个任务；完成时按实际CPU时间修正
+            job.vtime += self.quantum / job.share
+            return job.job_id, job.engine, job.request, rows
+
+    def _complete(self, result: tuple):
+        job_id, hits, rows, cpu = result
+        with self._lock:
+            job = self.jobs[job_id]
+            job.slices += 1
+            job.checked += rows
+            job.cpu_time += cpu
+            job.vtime += (cpu - self.quantum) / job.share
+            if cpu > 0:
+                old = self._rates.get(job.engine)
+                self._rates[job.engine] = rows / cpu if old is None else 0.8 * old + 0.2 * rows / cpu
+            if job.open:
+                # 多个时间片并行时可能超额，只交付需要的数量
+                job.hits.extend(hits[:job.count - len(job.hits)])
+                if len(job.hits) >= job.count:
+                    job.status = "done"
+                    job.finished = time.time()
+
+    def run(self, stop: threading.Event = None, on_progress: Callable[[List[Dict]], None] = None,
+            report_interval: float = 2.0):
+        """运行到所有任务结束（或stop被设置）；on_progress每report_interval秒收到一次进度"""
+        last_report = time.time()
+
+        def report():
+            nonlocal last_report
+            if on_progress is not None and time.time() - last_report >= report_interval:
+                last_report = time.time()
+                on_progress(self.progress())
+
+        if self.processes <= 0:
+            _init_worker(self.use_gpu)
+            while stop is None or not stop.is_set():
+                task = self._dispatch()
+                if task is None:
+                    break
+                self._complete(_run_slice(*task))
+                report()
+            return
+
+        results = queue.Queue()
+        pool = multiprocessing.get_context("spawn").Pool(self.processes, initializer=_init_worker,
+                                                         initargs=(self.use_gpu,))
+        in_flight = 0
+        try:
+            while True:
+                while in_flight < self.processes and (stop is None or not stop.is_set()):
+                    task = self._dispatch()
+                    if task is None:
+                        break
+                    pool.apply_async(_run_slice, task, callback=results.put, error_callback=results.put)
+                    in_flight += 1
+                if in_flight == 0:
+                    break
+                result = results.get()
+                in_flight -= 1
+                if isinstance(result, BaseException):
+                    raise result
+                self._complete(result)
+                report()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def save_results(self, filename: str = None) -> str:
+        if filename is None:
+            filename = f"scheduled_jobs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with self._lock:
+            data = {
+                'timestamp': datetime.now().isoformat(),
+                'jobs': [{**job.progress(), 'request': job.request, 'results': job.hits}
+                         for job in self.jobs.values()],
+            }
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        return filename
+
+
+def _format_progress(rows: List[Dict]) -> str:
+    lines = [f"{'任务':<12}{'引擎':<7}{'状态':<10}{'优先级':>6}{'份额':>6}{'命中':>10}{'已检查':>12}"
+             f"{'CPU秒':>9}{'剩余':>10}"]
+    for row in rows:
+        eta = f"{row['eta']:.0f}s" if row['eta'] is not None else "--"
+        lines.append(f"{row['id']:<12}{row['engine']:<7}{row['status']:<10}{row['priority']:>6}{row['share']:>6g}"
+                     f"{row['found']:>5}/{row['count']:<4}{row['checked']:>12,}{row['cpu_time']:>9.1f}{eta:>10}")
+    return "\n".join(lines)
+
+
+def main():
+    """从任务文件调度TRX/onion任务"""
+    parser = argparse.ArgumentParser(description='TRX/onion靓号任务调度器（优先级、截止时间、CPU份额）')
+    parser.add_argument('jobs_file', help='任务文件（JSON列表）')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help='工作进程数')
+    parser.add_argument('--quantum', type=float, default=DEFAULT_QUANTUM, help='时间片长度（CPU秒）')
+    parser.add_argument('--no-gpu', action='store_true', help='禁用GPU')
+    parser.add_argument('--output', help='结果文件（默认 scheduled_jobs_时间戳.json）')
+    parser.add_argument('--quiet', action='store_true', help='静默模式')
+    args = parser.parse_args()
+
+    scheduler = JobScheduler(args.processes, args.quantum, not args.no_gpu)
+    try:
+        scheduler.load(args.jobs_file)
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(f"无法加载任务文件: {e}")
+    on_progress = None if args.quiet else (lambda rows: print(_format_progress(rows) + "\n"))
+    try:
+        scheduler.run(on_progress=on_progress)
+    except KeyboardInterrupt:
+        print("已中断，保存当前结果")
+    output = scheduler.save_results(args.output)
+    print(_format_progress(scheduler.progress()))
+    print(f"结果已保存到: {output}")
+
+
+if __name__ == "__main__":
+    main()
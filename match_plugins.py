@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量匹配插件
+consecutive_/repeat_/custom_ 语法表达不了的规则（如"不含易混淆字符"、"第20位之后全是数字"）
+写成插件模块，不必修改 _matches_pattern。插件每批只调用一次，拿到整批地址：
+
+    NAME = "digits_tail"        # 可选，命中标签为 plugin:NAME，默认为模块名
+    SCORE = 50                  # 可选，命中分数，默认10
+
+    def match_matrix(matrix):   # 原始字节版本：(N, 34) uint8 地址字符矩阵
+        return mask_or_indices
+
+    def match_batch(addresses): # 字符串版本：N个完整地址（含T前缀）
+        return indices
+
+两个函数都定义时使用 match_matrix。返回值可以是长度为N的布尔掩码或命中行的下标。
+插件有两种用法：匹配插件（--plugin）与模式、前缀/后缀索引并列，命中即交付；
+过滤插件（--plugin-filter）只对已命中的候选行调用，不满足的候选被丢弃。
+每个插件分别统计调用次数、地址数、命中数和耗时。
+"""
+
+import argparse
+import importlib
+import importlib.util
+import os
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+DEFAULT_PLUGIN_SCORE = 10
+
+
+class MatchPlugin:
+    """一个已加载的插件及其性能统计"""
+
+    def __init__(self, name: str, func, raw: bool, score: int = DEFAULT_PLUGIN_SCORE):
+        self.name = name
+        self.func = func
+        self.raw = raw
+        self.score = score
+        self.calls = 0
+        self.rows = 0
+        self.hits = 0
+        self.seconds = 0.0
+
+    @classmethod
+    def load(cls, spec: str) -> 'MatchPlugin':
+        """按文件路径（*.py）或模块名加载插件"""
+        try:
+            if spec.endswith('.py') or os.sep in spec:
+                name = os.path.splitext(os.path.basename(spec))[0]
+                module_spec = importlib.util.spec_from_file_location(f"vanity_plugin_{name}", spec)
+                if module_spec is None:
+                    raise ImportError(f"无法读取 {spec}")
+                module = importlib.util.module_from_spec(module_spec)
+                module_spec.loader.exec_module(module)
+            else:
+                module = importlib.import_module(spec)
+        except (ImportError, OSError, SyntaxError) as e:
+            raise ValueError(f"无法加载插件 {spec}: {e}") from None
+        func = getattr(module, 'match_matrix', None)
+        raw = func is not None
+        if func is None:
+            func = getattr(module, 'match_batch', None)
+        if not callable(func):
+            raise ValueError(f"插件 {spec} 没有定义 match_matrix(matrix) 或 match_batch(addresses)")
+        name = getattr(module, 'NAME', None) or module.__name__.rsplit('.', 1)[-1].replace('vanity_plugin_', '', 1)
+        return cls(name, func, raw, int(getattr(module, 'SCORE', DEFAULT_PLUGIN_SCORE)))
+
+    @property
+    def label(self) -> str:
+        return f"plugin:{self.name}"
+
+    def match(self, matrix: np.ndarray) -> np.ndarray:
+        """(N, L) 地址字符矩阵中命中的行下标（升序）"""
+        n = matrix.shape[0]
+        start = time.perf_counter()
+        if self.raw:
+            result = self.func(matrix)
+        else:
+            strings = np.ascontiguousarray(matrix).view(f"S{matrix.shape[1]}").ravel().tolist()
+            result = self.func([s.decode('ascii') for s in strings])
+        self.seconds += time.perf_counter() - start
+        result = np.asarray(result if result is not None else [])
+        if result.dtype == bool:
+            if result.shape != (n,):
+                raise ValueError(f"插件 {self.name} 返回的掩码长度为 {result.shape}，应为 ({n},)")
+            rows = np.flatnonzero(result)
+        else:
+            rows = np.unique(result.astype(np.int64).ravel())
+            if rows.size and (rows[0] < 0 or rows[-1] >= n):
+                raise ValueError(f"插件 {self.name} 返回了越界的行下标")
+        self.calls += 1
+        self.rows += n
+        self.hits += int(rows.size)
+        return rows
+
+    def stats(self) -> Dict:
+        return {
+            'plugin': self.name,
+            'raw': self.raw,
+            'calls': self.calls,
+            'rows': self.rows,
+            'hits': self.hits,
+            'seconds': self.seconds,
+            'us_per_address': self.seconds / self.rows * 1e6 if self.rows else 0.0,
+        }
+
+
+class PluginSet:
+    """匹配插件与过滤插件"""
+
+    def __init__(self, matchers: List[MatchPlugin] = None, filters: List[MatchPlugin] = None):
+        self.matchers = list(matchers or [])
+        self.filters = list(filters or [])
+
+    @classmethod
+    def load(cls, matchers: List[str] = None, filters: List[str] = None) -> 'PluginSet':
+        return cls([MatchPlugin.load(spec) for spec in matchers or []],
+                   [MatchPlugin.load(spec) for spec in filters or []])
+
+    def __bool__(self) -> bool:
+        return bool(self.matchers or self.filters)
+
+    def match_batch(self, matrix: np.ndarray) -> Dict[int, Tuple[str, int]]:
+        """各匹配插件命中的行 → (标签, 分数)；同一行命中多个插件时取先加载的插件"""
+        labels: Dict[int, Tuple[str, int]] = {}
+        for plugin in self.matchers:
+            for row in plugin.match(matrix).tolist():
+                labels.setdefault(row, (plugin.label, plugin.score))
+        return labels
+
+    def filter(self, matrix: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """只保留通过所有过滤插件的候选行（每个插件只对剩余候选调用一次）"""
+        for plugin in self.filters:
+            if rows.size == 0:
+                break
+            rows = rows[plugin.match(matrix[rows])]
+        return rows
+
+    def stats(self) -> List[Dict]:
+        return [{**plugin.stats(), 'kind': kind}
+                for kind, plugins in (('match', self.matchers), ('filter', self.filters)) for plugin in plugins]
+
+
+def main():
+    """插件性能测试：在随机TRX地址上测量每个插件的每地址耗时与命中率"""
+    parser = argparse.ArgumentParser(description='批量匹配插件性能测试')
+    parser.add_argument('plugins', nargs='+', help='插件文件或模块名')
+    parser.add_argument('--rows', type=int, default=100000, help='随机地址数')
+    args = parser.parse_args()
+
+    from trx_vanity_address import TRX_ADDRESS_LENGTH, TRXVanityGenerator, _base58_matrix
+
+    try:
+        plugins = PluginSet.load(args.plugins)
+    except ValueError as e:
+        parser.error(str(e))
+    hashes = np.frombuffer(os.urandom(args.rows * 20), dtype=np.uint8).reshape(args.rows, 20)
+    matrix = _base58_matrix(TRXVanityGenerator._payload_matrix(hashes), TRX_ADDRESS_LENGTH)
+    plugins.match_batch(matrix)
+    for stats in plugins.stats():
+        kind = "原始字节" if stats['raw'] else "字符串"
+        print(f"🔌 {stats['plugin']} ({kind}): {stats['us_per_address']:.3f}µs/地址，"
+              f"命中 {stats['hits']}/{stats['rows']} ({stats['hits'] / stats['rows'] * 100:.4f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,17 +8,19 @@ Tor v3 .onion靓号生成器
 import hashlib
 import base64
 import os
+import re
 import time
 import json
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import argparse
 import sys
+import threading
 
 try:
     import numpy as np
-    from tqdm import tqdm
     from colorama import init, Fore, Style
     init(autoreset=True)
 
@@ -32,6 +34,13 @@ try:
 
     from nacl.signing import SigningKey
 
+    from batch_matcher import (char_counts, contains_mask, has_run_mask, max_run_lengths,
+                               tail_run_mask, trailing_run_lengths)
+    from progress_reporter import ProgressReporter
+    from batch_buffer import DEFAULT_BUFFER_ROWS, BatchBuffer
+    from config_manager import ConfigManager
+    from shm_transport import ONION_LAYOUT, SHM_RECEIVE_TIMEOUT, ShmTransport
+
 except ImportError as e:
     print(f"缺少依赖包: {e}")
     print("请运行: pip install pynacl numpy tqdm colorama")
@@ -46,18 +55,709 @@ _B32_ALPHABET = "abcdefghijklmnopqrstuvwxyz234567"
 
 def _base32_encode(data: bytes) -> str:
     """Fast base32 encode without padding."""
-    result = []
-    bits = 0
-    buffer = 0
-    for byte in data:
-        buffer = (buffer << 8) | byte
-        bits += 8
-        while bits >= 5:
-            bits -= 5
-            result.append(_B32_ALPHABET[(buffer >> bits) & 0x1F])
-    if bits > 0:
-        result.append(_B32_ALPHABET[(buffer << (5 - bits)) & 0x1F])
-    return "".join(result)
+    # 标准库base64在C层完成编码，比逐字节的Python循环快一个数量级
+    return base64.b32encode(data).decode("ascii").rstrip("=").lower()
+
+
+# v3 onion地址共56个base32字符：前51个字符(255 bit)完全来自公钥，
+# 之后的字符混入了2字节sha3校验和与固定的版本字节
+ONION_ADDRESS_CHARS = 56
+ONION_KEY_CHARS = 51
+
+
+def _onion_position_charsets() -> List[str]:
+    """计算每个字符位置上可能出现的字符（版本字节的固定bit会约束末尾字符）"""
+    version_offset = (32 + 2) * 8  # 公钥32字节 + 校验和2字节之后是版本字节
+    version = ONION_VERSION[0]
+    charsets = []
+    for pos in range(ONION_ADDRESS_CHARS):
+        allowed = []
+        for value in range(32):
+            ok = True
+            for i in range(5):
+                bit = pos * 5 + i
+                if bit < version_offset:
+                    continue
+                expected = (version >> (7 - (bit - version_offset))) & 1
+                if (value >> (4 - i)) & 1 != expected:
+                    ok = False
+                    break
+            if ok:
+                allowed.append(_B32_ALPHABET[value])
+        charsets.append("".join(allowed))
+    return charsets
+
+
+_ONION_CHARSETS = _onion_position_charsets()
+
+
+def _onion_body(pubkey: bytes) -> str:
+    """公钥 -> 56字符的onion地址主体（不含.onion后缀）"""
+    checksum = hashlib.sha3_256(ONION_CHECKSUM_PREFIX + pubkey + ONION_VERSION).digest()[:2]
+    return _base32_encode(pubkey + checksum + ONION_VERSION)
+
+
+def _fits_at(target: str, start: int) -> bool:
+    """target放在start位置时，每个字符是否都可能出现在对应位置"""
+    if start < 0 or start + len(target) > ONION_ADDRESS_CHARS:
+        return False
+    return all(c in _ONION_CHARSETS[start + i] for i, c in enumerate(target))
+
+
+def _placement_probability(target: str, start: int) -> float:
+    """随机地址在start位置恰好出现target的概率"""
+    if not _fits_at(target, start):
+        return 0.0
+    prob = 1.0
+    for i in range(len(target)):
+        prob /= len(_ONION_CHARSETS[start + i])
+    return prob
+
+
+def _binomial_tail(n: int, p: float, k: int) -> float:
+    """二项分布 P(X >= k)"""
+    pmf = (1 - p) ** n
+    tail = 0.0
+    for i in range(n + 1):
+        if i >= k:
+            tail += pmf
+        pmf *= (n - i) / (i + 1) * p / (1 - p)
+    return min(1.0, tail)
+
+
+class _OnionCandidate:
+    """惰性编码的候选地址：只有模式触及末尾5个字符时才计算sha3校验和"""
+    __slots__ = ('pubkey', '_head', '_full')
+
+    def __init__(self, pubkey: bytes = None, full: str = None):
+        self.pubkey = pubkey
+        self._full = full
+        self._head = full[:ONION_KEY_CHARS] if full is not None else None
+
+    @property
+    def head(self) -> str:
+        """前51个字符（仅由公钥决定）"""
+        if self._head is None:
+            self._head = _base32_encode(self.pubkey)[:ONION_KEY_CHARS]
+        return self._head
+
+    @property
+    def full(self) -> str:
+        """完整的56个字符（需要计算校验和）"""
+        if self._full is None:
+            self._full = _onion_body(self.pubkey)
+        return self._full
+
+    @property
+    def has_checksum(self) -> bool:
+        return self._full is not None
+
+
+_B32_LOOKUP = np.frombuffer(_B32_ALPHABET.encode("ascii"), dtype=np.uint8)
+_B32_BIT_WEIGHTS = np.array([16, 8, 4, 2, 1], dtype=np.uint8)
+
+
+def _base32_matrix(raw: np.ndarray, chars: int) -> np.ndarray:
+    """(N, bytes) uint8 -> (N, chars) base32字符矩阵（整批按bit位编码）"""
+    bits = np.unpackbits(raw, axis=1)[:, :chars * 5].reshape(raw.shape[0], chars, 5)
+    return _B32_LOOKUP[(bits * _B32_BIT_WEIGHTS).sum(axis=2)]
+
+
+class _OnionBatch:
+    """一批候选公钥的字符矩阵：前51个字符整批编码，校验和只对需要的行计算"""
+
+    def __init__(self, pubkeys):
+        """pubkeys为公钥列表或 (N, 32) uint8 矩阵（如复用缓冲区的视图）"""
+        if isinstance(pubkeys, np.ndarray):
+            self.pub = pubkeys
+        else:
+            self.pub = np.frombuffer(b"".join(pubkeys), dtype=np.uint8).reshape(len(pubkeys), 32)
+        self.head = _base32_matrix(self.pub, ONION_KEY_CHARS)
+        self._head_runs = None
+        self._full = np.zeros((self.pub.shape[0], ONION_ADDRESS_CHARS), dtype=np.uint8)
+        self._has_full = np.zeros(self.pub.shape[0], dtype=bool)
+
+    @property
+    def head_runs(self) -> np.ndarray:
+        """前51个字符中最长连续段长度（整批只计算一次）"""
+        if self._head_runs is None:
+            self._head_runs = max_run_lengths(self.head)
+        return self._head_runs
+
+    def full(self, rows: np.ndarray) -> np.ndarray:
+        """指定行的完整56个字符，按需计算校验和并缓存"""
+        missing = rows[~self._has_full[rows]]
+        if missing.size:
+            tails = b"".join(
+                hashlib.sha3_256(ONION_CHECKSUM_PREFIX + self.pub[r].tobytes() + ONION_VERSION).digest()[:2] + ONION_VERSION
+                for r in missing)
+            raw = np.concatenate([self.pub[missing], np.frombuffer(tails, dtype=np.uint8).reshape(-1, 3)], axis=1)
+            self._full[missing] = _base32_matrix(raw, ONION_ADDRESS_CHARS)
+            self._has_full[missing] = True
+        return self._full[rows]
+
+    @property
+    def checksums_computed(self) -> int:
+        return int(np.count_nonzero(self._has_full))
+
+
+def _needle(target: str) -> np.ndarray:
+    return np.frombuffer(target.encode("ascii"), dtype=np.uint8)
+
+
+class _PrefixTest:
+    """前缀匹配；前缀不超过51个字符时无需校验和"""
+
+    def __init__(self, target: str, label: str, score: int):
+        self.target = target
+        self.label = self.name = label
+        self.score = score
+        self.possible = _fits_at(target, 0)
+        self.needs_checksum = len(target) > ONION_KEY_CHARS
+        self.probability = _placement_probability(target, 0)
+
+    def match(self, cand: _OnionCandidate):
+        text = cand.full if self.needs_checksum else cand.head
+        if text.startswith(self.target):
+            return self.label, self.score
+        return None
+
+    def match_rows(self, batch: _OnionBatch, rows: np.ndarray) -> np.ndarray:
+        k = len(self.target)
+        text = batch.full(rows) if self.needs_checksum else batch.head[rows]
+        return rows[np.all(text[:, :k] == _needle(self.target), axis=1)]
+
+
+class _SuffixTest:
+    """后缀匹配；末尾字符受版本字节约束，不可能出现的后缀在编译期剔除"""
+
+    def __init__(self, target: str, label: str, score: int):
+        self.target = target
+        self.label = self.name = label
+        self.score = score
+        self.possible = _fits_at(target, ONION_ADDRESS_CHARS - len(target))
+        self.needs_checksum = True
+        self.probability = _placement_probability(target, ONION_ADDRESS_CHARS - len(target))
+
+    def match(self, cand: _OnionCandidate):
+        if cand.full.endswith(self.target):
+            return self.label, self.score
+        return None
+
+    def match_rows(self, batch: _OnionBatch, rows: np.ndarray) -> np.ndarray:
+        k = len(self.target)
+        full = batch.full(rows)
+        return rows[np.all(full[:, ONION_ADDRESS_CHARS - k:] == _needle(self.target), axis=1)]
+
+
+class _ContainsTest:
+    """子串匹配：先扫描公钥区域，只有可能跨入校验和区域时才回退到完整编码"""
+
+    def __init__(self, target: str, label: str, score: int):
+        self.target = target
+        self.label = self.name = label
+        self.score = score
+        last = ONION_ADDRESS_CHARS - len(target)
+        first_tail = max(0, ONION_KEY_CHARS - len(target) + 1)
+        self.tail_starts = [s for s in range(first_tail, last + 1) if _fits_at(target, s)]
+        self.possible = bool(self.tail_starts) or len(target) <= ONION_KEY_CHARS and all(
+            c in _B32_ALPHABET for c in target)
+        self.needs_checksum = bool(self.tail_starts)
+        self.probability = min(1.0, sum(_placement_probability(target, s)
+                                        for s in range(ONION_ADDRESS_CHARS - len(target) + 1)))
+
+    def match(self, cand: _OnionCandidate):
+        if self.target in cand.head:
+            return self.label, self.score
+        if self.tail_starts:
+            full = cand.full
+            for start in self.tail_starts:
+                if full.startswith(self.target, start):
+                    return self.label, self.score
+        return None
+
+    def match_rows(self, batch: _OnionBatch, rows: np.ndarray) -> np.ndarray:
+        in_head = contains_mask(batch.head[rows], self.target)
+        rest = rows[~in_head]
+        if not self.tail_starts or rest.size == 0:
+            return rows[in_head]
+        full = batch.full(rest)
+        needle = _needle(self.target)
+        k = len(self.target)
+        in_tail = np.zeros(rest.size, dtype=bool)
+        for start in self.tail_starts:
+            in_tail |= np.all(full[:, start:start + k] == needle, axis=1)
+        return np.sort(np.concatenate([rows[in_head], rest[in_tail]]))
+
+
+class _ConsecutiveTest:
+    """consecutive_N：公钥区域内找不到时，只有末尾连续段足够长才计算校验和"""
+
+    def __init__(self, count: int):
+        self.count = count
+        self.possible = 1 <= count <= ONION_ADDRESS_CHARS
+        tail = _ONION_CHARSETS[ONION_KEY_CHARS:]
+        # 从第52个字符开始，每个字符能延续的最长连续位置数
+        self.tail_ext = {}
+        for c in _B32_ALPHABET:
+            n = 0
+            while n < len(tail) and c in tail[n]:
+                n += 1
+            self.tail_ext[c] = n
+        self._tail_ext_table = np.zeros(256, dtype=np.int64)
+        for c, n in self.tail_ext.items():
+            self._tail_ext_table[ord(c)] = n
+        # 完全落在校验和区域内的最长连续段
+        self.tail_only_max = 0
+        for c in _B32_ALPHABET:
+            run = 0
+            for charset in tail:
+                run = run + 1 if c in charset else 0
+                self.tail_only_max = max(self.tail_only_max, run)
+        self.needs_checksum = True
+        windows = ONION_ADDRESS_CHARS - count + 1
+        self.probability = min(1.0, windows * 32.0 ** -(count - 1)) if self.possible else 0.0
+
+    def match(self, cand: _OnionCandidate):
+        head = cand.head
+        if not OnionVanityGenerator._has_consecutive_chars(head, self.count):
+            last = head[-1]
+            run = len(head) - len(head.rstrip(last))
+            if self.count > self.tail_only_max and run + self.tail_ext[last] < self.count:
+                return None
+            window = cand.full[max(0, ONION_KEY_CHARS - self.count + 1):]
+            if not OnionVanityGenerator._has_consecutive_chars(window, self.count):
+                return None
+        run_char, run_len = OnionVanityGenerator._longest_consecutive_run(cand.full)
+        return f"consecutive:{run_len}({run_char})", run_len * 10
+
+    def match_rows(self, batch: _OnionBatch, rows: np.ndarray) -> np.ndarray:
+        in_head = has_run_mask(batch.head[rows], self.count, batch.head_runs[rows])
+        rest = rows[~in_head]
+        if rest.size == 0:
+            return rows[in_head]
+        if self.count > self.tail_only_max:
+            # 只有末尾连续段加上校验和区域可能的延伸足够长时才需要完整编码
+            head = batch.head[rest]
+            rest = rest[trailing_run_lengths(head) + self._tail_ext_table[head[:, -1]] >= self.count]
+        if rest.size == 0:
+            return rows[in_head]
+        window = batch.full(rest)[:, max(0, ONION_KEY_CHARS - self.count + 1):]
+        in_tail = has_run_mask(window, self.count)
+        return np.sort(np.concatenate([rows[in_head], rest[in_tail]]))
+
+
+class _EndsConsecutiveTest:
+    """ends_consecutive_N：末尾字符固定，N>=2时在编译期即可判定不可能匹配"""
+
+    def __init__(self, count: int):
+        self.count = count
+        self.possible = 1 <= count <= ONION_ADDRESS_CHARS and any(
+            all(c in charset for charset in _ONION_CHARSETS[-count:]) for c in _B32_ALPHABET)
+        self.needs_checksum = True
+        self.probability = sum(_placement_probability(c * count, ONION_ADDRESS_CHARS - count)
+                               for c in _B32_ALPHABET) if self.possible else 0.0
+
+    def match(self, cand: _OnionCandidate):
+        tail = cand.full[-self.count:]
+        if len(set(tail)) == 1:
+            return f"ends_consecutive:{self.count}({tail[0]})", self.count * 12
+        return None
+
+    def match_rows(self, batch: _OnionBatch, rows: np.ndarray) -> np.ndarray:
+        return rows[tail_run_mask(batch.full(rows), self.count)]
+
+
+class _RepeatTest:
+    """repeat_C_N：公钥区域计数加上末尾最多可能的次数仍不足N时直接跳过"""
+
+    def __init__(self, char: str, count: int):
+        self.char = char
+        self.count = count
+        if len(char) == 1:
+            self.tail_max = sum(1 for charset in _ONION_CHARSETS[ONION_KEY_CHARS:] if char in charset)
+        else:
+            self.tail_max = ONION_ADDRESS_CHARS
+        self.possible = True
+        self.needs_checksum = True
+        self.probability = _binomial_tail(ONION_ADDRESS_CHARS, 32.0 ** -max(1, len(char)), count)
+
+    def match(self, cand: _OnionCandidate):
+        if cand.head.count(self.char) + self.tail_max < self.count:
+            return None
+        actual = cand.full.count(self.char)
+        if actual >= self.count:
+            return f"repeat:{self.char}x{actual}", actual * 5
+        return None
+
+    def match_rows(self, batch: _OnionBatch, rows: np.ndarray) -> np.ndarray:
+        if self.char not in _B32_ALPHABET or len(self.char) != 1:
+            # 多字符或非字母表字符：逐行回退到标量匹配
+            hits = [r for r in rows if self.match(_OnionCandidate(batch.pub[r].tobytes())) is not None]
+            return np.array(hits, dtype=rows.dtype)
+        counts = char_counts(batch.head[rows], self.char)
+        rest = rows[counts + self.tail_max >= self.count]
+        if rest.size == 0:
+            return rest
+        return rest[char_counts(batch.full(rest), self.char) >= self.count]
+
+
+def _compile_special_pattern(pattern: str):
+    """编译特殊模式语法，非特殊模式返回None"""
+    if pattern.startswith('ends_consecutive_'):
+        test = _EndsConsecutiveTest(int(pattern.split('_')[-1]))
+    elif pattern.startswith('consecutive_'):
+        test = _ConsecutiveTest(int(pattern.split('_')[1]))
+    elif pattern.startswith('repeat_'):
+        parts = pattern.split('_')
+        test = _RepeatTest(parts[1], int(parts[2]))
+    elif pattern.startswith('custom_'):
+        custom = pattern.split('_', 1)[1]
+        test = _ContainsTest(custom, f"custom:{custom}", len(custom) * 5)
+    else:
+        return None
+    test.name = pattern
+    return test
+
+
+# 代价模型：只读公钥区域的测试记为1，需要sha3校验和的测试额外加上校验和的代价
+_HEAD_COST = 1.0
+_CHECKSUM_COST = 3.0
+
+
+class _Const:
+    """编译期即可确定结果的节点（例如末尾不可能出现的后缀）"""
+
+    def __init__(self, value: bool):
+        self.value = value
+        self.cost = 0.0
+        self.probability = 1.0 if value else 0.0
+        self.needs_checksum = False
+
+    def evaluate(self, cand: _OnionCandidate) -> bool:
+        return self.value
+
+    def describe(self, cand: _OnionCandidate):
+        return ("", 0) if self.value else None
+
+    def match_rows(self, batch: _OnionBatch, rows: np.ndarray) -> np.ndarray:
+        return rows if self.value else rows[:0]
+
+    def plan(self) -> str:
+        return "TRUE" if self.value else "FALSE"
+
+
+class _Leaf:
+    """叶子节点：包装一个已编译的模式测试"""
+
+    def __init__(self, test):
+        self.test = test
+        self.cost = _HEAD_COST + (_CHECKSUM_COST if test.needs_checksum else 0.0)
+        self.probability = test.probability
+        self.needs_checksum = test.needs_checksum
+
+    def evaluate(self, cand: _OnionCandidate) -> bool:
+        return self.test.match(cand) is not None
+
+    def describe(self, cand: _OnionCandidate):
+        return self.test.match(cand)
+
+    def match_rows(self, batch: _OnionBatch, rows: np.ndarray) -> np.ndarray:
+        return self.test.match_rows(batch, rows)
+
+    def plan(self) -> str:
+        return self.test.name
+
+
+class _Not:
+    def __init__(self, child):
+        self.child = child
+        self.cost = child.cost
+        self.probability = 1.0 - child.probability
+        self.needs_checksum = child.needs_checksum
+
+    def evaluate(self, cand: _OnionCandidate) -> bool:
+        return not self.child.evaluate(cand)
+
+    def describe(self, cand: _OnionCandidate):
+        return ("", 0) if not self.child.evaluate(cand) else None
+
+    def match_rows(self, batch: _OnionBatch, rows: np.ndarray) -> np.ndarray:
+        return np.setdiff1d(rows, self.child.match_rows(batch, rows), assume_unique=True)
+
+    def plan(self) -> str:
+        return f"NOT {self.child.plan()}"
+
+
+class _And:
+    """AND节点：最可能失败且最便宜的子节点先执行（按 cost/(1-p) 升序）"""
+
+    def __init__(self, children: list):
+        self.children = children
+        self.order = sorted(children, key=lambda c: c.cost / max(1.0 - c.probability, 1e-12))
+        self.cost = 0.0
+        self.probability = 1.0
+        for child in self.order:
+            self.cost += self.probability * child.cost
+            self.probability *= child.probability
+        self.needs_checksum = any(c.needs_checksum for c in children)
+
+    def evaluate(self, cand: _OnionCandidate) -> bool:
+        for child in self.order:
+            if not child.evaluate(cand):
+                return False
+        return True
+
+    def match_rows(self, batch: _OnionBatch, rows: np.ndarray) -> np.ndarray:
+        for child in self.order:
+            if rows.size == 0:
+                break
+            rows = child.match_rows(batch, rows)
+        return rows
+
+    def describe(self, cand: _OnionCandidate):
+        labels = []
+        score = 0
+        for child in self.children:
+            result = child.describe(cand)
+            if result is None:
+                return None
+            if result[0]:
+                labels.append(result[0])
+            score += result[1]
+        return " + ".join(labels), score
+
+    def plan(self) -> str:
+        return "(" + " AND ".join(c.plan() for c in self.order) + ")"
+
+
+class _Or:
+    """OR节点：最可能命中且最便宜的子节点先执行（按 cost/p 升序）
+
+    排序只影响判断是否命中；命中后按声明顺序取第一个匹配的子节点作为标签。
+    """
+
+    def __init__(self, children: list):
+        self.children = children
+        self.order = sorted(children, key=lambda c: c.cost / max(c.probability, 1e-12))
+        self.cost = 0.0
+        miss = 1.0
+        for child in self.order:
+            self.cost += miss * child.cost
+            miss *= 1.0 - child.probability
+        self.probability = 1.0 - miss
+        self.needs_checksum = any(c.needs_checksum for c in children)
+
+    def evaluate(self, cand: _OnionCandidate) -> bool:
+        for child in self.order:
+            if child.evaluate(cand):
+                return True
+        return False
+
+    def match_rows(self, batch: _OnionBatch, rows: np.ndarray) -> np.ndarray:
+        hits = []
+        for child in self.order:
+            if rows.size == 0:
+                break
+            hit = child.match_rows(batch, rows)
+            hits.append(hit)
+            rows = np.setdiff1d(rows, hit, assume_unique=True)
+        if not hits:
+            return rows[:0]
+        return np.sort(np.concatenate(hits))
+
+    def describe(self, cand: _OnionCandidate):
+        for child in self.children:
+            result = child.describe(cand)
+            if result is not None:
+                return result
+        return None
+
+    def plan(self) -> str:
+        return "(" + " OR ".join(c.plan() for c in self.order) + ")"
+
+
+def _make_leaf(test):
+    return _Leaf(test) if test.possible else _Const(False)
+
+
+def _make_not(child):
+    if isinstance(child, _Const):
+        return _Const(not child.value)
+    return _Not(child)
+
+
+def _make_and(children: list):
+    children = [c for c in children if not (isinstance(c, _Const) and c.value)]
+    if any(isinstance(c, _Const) for c in children):
+        return _Const(False)
+    if not children:
+        return _Const(True)
+    return children[0] if len(children) == 1 else _And(children)
+
+
+def _make_or(children: list):
+    children = [c for c in children if not (isinstance(c, _Const) and not c.value)]
+    if any(isinstance(c, _Const) for c in children):
+        return _Const(True)
+    if not children:
+        return _Const(False)
+    return children[0] if len(children) == 1 else _Or(children)
+
+
+def _compile_general_pattern(pattern: str, fold) -> list:
+    """通用模式：先特殊模式，再按 前缀 > 后缀 > 包含 的优先级字面匹配"""
+    nodes = []
+    special = _compile_special_pattern(pattern)
+    if special is not None:
+        nodes.append(_make_leaf(special))
+    target = fold(pattern)
+    nodes.append(_make_leaf(_PrefixTest(target, f"prefix:{pattern}", len(pattern) * 10)))
+    nodes.append(_make_leaf(_SuffixTest(target, f"suffix:{pattern}", len(pattern) * 8)))
+    nodes.append(_make_leaf(_ContainsTest(target, f"contains:{pattern}", len(pattern) * 5)))
+    return nodes
+
+
+def _compile_term(term: str, fold):
+    """编译表达式中的单个条件"""
+    kind, sep, value = term.partition(':')
+    if sep and kind.lower() == 'prefix':
+        return _make_leaf(_PrefixTest(fold(value), f"prefix:{value}", len(value) * 10))
+    if sep and kind.lower() == 'suffix':
+        return _make_leaf(_SuffixTest(fold(value), f"suffix:{value}", len(value) * 8))
+    if sep and kind.lower() == 'contains':
+        return _make_leaf(_ContainsTest(fold(value), f"contains:{value}", len(value) * 5))
+    return _make_or(_compile_general_pattern(term, fold))
+
+
+_EXPR_TOKEN = re.compile(r"\s*(\(|\)|[^\s()]+)")
+
+
+def _parse_expression(expression: str, fold):
+    """解析布尔表达式：NOT > AND > OR，支持括号"""
+    tokens = []
+    pos = 0
+    expression = expression.rstrip()
+    while pos < len(expression):
+        m = _EXPR_TOKEN.match(expression, pos)
+        tokens.append(m.group(1))
+        pos = m.end()
+    index = 0
+
+    def peek():
+        return tokens[index] if index < len(tokens) else None
+
+    def keyword(token, name):
+        return token is not None and token.upper() == name
+
+    def parse_or():
+        nonlocal index
+        children = [parse_and()]
+        while keyword(peek(), 'OR'):
+            index += 1
+            children.append(parse_and())
+        return _make_or(children)
+
+    def parse_and():
+        nonlocal index
+        children = [parse_not()]
+        while keyword(peek(), 'AND'):
+            index += 1
+            children.append(parse_not())
+        return _make_and(children)
+
+    def parse_not():
+        nonlocal index
+        if keyword(peek(), 'NOT'):
+            index += 1
+            return _make_not(parse_not())
+        return parse_atom()
+
+    def parse_atom():
+        nonlocal index
+        token = peek()
+        if token is None or token == ')' or token.upper() in ('AND', 'OR', 'NOT'):
+            raise ValueError(f"表达式语法错误: 位置 {index} 处缺少模式 ({expression})")
+        index += 1
+        if token == '(':
+            node = parse_or()
+            if peek() != ')':
+                raise ValueError(f"表达式语法错误: 缺少右括号 ({expression})")
+            index += 1
+            return node
+        return _compile_term(token, fold)
+
+    if not tokens:
+        raise ValueError("表达式为空")
+    root = parse_or()
+    if index != len(tokens):
+        raise ValueError(f"表达式语法错误: 多余的 '{tokens[index]}' ({expression})")
+    return root
+
+
+class OnionPatternMatcher:
+    """编译后的onion模式匹配器
+
+    编译时按每个模式可能匹配的字符位置做可达性分析：只看前51个字符的模式
+    不计算sha3校验和，末尾字符不可能满足的模式直接剔除。模式组合成
+    AND/OR/NOT表达式树，按估计的代价和命中率排序并短路求值；大小写折叠
+    只在编译时做一次。
+    """
+
+    def __init__(self, prefix_patterns: List[str], general_patterns: List[str],
+                 case_sensitive: bool = False, require_all: bool = False):
+        fold = self._folder(case_sensitive)
+        # 前缀模式：只匹配开头
+        prefix_nodes = [_make_leaf(_PrefixTest(fold(p), f"prefix:{p}", len(p) * 10))
+                        for p in prefix_patterns]
+        general_nodes = []
+        for pattern in general_patterns:
+            general_nodes.extend(_compile_general_pattern(pattern, fold))
+        if require_all and prefix_patterns and general_patterns:
+            # 前缀与通用模式同时指定时，两者都必须匹配
+            self.root = _make_and([_make_or(prefix_nodes), _make_or(general_nodes)])
+        else:
+            self.root = _make_or(prefix_nodes + general_nodes)
+
+    @classmethod
+    def from_expression(cls, expression: str, case_sensitive: bool = False) -> 'OnionPatternMatcher':
+        """从布尔表达式编译，如 'prefix:deep AND (consecutive_4 OR suffix:qd) AND NOT contains:xx'"""
+        matcher = cls.__new__(cls)
+        matcher.root = _parse_expression(expression, cls._folder(case_sensitive))
+        return matcher
+
+    @staticmethod
+    def _folder(case_sensitive: bool):
+        return (lambda p: p) if case_sensitive else (lambda p: p.lower())
+
+    @property
+    def impossible(self) -> bool:
+        """表达式在v3 onion地址中永远不可能满足"""
+        return isinstance(self.root, _Const) and not self.root.value
+
+    def ensure_possible(self) -> 'OnionPatternMatcher':
+        """表达式永远不可能满足时抛出ValueError（否则搜索永远不会结束）"""
+        if self.impossible:
+            raise ValueError("所有模式都不可能出现在v3 onion地址中")
+        return self
+
+    @property
+    def needs_checksum(self) -> bool:
+        return self.root.needs_checksum
+
+    def plan(self) -> str:
+        """按实际求值顺序描述表达式"""
+        return self.root.plan()
+
+    def match(self, cand: _OnionCandidate) -> Tuple[bool, str, int]:
+        if not self.root.evaluate(cand):
+            return False, "", 0
+        label, score = self.root.describe(cand)
+        return True, label, score
+
+    def match_batch(self, batch: _OnionBatch) -> np.ndarray:
+        """整批求值，返回命中的行下标（升序）"""
+        return self.root.match_rows(batch, np.arange(batch.pub.shape[0]))
 
 
 @dataclass
@@ -71,10 +771,17 @@ class VanityOnion:
     timestamp: float = 0.0
 
 
+@lru_cache(maxsize=64)
+def _cached_matcher(prefix_patterns: tuple, general_patterns: tuple, case_sensitive: bool) -> OnionPatternMatcher:
+    """逐个地址检查的接口复用编译好的匹配器，每组模式只解析编译一次"""
+    return OnionPatternMatcher(list(prefix_patterns), list(general_patterns), case_sensitive)
+
+
 class OnionVanityGenerator:
     """Tor v3 .onion靓号生成器"""
 
-    def __init__(self, use_gpu: bool = True):
+    def __init__(self, use_gpu: bool = True, quiet: bool = False):
+        self.quiet = quiet
         self.use_gpu = use_gpu and self._check_gpu_availability()
         self.found_addresses = []
         self.stats = {
@@ -85,11 +792,16 @@ class OnionVanityGenerator:
 
         if self.use_gpu:
             gpu_info = self._get_gpu_info()
-            print(f"{Fore.GREEN}✓ GPU加速已启用{Style.RESET_ALL}")
+            self._log(f"{Fore.GREEN}✓ GPU加速已启用{Style.RESET_ALL}")
             if gpu_info:
-                print(f"{Fore.CYAN}GPU信息: {gpu_info}{Style.RESET_ALL}")
+                self._log(f"{Fore.CYAN}GPU信息: {gpu_info}{Style.RESET_ALL}")
         else:
-            print(f"{Fore.YELLOW}⚠ GPU不可用，使用CPU模式{Style.RESET_ALL}")
+            self._log(f"{Fore.YELLOW}⚠ GPU不可用，使用CPU模式{Style.RESET_ALL}")
+
+    def _log(self, *args, **kwargs):
+        """输出提示信息（quiet模式下不输出）"""
+        if not self.quiet:
+            print(*args, **kwargs)
 
     def _check_gpu_availability(self) -> bool:
         if not CUPY_AVAILABLE:
@@ -117,9 +829,7 @@ class OnionVanityGenerator:
 
     @staticmethod
     def _onion_address_from_pubkey(pubkey: bytes) -> str:
-        checksum = hashlib.sha3_256(ONION_CHECKSUM_PREFIX + pubkey + ONION_VERSION).digest()[:2]
-        raw = pubkey + checksum + ONION_VERSION
-        return _base32_encode(raw) + ".onion"
+        return _onion_body(pubkey) + ".onion"
 
     @staticmethod
     def _seed_to_keypair(seed: bytes) -> Tuple[bytes, bytes]:
@@ -135,74 +845,31 @@ class OnionVanityGenerator:
         random_bytes = cp.asnumpy(random_bytes)
         return [bytes(row) for row in random_bytes]
 
+    def fill_buffer(self, buffer: BatchBuffer, n: int, reporter: ProgressReporter = None) -> BatchBuffer:
+        """在缓冲区前n行原地生成seed和ed25519公钥"""
+        buffer.fill_random_keys(n, xp=cp if self.use_gpu and CUPY_AVAILABLE else None)
+        for i in range(n):
+            buffer.set_output(i, SigningKey(buffer.key(i)).verify_key.encode())
+            if reporter is not None:
+                reporter.checked += 1
+        return buffer
+
+    def fill_shm_slot(self, fields) -> int:
+        """共享内存生产进程：原地填充一个槽位的seed和ed25519公钥"""
+        seeds, pubkeys = fields['key'], fields['pubkey']
+        n = seeds.shape[0]
+        seeds[:] = np.frombuffer(os.urandom(seeds.size), dtype=np.uint8).reshape(seeds.shape)
+        for i in range(n):
+            pubkeys[i] = np.frombuffer(SigningKey(seeds[i].tobytes()).verify_key.encode(), dtype=np.uint8)
+        return n
+
     def _check_vanity_pattern(self, onion: str, prefix_patterns: List[str],
                                general_patterns: List[str], case_sensitive: bool) -> Tuple[bool, str, int]:
         # Strip .onion suffix for matching
         addr = onion.replace('.onion', '')
         check = addr if case_sensitive else addr.lower()
-
-        # Prefix patterns: ONLY match at start
-        for pattern in prefix_patterns:
-            target = pattern if case_sensitive else pattern.lower()
-            if check.startswith(target):
-                score = len(pattern) * 10
-                return True, f"prefix:{pattern}", score
-
-        # General patterns: special patterns first, then literal matching
-        for pattern in general_patterns:
-            matched, label, score = self._matches_special_pattern(check, pattern)
-            if matched:
-                return True, label, score
-
-            # Literal string matching: prefix > suffix > contains
-            target = pattern if case_sensitive else pattern.lower()
-            if check.startswith(target):
-                score = len(pattern) * 10
-                return True, f"prefix:{pattern}", score
-            elif check.endswith(target):
-                score = len(pattern) * 8
-                return True, f"suffix:{pattern}", score
-            elif target in check:
-                score = len(pattern) * 5
-                return True, f"contains:{pattern}", score
-        return False, "", 0
-
-    def _matches_special_pattern(self, addr: str, pattern: str) -> Tuple[bool, str, int]:
-        """Handle special pattern syntax: consecutive_, ends_consecutive_, repeat_, custom_"""
-        if pattern.startswith('ends_consecutive_'):
-            # Tail ends with N identical chars, e.g. ends_consecutive_5
-            count = int(pattern.split('_')[-1])
-            tail = addr[-count:]
-            if len(tail) == count and len(set(tail)) == 1:
-                return True, f"ends_consecutive:{count}({tail[0]})", count * 12
-            return False, "", 0
-
-        if pattern.startswith('consecutive_'):
-            # Any run of N identical chars anywhere, e.g. consecutive_5
-            count = int(pattern.split('_')[1])
-            if self._has_consecutive_chars(addr, count):
-                run_char, run_len = self._longest_consecutive_run(addr)
-                return True, f"consecutive:{run_len}({run_char})", run_len * 10
-            return False, "", 0
-
-        if pattern.startswith('repeat_'):
-            # Char appears >= N times, e.g. repeat_a_6
-            parts = pattern.split('_')
-            char = parts[1]
-            count = int(parts[2])
-            actual = addr.count(char)
-            if actual >= count:
-                return True, f"repeat:{char}x{actual}", actual * 5
-            return False, "", 0
-
-        if pattern.startswith('custom_'):
-            # Substring match, e.g. custom_dead
-            custom = pattern.split('_', 1)[1]
-            if custom in addr:
-                return True, f"custom:{custom}", len(custom) * 5
-            return False, "", 0
-
-        return False, "", 0
+        return _cached_matcher(tuple(prefix_patterns), tuple(general_patterns), case_sensitive).match(
+            _OnionCandidate(full=check))
 
     @staticmethod
     def _has_consecutive_chars(addr: str, count: int) -> bool:
@@ -240,91 +907,158 @@ class OnionVanityGenerator:
                 base64.b64encode(seed_out).decode("ascii"),
             )
 
+    @staticmethod
+    def _format_hit(vanity: VanityOnion) -> List[str]:
+        """命中结果的显示内容（在报告线程中调用）"""
+        return [
+            f"\n{Fore.GREEN}找到靓号!{Style.RESET_ALL}",
+            f"Onion: {Fore.YELLOW}{vanity.onion}{Style.RESET_ALL}",
+            f"模式: {vanity.pattern}",
+            f"分数: {vanity.score}",
+            f"Public Key: {vanity.public_key}",
+            f"Private Seed: {vanity.private_key_seed}",
+            "-" * 30,
+        ]
+
+    @staticmethod
+    def _buffer_hits(seeds: np.ndarray, pubkeys: np.ndarray, rows,
+                     matcher: 'OnionPatternMatcher') -> List[Tuple[int, VanityOnion]]:
+        """批量匹配的候选行逐个确认并确定标签与分数，返回 (行, 命中地址)"""
+        hits = []
+        for row in rows:
+            pk, seed_out = pubkeys[row].tobytes(), seeds[row].tobytes()
+            cand = _OnionCandidate(pk)
+            is_vanity, pattern, score = matcher.match(cand)
+            if not is_vanity:
+                continue
+            hits.append((int(row), VanityOnion(
+                onion=cand.full + ".onion",
+                public_key=base64.b64encode(pk).decode("ascii"),
+                private_key_seed=base64.b64encode(seed_out).decode("ascii"),
+                pattern=pattern,
+                score=score,
+                timestamp=time.time()
+            )))
+        return hits
+
     def find_vanity_addresses(self,
                               prefix_patterns: List[str] = None,
                               general_patterns: List[str] = None,
                               max_addresses: int = 1,
                               batch_size: int = 10000,
                               case_sensitive: bool = False,
-                              save_to_file: bool = True) -> List[VanityOnion]:
-        """寻找靓号.onion地址"""
+                              save_to_file: bool = True,
+                              require_all: bool = False,
+                              expression: str = None,
+                              processes: int = 0) -> List[VanityOnion]:
+        """寻找靓号.onion地址（阻塞直到找到max_addresses个），参数见 search_iter"""
+        for _ in self.search_iter(prefix_patterns, general_patterns, max_addresses, batch_size,
+                                  case_sensitive, require_all, expression, processes):
+            pass
+
+        if save_to_file:
+            self.save_results()
+
+        return self.found_addresses
+
+    def search_iter(self,
+                    prefix_patterns: List[str] = None,
+                    general_patterns: List[str] = None,
+                    max_addresses: Optional[int] = 1,
+                    batch_size: int = 10000,
+                    case_sensitive: bool = False,
+                    require_all: bool = False,
+                    expression: str = None,
+                    processes: int = 0,
+                    stop: threading.Event = None) -> Iterator[VanityOnion]:
+        """搜索引擎：逐个产出命中的.onion地址（同时追加到 found_addresses）
+
+        require_all为True时前缀模式与通用模式必须同时匹配；
+        指定expression时使用布尔表达式，忽略prefix_patterns/general_patterns。
+        processes大于0时由processes个生产进程经共享内存（shm_transport.py）传入
+        seed和公钥，直接在共享内存视图上整批匹配。
+        max_addresses为None时一直搜索，直到stop被设置或调用方停止迭代；stop在分块之间检查。
+        """
         prefix_patterns = prefix_patterns or []
         general_patterns = general_patterns or []
-        print(f"{Fore.CYAN}开始寻找Tor v3靓号.onion地址...{Style.RESET_ALL}")
-        if prefix_patterns:
-            print(f"前缀模式 (仅匹配开头): {prefix_patterns}")
-        if general_patterns:
-            print(f"通用模式 (匹配任意位置): {general_patterns}")
-        print(f"最大地址数: {max_addresses}")
-        print(f"批次大小: {batch_size}")
-        print(f"大小写敏感: {case_sensitive}")
-        print("-" * 50)
-
+        self._log(f"{Fore.CYAN}开始寻找Tor v3靓号.onion地址...{Style.RESET_ALL}")
+        if expression:
+            matcher = OnionPatternMatcher.from_expression(expression, case_sensitive)
+            self._log(f"模式表达式: {expression}")
+        else:
+            matcher = OnionPatternMatcher(prefix_patterns, general_patterns, case_sensitive, require_all)
+            if prefix_patterns:
+                self._log(f"前缀模式 (仅匹配开头): {prefix_patterns}")
+            if general_patterns:
+                self._log(f"通用模式 (匹配任意位置): {general_patterns}")
+            if require_all and prefix_patterns and general_patterns:
+                self._log("组合方式: 前缀 AND 通用模式")
+        matcher.ensure_possible()
+        self._log(f"求值顺序: {matcher.plan()}")
+        self._log(f"最大地址数: {max_addresses if max_addresses is not None else '不限'}")
+        self._log(f"批次大小: {batch_size}")
+        self._log(f"大小写敏感: {case_sensitive}")
+        self._log("-" * 50)
+
+        if not matcher.needs_checksum:
+            self._log(f"{Fore.GREEN}✓ 模式只涉及前{ONION_KEY_CHARS}个字符，跳过sha3校验和计算{Style.RESET_ALL}")
+
+        limit = float('inf') if max_addresses is None else max_addresses
         found_count = 0
         total_generated = 0
-
-        with tqdm(total=None, desc="已检查", unit="addr", dynamic_ncols=True) as pbar:
-            mode_msg = self.use_gpu and f"{Fore.GREEN}使用GPU生成密钥...{Style.RESET_ALL}" or f"{Fore.YELLOW}使用CPU生成密钥...{Style.RESET_ALL}"
-            tqdm.write(mode_msg)
-            while found_count < max_addresses:
-                address_iter = self.generate_batch_iter(batch_size)
-
-                update_interval = max(1000, batch_size // 100)
-                pending_updates = 0
-                for onion, pub_key_b64, seed_b64 in address_iter:
-                    total_generated += 1
-                    is_vanity, pattern, score = self._check_vanity_pattern(onion, prefix_patterns, general_patterns, case_sensitive)
-                    pending_updates += 1
-
-                    if is_vanity:
-                        vanity = VanityOnion(
-                            onion=onion,
-                            public_key=pub_key_b64,
-                            private_key_seed=seed_b64,
-                            pattern=pattern,
-                            score=score,
-                            timestamp=time.time()
-                        )
-
+        checksums_computed = 0
+        rows = min(batch_size, DEFAULT_BUFFER_ROWS)
+        transport = None
+        if processes > 0:
+            transport = ShmTransport(self.fill_shm_slot, ONION_LAYOUT, rows=rows, processes=processes)
+        buffer = BatchBuffer(rows, output_width=32)
+
+        def chunks():
+            """依次产出 (seed矩阵, 公钥矩阵)；共享内存槽位在调用方处理完后才归还"""
+            if transport is not None:
+                while True:
+                    slot, fields = transport.receive(timeout=SHM_RECEIVE_TIMEOUT)
+                    reporter.checked += fields['key'].shape[0]
+                    yield fields['key'], fields['pubkey']
+                    transport.release(slot)
+            while True:
+                for n in buffer.chunks(batch_size):
+                    self.fill_buffer(buffer, n, reporter)
+                    yield buffer.keys[:n], buffer.matrix
+
+        reporter = ProgressReporter(target=max_addresses, quiet=self.quiet, format_hit=self._format_hit)
+        try:
+            with reporter:
+                if transport is not None:
+                    transport.start()
+                    reporter.write(f"{Fore.GREEN}使用 {processes} 个生产进程（共享内存传输）...{Style.RESET_ALL}")
+                else:
+                    mode_msg = self.use_gpu and f"{Fore.GREEN}使用GPU生成密钥...{Style.RESET_ALL}" or f"{Fore.YELLOW}使用CPU生成密钥...{Style.RESET_ALL}"
+                    reporter.write(mode_msg)
+                # 按缓冲区容量分块生成，整批匹配，只对命中的行计算标签与分数
+                for seeds, pubkeys in chunks():
+                    total_generated += seeds.shape[0]
+                    batch = _OnionBatch(pubkeys)
+                    hit_rows = matcher.match_batch(batch)
+                    checksums_computed += batch.checksums_computed
+                    for _, vanity in self._buffer_hits(seeds, pubkeys, hit_rows, matcher):
                         self.found_addresses.append(vanity)
                         found_count += 1
+                        reporter.found = found_count
+                        reporter.hit(vanity)
+                        yield vanity
 
-                        tqdm.write(f"\n{Fore.GREEN}找到靓号!{Style.RESET_ALL}")
-                        tqdm.write(f"Onion: {Fore.YELLOW}{onion}{Style.RESET_ALL}")
-                        tqdm.write(f"模式: {pattern}")
-                        tqdm.write(f"分数: {score}")
-                        tqdm.write(f"Public Key: {pub_key_b64}")
-                        tqdm.write(f"Private Seed: {seed_b64}")
-                        tqdm.write("-" * 30)
-
-                        if found_count >= max_addresses:
+                        if found_count >= limit:
                             break
 
-                    if pending_updates >= update_interval:
-                        pbar.update(pending_updates)
-                        pending_updates = 0
-
-                if pending_updates > 0:
-                    pbar.update(pending_updates)
-
-                self.stats['total_generated'] = total_generated
-                self.stats['found_vanity'] = found_count
-
-                elapsed = time.time() - self.stats['start_time']
-                rate = found_count / elapsed if elapsed > 0 else 0
-                remaining = max_addresses - found_count
-                eta = remaining / rate if rate > 0 else 0
-                pbar.set_description(f"已检查 {total_generated:,}")
-                pbar.set_postfix({
-                    "elapsed": self._format_duration(elapsed),
-                    "eta": self._format_duration(eta),
-                    "found": f"{found_count}/{max_addresses}"
-                })
-
-        if save_to_file:
-            self.save_results()
-
-        return self.found_addresses
+                    self.stats['total_generated'] = total_generated
+                    self.stats['found_vanity'] = found_count
+                    self.stats['checksums_computed'] = checksums_computed
+                    if found_count >= limit or (stop is not None and stop.is_set()):
+                        break
+        finally:
+            if transport is not None:
+                transport.close()
 
     def save_results(self, filename: str = None):
         """保存结果到文件"""
@@ -351,7 +1085,7 @@ class OnionVanityGenerator:
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(results, f, indent=2, ensure_ascii=False)
 
-        print(f"\n{Fore.GREEN}结果已保存到: {filename}{Style.RESET_ALL}")
+        self._log(f"\n{Fore.GREEN}结果已保存到: {filename}{Style.RESET_ALL}")
 
     def _format_duration(self, seconds: float) -> str:
         """格式化时长显示"""
@@ -368,32 +1102,40 @@ class OnionVanityGenerator:
         elapsed_time = time.time() - self.stats['start_time']
         rate = self.stats['total_generated'] / elapsed_time if elapsed_time > 0 else 0
 
-        print(f"\n{Fore.CYAN}统计信息:{Style.RESET_ALL}")
-        print(f"总生成地址数: {self.stats['total_generated']:,}")
-        print(f"找到靓号数: {self.stats['found_vanity']}")
-        print(f"运行时间: {elapsed_time:.2f}秒")
-        print(f"生成速率: {rate:.0f} 地址/秒")
+        self._log(f"\n{Fore.CYAN}统计信息:{Style.RESET_ALL}")
+        self._log(f"总生成地址数: {self.stats['total_generated']:,}")
+        self._log(f"找到靓号数: {self.stats['found_vanity']}")
+        self._log(f"运行时间: {elapsed_time:.2f}秒")
+        self._log(f"生成速率: {rate:.0f} 地址/秒")
 
         if self.stats['total_generated'] > 0:
             success_rate = (self.stats['found_vanity'] / self.stats['total_generated']) * 100
-            print(f"成功率: {success_rate:.6f}%")
+            self._log(f"成功率: {success_rate:.6f}%")
 
 
-def main():
+def main(require_all: bool = False):
     """主函数"""
     parser = argparse.ArgumentParser(description='Tor v3 .onion靓号生成器')
     parser.add_argument('--prefix', type=str, default=None,
                         help='前缀匹配 (e.g., deepx)')
     parser.add_argument('--patterns', nargs='+', default=None,
                         help='靓号模式列表 (包含匹配)')
+    parser.add_argument('--expr', type=str, default=None,
+                        help="布尔模式表达式 (e.g., 'prefix:deep AND (consecutive_4 OR suffix:qd) AND NOT contains:xx')")
+    parser.add_argument('--require-all', action='store_true', default=require_all,
+                        help='--prefix 与 --patterns 必须同时匹配 (默认任一匹配即可)')
     parser.add_argument('--max-addresses', type=int, default=1,
                         help='最大找到的靓号数量')
-    parser.add_argument('--batch-size', type=int, default=10000,
-                        help='每批次生成的地址数量')
+    parser.add_argument('--batch-size', type=int,
+                        help='每批次生成的地址数量 (默认读取本机校准配置，否则10000)')
     parser.add_argument('--no-gpu', action='store_true',
                         help='禁用GPU加速')
     parser.add_argument('--case-sensitive', action='store_true',
                         help='大小写敏感匹配')
+    parser.add_argument('--processes', type=int,
+                        help='共享内存生产进程数 (默认读取本机校准配置的 processes，否则0，在当前进程中生成)')
+    parser.add_argument('--quiet', action='store_true',
+                        help='静默模式：不显示进度条和命中信息，只写结果文件')
 
     args = parser.parse_args()
 
@@ -404,10 +1146,33 @@ def main():
         prefix_patterns.append(args.prefix)
     if args.patterns:
         general_patterns.extend(args.patterns)
-    if not prefix_patterns and not general_patterns:
-        parser.error('必须指定 --prefix 或 --patterns')
-
-    generator = OnionVanityGenerator(use_gpu=not args.no_gpu)
+    if args.expr:
+        if prefix_patterns or general_patterns:
+            parser.error('--expr 不能与 --prefix/--patterns 同时使用')
+    elif not prefix_patterns and not general_patterns:
+        parser.error('必须指定 --prefix、--patterns 或 --expr')
+    try:
+        if args.expr:
+            OnionPatternMatcher.from_expression(args.expr, args.case_sensitive).ensure_possible()
+        else:
+            OnionPatternMatcher(prefix_patterns, general_patterns, args.case_sensitive,
+                                args.require_all).ensure_possible()
+    except ValueError as e:
+        parser.error(str(e))
+
+    # 本机校准配置（config_manager.py --calibrate onion）
+    config = ConfigManager()
+    settings = config.get_effective_settings('onion')
+    if args.batch_size is None:
+        args.batch_size = settings.get('batch_size', 10000)
+    use_gpu = not args.no_gpu and settings.get('use_gpu', True)
+    if args.processes is None:
+        args.processes = config.get_default_processes('onion')
+
+    generator = OnionVanityGenerator(use_gpu=use_gpu, quiet=args.quiet)
+    if config.get_host_profile('onion'):
+        generator._log(f"{Fore.CYAN}使用本机校准配置: batch_size={args.batch_size}, "
+                       f"GPU={'是' if use_gpu else '否'}, 生产进程={args.processes}{Style.RESET_ALL}")
 
     try:
         found = generator.find_vanity_addresses(
@@ -416,12 +1181,15 @@ def main():
             max_addresses=args.max_addresses,
             batch_size=args.batch_size,
             case_sensitive=args.case_sensitive,
-            save_to_file=True
+            save_to_file=True,
+            require_all=args.require_all,
+            expression=args.expr,
+            processes=args.processes
         )
 
         generator.print_stats()
 
-        if found:
+        if found and not args.quiet:
             print(f"\n{Fore.CYAN}找到的靓号.onion地址:{Style.RESET_ALL}")
             for i, addr in enumerate(found, 1):
                 print(f"\n{i}. {Fore.YELLOW}{addr.onion}{Style.RESET_ALL}")
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分阶段流水线
+密钥源 → 派生 → 匹配 → 结果处理，各阶段之间用有界队列连接（队列满时上游阻塞，
+形成背压），每个阶段可以独立设置工作线程数，并统计忙碌时间、阻塞时间和
+输入队列深度，用于判断哪个阶段限制了整体吞吐量。
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+_END = object()  # 数据流结束标记
+_POLL = 0.05     # 阻塞操作检查停止信号的间隔（秒）
+
+
+class Stage:
+    """流水线中的一个处理阶段：func(item) -> item（项目携带的资源槽位必须随结果传递下去）"""
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1):
+        if workers < 1:
+            raise ValueError(f"阶段 {name} 的工作线程数必须至少为1")
+        self.name = name
+        self.func = func
+        self.workers = workers
+
+
+class StageMetrics:
+    """单个阶段的运行统计（各工作线程累加）"""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0      # 执行处理函数的时间
+        self.blocked = 0.0   # 等待下游队列空位的时间（背压）
+        self.starved = 0.0   # 等待上游数据的时间
+        self.depth_sum = 0
+        self.depth_samples = 0
+        self._lock = threading.Lock()
+
+    def record(self, busy: float, blocked: float, starved: float, depth: int = None):
+        with self._lock:
+            self.items += 1
+            self.busy += busy
+            self.blocked += blocked
+            self.starved += starved
+            if depth is not None:
+                self.depth_sum += depth
+                self.depth_samples += 1
+
+    def snapshot(self, elapsed: float) -> Dict[str, Any]:
+        capacity = elapsed * self.workers
+        return {
+            'stage': self.name,
+            'workers': self.workers,
+            'items': self.items,
+            'busy_s': round(self.busy, 3),
+            'blocked_s': round(self.blocked, 3),
+            'starved_s': round(self.starved, 3),
+            'utilization': round(self.busy / capacity, 3) if capacity > 0 else 0.0,
+            'avg_queue_depth': round(self.depth_sum / self.depth_samples, 2) if self.depth_samples else 0.0,
+        }
+
+
+class Pipeline:
+    """有界队列连接的多阶段流水线
+
+    source(slot) 在密钥源线程中被反复调用，返回None表示数据结束；slot取自
+    slots资源池（如复用的批次缓冲区），调用方处理完最终结果后用 recycle()
+    归还。迭代Pipeline在调用线程中依次得到最后一个阶段的输出（结果处理阶段），
+    提前退出迭代或调用close()会停止所有线程。
+    """
+
+    def __init__(self, source: Callable[[Any], Any], stages: List[Stage],
+                 slots: Iterable[Any], queue_size: int = 4, source_name: str = "source",
+                 sink_name: str = "sink"):
+        self.source = source
+        self.stages = list(stages)
+        self._slots = queue.Queue()
+        for slot in slots:
+            self._slots.put(slot)
+        self._queues = [queue.Queue(maxsize=queue_size) for _ in range(len(self.stages) + 1)]
+        self._metrics = [StageMetrics(source_name, 1)] + [StageMetrics(s.name, s.workers) for s in self.stages]
+        self._sink_metrics = StageMetrics(sink_name, 1)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._remaining = [stage.workers for stage in self.stages]
+        self._remaining_lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        self._start_time = None
+
+    # ---- 阻塞队列操作（定期检查停止信号） ----
+
+    def _get(self, q: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=_POLL)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    # ---- 工作线程 ----
+
+    def _run_source(self):
+        metrics, out = self._metrics[0], self._queues[0]
+        perf = time.perf_counter
+        try:
+            while True:
+                start = perf()
+                slot = self._get(self._slots)
+                if slot is _END:
+                    return
+                got = perf()
+                item = self.source(slot)
+                done = perf()
+                if item is None:
+                    self._slots.put(slot)
+                    break
+                if not self._put(out, item):
+                    return
+                metrics.record(done - got, perf() - done, got - start)
+            self._put(out, _END)
+        except BaseException as e:
+            self._fail(e)
+
+    def _run_stage(self, index: int):
+        stage, metrics = self.stages[index], self._metrics[index + 1]
+        inbox, out = self._queues[index], self._queues[index + 1]
+        perf = time.perf_counter
+        try:
+            while True:
+                start = perf()
+                item = self._get(inbox)
+                if item is _END:
+                    break
+                got = perf()
+                depth = inbox.qsize()
+                result = stage.func(item)
+                done = perf()
+                if not self._put(out, result):
+                    return
+                metrics.record(done - got, perf() - done, got - start, depth)
+            if self._stop.is_set():
+                return
+            # 通知同阶段的其他工作线程，最后一个退出的线程向下游转发结束标记
+            self._put(inbox, _END)
+            with self._remaining_lock:
+                self._remaining[index] -= 1
+                last = self._remaining[index] == 0
+            if last:
+                self._put(out, _END)
+        except BaseException as e:
+            self._fail(e)
+
+    def _fail(self, error: BaseException):
+        if self._error is None:
+            self._error = error
+        self._stop.set()
+
+    # ---- 控制 ----
+
+    def start(self) -> 'Pipeline':
+        if self._threads:
+            return self
+        self._start_time = time.perf_counter()
+        self._threads.append(threading.Thread(target=self._run_source, name="pipeline-source", daemon=True))
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                self._threads.append(threading.Thread(
+                    target=self._run_stage, args=(index,), name=f"pipeline-{stage.name}-{n}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def close(self):
+        """停止所有阶段并等待线程退出"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self) -> 'Pipeline':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __iter__(self):
+        self.start()
+        final = self._queues[-1]
+        perf = time.perf_counter
+        while True:
+            start = perf()
+            item = self._get(final)
+            if item is _END:
+                break
+            got = perf()
+            depth = final.qsize()
+            yield item
+            self._sink_metrics.record(perf() - got, 0.0, got - start, depth)
+        if self._error is not None:
+            raise self._error
+
+    def recycle(self, slot):
+        """归还处理完的资源槽位"""
+        self._slots.put(slot)
+
+    # ---- 统计 ----
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        """各阶段统计（按流水线顺序，最后一项为结果处理阶段）"""
+        elapsed = time.perf_counter() - self._start_time if self._start_time else 0.0
+        return [m.snapshot(elapsed) for m in self._metrics + [self._sink_metrics]]
+
+    def bottleneck(self) -> str:
+        """利用率最高（最忙）的阶段"""
+        return max(self.metrics(), key=lambda m: m['utilization'])['stage']
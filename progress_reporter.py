@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度报告线程
+热循环只累加计数器并把命中结果放入队列；独立线程按固定间隔采样计数器，
+负责tqdm进度条、滚动速率窗口和命中结果的显示
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from tqdm import tqdm
+
+
+class ProgressReporter:
+    """独立的进度报告线程
+
+    热循环直接修改 checked / found 两个普通计数器，并通过 hit() 提交命中
+    结果；quiet模式下不启动线程，也不产生任何终端输出。eta(检查速率) 返回
+    剩余秒数时替代按已找到数量外推的剩余时间。
+    """
+
+    def __init__(self,
+                 target: Optional[int] = None,
+                 total: Optional[int] = None,
+                 desc: str = "已检查",
+                 unit: str = "addr",
+                 interval: float = 0.5,
+                 rate_window: float = 10.0,
+                 quiet: bool = False,
+                 format_hit: Callable[[object], List[str]] = None,
+                 postfix: Callable[[], Dict[str, object]] = None,
+                 eta: Callable[[float], Optional[float]] = None):
+        self.checked = 0
+        self.found = 0
+        self.target = target
+        self.total = total
+        self.desc = desc
+        self.unit = unit
+        self.interval = interval
+        self.rate_window = rate_window
+        self.quiet = quiet
+        self.start_time = time.time()
+        self._format_hit = format_hit or (lambda hit: [str(hit)])
+        self._postfix = postfix
+        self._eta = eta
+        self._messages = queue.Queue()
+        self._samples = deque([(self.start_time, 0)])  # (采样时间, checked)
+        self._reported = 0
+        self._rate = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._pbar = None
+
+    def __enter__(self) -> 'ProgressReporter':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self) -> 'ProgressReporter':
+        if self.quiet or self._thread is not None:
+            return self
+        self._pbar = tqdm(total=self.total, desc=self.desc, unit=self.unit, dynamic_ncols=True)
+        self._thread = threading.Thread(target=self._run, name="progress-reporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止报告线程，并输出最后一次采样"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._tick()
+        self._pbar.close()
+
+    def hit(self, item):
+        """提交一个命中结果（由报告线程格式化显示）"""
+        if not self.quiet:
+            self._messages.put(('hit', item))
+
+    def write(self, message: str):
+        """提交一行普通信息"""
+        if not self.quiet:
+            self._messages.put(('msg', message))
+
+    @property
+    def rate(self) -> float:
+        """滚动窗口内的检查速率（地址/秒）"""
+        return self._rate
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._tick()
+
+    def _tick(self):
+        now = time.time()
+        checked = self.checked
+        found = self.found
+        if checked > self._reported:
+            self._pbar.update(checked - self._reported)
+            self._reported = checked
+
+        # 滚动速率窗口
+        self._samples.append((now, checked))
+        while len(self._samples) > 2 and now - self._samples[0][0] > self.rate_window:
+            self._samples.popleft()
+        first_time, first_checked = self._samples[0]
+        if now > first_time:
+            self._rate = (checked - first_checked) / (now - first_time)
+
+        while True:
+            try:
+                kind, item = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            lines = self._format_hit(item) if kind == 'hit' else [item]
+            for line in lines:
+                self._pbar.write(line)
+
+        elapsed = now - self.start_time
+        postfix = {
+            "elapsed": self._format_duration(elapsed),
+            "rate": f"{self._rate:,.0f}/s",
+        }
+        if self.target is not None:
+            if self._eta is not None:
+                eta = self._eta(self._rate)
+            else:
+                found_rate = found / elapsed if elapsed > 0 else 0
+                eta = (self.target - found) / found_rate if found_rate > 0 else 0
+            postfix["eta"] = self._format_duration(eta) if eta is not None else "--:--"
+            postfix["found"] = f"{found}/{self.target}"
+        if self._postfix is not None:
+            postfix.update(self._postfix())
+        self._pbar.set_description(f"{self.desc} {checked:,}")
+        self._pbar.set_postfix(postfix)
+
+    @staticmethod
+    def _format_duration(seconds: float) -> str:
+        """格式化时长显示"""
+        seconds = max(0, int(seconds))
+        hours = seconds // 3600
+        minutes = (seconds % 3600) // 60
+        secs = seconds % 60
+        if hours > 0:
+            return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+        return f"{minutes:02d}:{secs:02d}"
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内置RIPEMD-160
+OpenSSL 3 把RIPEMD-160移到了legacy provider，部分主机上 hashlib.new('ripemd160')
+不可用。本模块提供纯Python单条实现和NumPy整批实现（(N, L) 等长消息一次完成），
+导入时用已知答案向量自检；hashlib版本缺失时自动改用内置实现，整批接口在
+首次调用时实测hashlib逐条计算与NumPy内核的速度，选择较快的一个。
+"""
+
+import argparse
+import hashlib
+import struct
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+# RIPEMD-160规范中的已知答案向量 (消息, 摘要hex)
+KNOWN_ANSWERS: List[Tuple[bytes, str]] = [
+    (b"", "9c1185a5c5e9fc54612808977ee8f548b2258d31"),
+    (b"a", "0bdc9d2d256b3ee9daae347be6f4dc835a467ffe"),
+    (b"abc", "8eb208f7e05d987a9b044a8e98c6b087f15a0bfc"),
+    (b"message digest", "5d0689ef49d2fae572b881b123a85ffa21595f36"),
+    (b"abcdefghijklmnopqrstuvwxyz", "f71c27109c692c1b56bbdceb5b9d2865b3708dbc"),
+    (b"abcdbcdecdefdefgefghfghighijhijkijkljklmklmnlmnomnopnopq", "12a053384a9c0c88e405a06c27dcf49ada62eb2b"),
+    (b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789", "b0e20b6e3116640286ed3a87a5713079b21f5189"),
+    (b"1234567890" * 8, "9b752e45573d4b39f4dbd3323cab82bf63326bfb"),
+]
+
+_H0 = (0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0)
+
+# 左/右两条线每一步使用的消息字下标和循环左移位数
+_R_LEFT = (
+    0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+    7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8,
+    3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12,
+    1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2,
+    4, 0, 5, 9, 7, 12, 2, 10, 14, 1, 3, 8, 11, 6, 15, 13,
+)
+_R_RIGHT = (
+    5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12,
+    6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2,
+    15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13,
+    8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14,
+    12, 15, 10, 4, 1, 5, 8, 7, 6, 2, 13, 14, 0, 3, 9, 11,
+)
+_S_LEFT = (
+    11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8,
+    7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12,
+    11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5,
+    11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12,
+    9, 15, 5, 11, 6, 8, 13, 12, 5, 12, 13, 14, 11, 8, 5, 6,
+)
+_S_RIGHT = (
+    8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6,
+    9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11,
+    9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5,
+    15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8,
+    8, 5, 12, 9, 12, 5, 14, 6, 8, 13, 6, 5, 15, 13, 11, 11,
+)
+_K_LEFT = (0x00000000, 0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC, 0xA953FD4E)
+_K_RIGHT = (0x50A28BE6, 0x5C4DD124, 0x6D703EF3, 0x7A6D76E9, 0x00000000)
+
+_MASK = 0xFFFFFFFF
+
+
+def _pad(length: int) -> bytes:
+    """MD风格填充：0x80、补零、64位小端比特长度"""
+    return b"\x80" + b"\x00" * ((55 - length) % 64) + struct.pack("<Q", length * 8)
+
+
+# ---- 纯Python单条实现 ----
+
+def _f(j: int, x: int, y: int, z: int) -> int:
+    if j < 16:
+        return x ^ y ^ z
+    if j < 32:
+        return (x & y) | (~x & z)
+    if j < 48:
+        return (x | ~y) ^ z
+    if j < 64:
+        return (x & z) | (y & ~z)
+    return x ^ (y | ~z)
+
+
+def _rol(x: int, s: int) -> int:
+    return ((x << s) | (x >> (32 - s))) & _MASK
+
+
+def ripemd160_python(data: bytes) -> bytes:
+    """纯Python RIPEMD-160"""
+    message = data + _pad(len(data))
+    h0, h1, h2, h3, h4 = _H0
+    for offset in range(0, len(message), 64):
+        x = struct.unpack("<16I", message[offset:offset + 64])
+        al, bl, cl, dl, el = h0, h1, h2, h3, h4
+        ar, br, cr, dr, er = h0, h1, h2, h3, h4
+        for j in range(80):
+            t = _rol((al + _f(j, bl, cl, dl) + x[_R_LEFT[j]] + _K_LEFT[j >> 4]) & _MASK, _S_LEFT[j]) + el
+            al, el, dl, cl, bl = el, dl, _rol(cl, 10), bl, t & _MASK
+            t = _rol((ar + _f(79 - j, br, cr, dr) + x[_R_RIGHT[j]] + _K_RIGHT[j >> 4]) & _MASK, _S_RIGHT[j]) + er
+            ar, er, dr, cr, br = er, dr, _rol(cr, 10), br, t & _MASK
+        h0, h1, h2, h3, h4 = ((h1 + cl + dr) & _MASK, (h2 + dl + er) & _MASK, (h3 + el + ar) & _MASK,
+                              (h4 + al + br) & _MASK, (h0 + bl + cr) & _MASK)
+    return struct.pack("<5I", h0, h1, h2, h3, h4)
+
+
+# ---- NumPy整批实现 ----
+
+def _f_batch(j: int, x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    if j < 16:
+        return x ^ y ^ z
+    if j < 32:
+        return (x & y) | (~x & z)
+    if j < 48:
+        return (x | ~y) ^ z
+    if j < 64:
+        return (x & z) | (y & ~z)
+    return x ^ (y | ~z)
+
+
+def _rol_batch(x: np.ndarray, s: int) -> np.ndarray:
+    return (x << np.uint32(s)) | (x >> np.uint32(32 - s))
+
+
+def ripemd160_numpy(messages: np.ndarray) -> np.ndarray:
+    """(N, L) uint8等长消息 -> (N, 20) uint8摘要（每一步对整批的uint32数组运算）"""
+    n, length = messages.shape
+    pad = np.frombuffer(_pad(length), dtype=np.uint8)
+    blocks = np.empty((n, length + pad.size), dtype=np.uint8)
+    blocks[:, :length] = messages
+    blocks[:, length:] = pad
+    words = blocks.view("<u4").astype(np.uint32)
+    h = [np.full(n, v, dtype=np.uint32) for v in _H0]
+    k_left = [np.uint32(k) for k in _K_LEFT]
+    k_right = [np.uint32(k) for k in _K_RIGHT]
+    for offset in range(0, words.shape[1], 16):
+        x = [words[:, offset + i] for i in range(16)]
+        al, bl, cl, dl, el = h
+        ar, br, cr, dr, er = h
+        for j in range(80):
+            t = _rol_batch(al + _f_batch(j, bl, cl, dl) + x[_R_LEFT[j]] + k_left[j >> 4], _S_LEFT[j]) + el
+            al, el, dl, cl, bl = el, dl, _rol_batch(cl, 10), bl, t
+            t = _rol_batch(ar + _f_batch(79 - j, br, cr, dr) + x[_R_RIGHT[j]] + k_right[j >> 4], _S_RIGHT[j]) + er
+            ar, er, dr, cr, br = er, dr, _rol_batch(cr, 10), br, t
+        h = [h[1] + cl + dr, h[2] + dl + er, h[3] + el + ar, h[4] + al + br, h[0] + bl + cr]
+    return np.stack(h, axis=1).astype("<u4").view(np.uint8)
+
+
+def _hashlib_ripemd160(data: bytes) -> bytes:
+    return hashlib.new("ripemd160", data).digest()
+
+
+def _hashlib_batch(messages: np.ndarray) -> np.ndarray:
+    """逐条调用hashlib的整批接口（与NumPy内核比较速度用）"""
+    new = hashlib.new
+    digests = b"".join(new("ripemd160", row.tobytes()).digest() for row in messages)
+    return np.frombuffer(digests, dtype=np.uint8).reshape(messages.shape[0], 20)
+
+
+def self_test(func: Callable[[bytes], bytes]) -> bool:
+    """用已知答案向量检查单条实现"""
+    try:
+        return all(func(message).hex() == digest for message, digest in KNOWN_ANSWERS)
+    except Exception:
+        return False
+
+
+def self_test_batch(func: Callable[[np.ndarray], np.ndarray]) -> bool:
+    """用已知答案向量检查整批实现（每个向量单独成批，另加一批32字节消息与单条实现对照）"""
+    try:
+        for message, digest in KNOWN_ANSWERS:
+            matrix = np.frombuffer(message, dtype=np.uint8).reshape(1, len(message))
+            if func(matrix)[0].tobytes().hex() != digest:
+                return False
+        sample = np.arange(8 * 32, dtype=np.uint8).reshape(8, 32)
+        return all(func(sample)[i].tobytes() == ripemd160_python(sample[i].tobytes()) for i in range(8))
+    except Exception:
+        return False
+
+
+if not self_test(ripemd160_python) or not self_test_batch(ripemd160_numpy):
+    raise ImportError("内置RIPEMD-160实现未通过已知答案向量自检")
+
+HASHLIB_RIPEMD160_AVAILABLE = self_test(_hashlib_ripemd160)
+
+# 单条接口：hashlib可用时使用C实现
+ripemd160: Callable[[bytes], bytes] = _hashlib_ripemd160 if HASHLIB_RIPEMD160_AVAILABLE else ripemd160_python
+
+_batch_backend = None
+
+
+def _time_per_row(func: Callable[[np.ndarray], np.ndarray], messages: np.ndarray, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(messages)
+        best = min(best, time.perf_counter() - start)
+    return best / messages.shape[0]
+
+
+def batch_backend(sample_rows: int = 4096) -> str:
+    """整批接口使用的实现（'hashlib' 或 'numpy'），首次调用时实测选择较快的一个"""
+    global _batch_backend
+    if _batch_backend is None:
+        if not HASHLIB_RIPEMD160_AVAILABLE:
+            _batch_backend = "numpy"
+        else:
+            sample = np.frombuffer(np.random.bytes(sample_rows * 32), dtype=np.uint8).reshape(sample_rows, 32)
+            numpy_cost = _time_per_row(ripemd160_numpy, sample)
+            hashlib_cost = _time_per_row(_hashlib_batch, sample)
+            _batch_backend = "numpy" if numpy_cost < hashlib_cost else "hashlib"
+    return _batch_backend
+
+
+def ripemd160_batch(messages: np.ndarray) -> np.ndarray:
+    """(N, L) uint8等长消息 -> (N, 20) uint8摘要"""
+    if batch_backend() == "numpy":
+        return ripemd160_numpy(messages)
+    return _hashlib_batch(messages)
+
+
+def main():
+    """自检并比较各实现的速度"""
+    parser = argparse.ArgumentParser(description='RIPEMD-160实现自检与速度对比')
+    parser.add_argument('--rows', type=int, default=4096, help='每批消息数 (32字节消息)')
+    args = parser.parse_args()
+
+    messages = np.frombuffer(np.random.bytes(args.rows * 32), dtype=np.uint8).reshape(args.rows, 32)
+    print(f"hashlib ripemd160: {'可用' if HASHLIB_RIPEMD160_AVAILABLE else '不可用'}")
+    print("已知答案向量: 内置实现全部通过")
+    candidates = [("numpy", ripemd160_numpy)]
+    if HASHLIB_RIPEMD160_AVAILABLE:
+        candidates.append(("hashlib", _hashlib_batch))
+    candidates.append(("python", lambda m: [ripemd160_python(row.tobytes()) for row in m[:256]]))
+    for name, func in candidates:
+        sample = messages if name != "python" else messages[:256]
+        print(f"  {name:<8} {_time_per_row(func, sample) * 1e6:8.2f} µs/条")
+    print(f"整批接口选择: {batch_backend(args.rows)}")
+
+
+if __name__ == "__main__":
+    main()
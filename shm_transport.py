@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享内存批次传输
+生产进程把原始批次（私钥、公钥、地址载荷）按固定布局直接写入
+multiprocessing.shared_memory 中的环形槽位，进程间队列只传递槽位下标，
+匹配进程直接在共享内存上构造NumPy视图，不经过pickle序列化。
+PickleTransport 以相同接口逐行pickle传输，用于基准对比。
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from batch_buffer import DEFAULT_BUFFER_ROWS
+
+# 字段布局：(字段名, 每行字节数)
+TRX_LAYOUT = (("key", 32), ("pubkey", 64), ("payload", 25))  # 私钥、未压缩公钥(去0x04)、版本+哈希+校验和
+ONION_LAYOUT = (("key", 32), ("pubkey", 32))                 # ed25519 seed、公钥
+
+SHM_RECEIVE_TIMEOUT = 30.0  # 消费方等待就绪槽位的最长时间（秒），超时视为生产进程异常
+_POLL = 0.05  # 生产进程检查停止信号的间隔（秒）
+
+Layout = Tuple[Tuple[str, int], ...]
+Fields = Dict[str, np.ndarray]
+
+
+class ShmRing:
+    """固定布局的共享内存槽位环
+
+    共slots个槽位，每个槽位rows行，槽位内各字段按layout顺序连续存放，
+    field(slot, name) 返回 (rows, width) 的uint8视图。由主进程创建，
+    生产进程用 attach(spec) 按名称连接同一块共享内存。
+    """
+
+    def __init__(self, slots: int, rows: int, layout: Layout, name: str = None):
+        self.slots = slots
+        self.rows = rows
+        self.layout = tuple(layout)
+        self.row_bytes = sum(width for _, width in self.layout)
+        self.slot_bytes = rows * self.row_bytes
+        self._owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self._owner, size=slots * self.slot_bytes)
+        flat = np.ndarray((slots * self.slot_bytes,), dtype=np.uint8, buffer=self.shm.buf)
+        self._views = []
+        for slot in range(slots):
+            offset = slot * self.slot_bytes
+            fields = {}
+            for field, width in self.layout:
+                size = rows * width
+                fields[field] = flat[offset:offset + size].reshape(rows, width)
+                offset += size
+            self._views.append(fields)
+
+    @property
+    def spec(self) -> tuple:
+        """在其他进程中连接本环所需的参数"""
+        return self.shm.name, self.slots, self.rows, self.layout
+
+    @classmethod
+    def attach(cls, spec: tuple) -> 'ShmRing':
+        name, slots, rows, layout = spec
+        return cls(slots, rows, layout, name=name)
+
+    def fields(self, slot: int, n: int = None) -> Fields:
+        """槽位中前n行的各字段视图"""
+        views = self._views[slot]
+        if n is None:
+            return views
+        return {field: view[:n] for field, view in views.items()}
+
+    def field(self, slot: int, name: str) -> np.ndarray:
+        return self._views[slot][name]
+
+    def close(self):
+        """断开共享内存（创建者同时删除）；外部仍持有视图时延迟到视图释放"""
+        self._views = []
+        try:
+            self.shm.close()
+        except BufferError:
+            pass
+        if self._owner:
+            self.shm.unlink()
+            self._owner = False
+
+
+def _shm_producer(spec: tuple, fill: Callable[[Fields], int], free_q, ready_q, stop):
+    """生产进程：取空闲槽位 → fill原地填充 → 把 (槽位, 行数) 放入就绪队列"""
+    ring = ShmRing.attach(spec)
+    try:
+        while not stop.is_set():
+            try:
+                slot = free_q.get(timeout=_POLL)
+            except queue.Empty:
+                continue
+            n = fill(ring.fields(slot))
+            ready_q.put((slot, n))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ready_q.cancel_join_thread()
+        ring.close()
+
+
+def _pickle_producer(spec: tuple, fill: Callable[[Fields], int], free_q, ready_q, stop):
+    """对照组生产进程：批次转换为逐行字节元组列表，经队列pickle传输"""
+    _, _, rows, layout = spec
+    local = {field: np.zeros((rows, width), dtype=np.uint8) for field, width in layout}
+    names = [field for field, _ in layout]
+    try:
+        while not stop.is_set():
+            try:
+                token = free_q.get(timeout=_POLL)
+            except queue.Empty:
+                continue
+            n = fill(local)
+            batch = [tuple(local[field][i].tobytes() for field in names) for i in range(n)]
+            ready_q.put((token, batch))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ready_q.cancel_join_thread()
+
+
+class ShmTransport:
+    """生产进程 → 匹配进程的共享内存批次传输
+
+    fill(fields) 在生产进程中原地填充一个槽位的各字段视图并返回行数，
+    必须可以pickle（模块级函数或可pickle对象的绑定方法）。消费方用
+    receive() 取得 (槽位, 字段视图)，处理完后 release(槽位) 归还；
+    视图在归还之前有效，需要保留的数据（如命中的私钥）要先复制出来。
+    """
+
+    _producer = staticmethod(_shm_producer)
+
+    def __init__(self, fill: Callable[[Fields], int], layout: Layout,
+                 rows: int = DEFAULT_BUFFER_ROWS, processes: int = 1, slots: int = None):
+        if processes < 1:
+            raise ValueError("生产进程数必须至少为1")
+        self.fill = fill
+        self.layout = tuple(layout)
+        self.rows = rows
+        self.processes = processes
+        self.slots = slots or processes * 3
+        self.received_rows = 0
+        self._ctx = multiprocessing.get_context("spawn")
+        self._ring: Optional[ShmRing] = None
+        self._workers = []
+        self._free_q = self._ready_q = self._stop = None
+
+    def _make_ring(self) -> tuple:
+        self._ring = ShmRing(self.slots, self.rows, self.layout)
+        return self._ring.spec
+
+    def start(self) -> 'ShmTransport':
+        if self._workers:
+            return self
+        spec = self._make_ring()
+        self._free_q = self._ctx.Queue()
+        self._ready_q = self._ctx.Queue()
+        self._stop = self._ctx.Event()
+        for slot in range(self.slots):
+            self._free_q.put(slot)
+        for n in range(self.processes):
+            worker = self._ctx.Process(target=self._producer, name=f"shm-producer-{n}", daemon=True,
+                                       args=(spec, self.fill, self._free_q, self._ready_q, self._stop))
+            worker.start()
+            self._workers.append(worker)
+        return self
+
+    def receive(self, timeout: float = None) -> Tuple[int, Fields]:
+        """取一个就绪槽位，返回 (槽位, 前n行的字段视图)"""
+        slot, n = self._ready_q.get(timeout=timeout)
+        self.received_rows += n
+        return slot, self._ring.fields(slot, n)
+
+    def release(self, slot: int):
+        """归还处理完的槽位，生产进程可以重新填充"""
+        self._free_q.put(slot)
+
+    def __iter__(self):
+        self.start()
+        while True:
+            yield self.receive()
+
+    def close(self):
+        """停止生产进程并释放共享内存"""
+        if not self._workers:
+            return
+        self._stop.set()
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        self._workers = []
+        for q in (self._free_q, self._ready_q):
+            q.cancel_join_thread()
+            q.close()
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+
+    def __enter__(self) -> 'ShmTransport':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PickleTransport(ShmTransport):
+    """对照组：接口与ShmTransport相同，批次以逐行元组列表pickle传输"""
+
+    _producer = staticmethod(_pickle_producer)
+
+    def _make_ring(self) -> tuple:
+        return None, self.slots, self.rows, self.layout
+
+    def receive(self, timeout: float = None) -> Tuple[int, Fields]:
+        token, batch = self._ready_q.get(timeout=timeout)
+        self.received_rows += len(batch)
+        fields = {}
+        for index, (field, width) in enumerate(self.layout):
+            blob = b"".join(row[index] for row in batch)
+            fields[field] = np.frombuffer(blob, dtype=np.uint8).reshape(len(batch), width)
+        return token, fields
+
+
+class RandomFill:
+    """只填充随机字节的生产函数，用于单独测量传输开销"""
+
+    def __call__(self, fields: Fields) -> int:
+        n = 0
+        for view in fields.values():
+            n = view.shape[0]
+            view[:] = np.frombuffer(os.urandom(view.size), dtype=np.uint8).reshape(view.shape)
+        return n
+
+
+def benchmark(fill: Callable[[Fields], int], layout: Layout, duration: float = 3.0,
+              processes: int = 1, rows: int = DEFAULT_BUFFER_ROWS,
+              consume: Callable[[Fields], None] = None) -> Dict[str, Dict[str, float]]:
+    """分别用共享内存和pickle传输运行duration秒，返回各自的行吞吐量和消费方耗时占比"""
+    results = {}
+    for label, transport_cls in (("shm", ShmTransport), ("pickle", PickleTransport)):
+        with transport_cls(fill, layout, rows=rows, processes=processes) as transport:
+            slot, fields = transport.receive()  # 等待生产进程启动
+            transport.release(slot)
+            transport.received_rows = 0
+            receive_time = 0.0
+            start = time.perf_counter()
+            while time.perf_counter() - start < duration:
+                before = time.perf_counter()
+                slot, fields = transport.receive()
+                receive_time += time.perf_counter() - before
+                if consume is not None:
+                    consume(fields)
+                transport.release(slot)
+            elapsed = time.perf_counter() - start
+            results[label] = {
+                'rows_per_s': transport.received_rows / elapsed,
+                'mb_per_s': transport.received_rows * sum(w for _, w in layout) / elapsed / 1e6,
+                'receive_share': receive_time / elapsed,
+            }
+    return results
+
+
+def main():
+    """共享内存与pickle传输的基准对比"""
+    parser = argparse.ArgumentParser(description='共享内存批次传输基准测试')
+    parser.add_argument('--generator', choices=['trx', 'onion'], default='trx',
+                        help='生成器（决定字段布局和生产函数）')
+    parser.add_argument('--raw', action='store_true',
+                        help='生产进程只填充随机字节，单独测量传输开销')
+    parser.add_argument('--processes', type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help='生产进程数')
+    parser.add_argument('--rows', type=int, default=DEFAULT_BUFFER_ROWS,
+                        help='每个槽位的行数')
+    parser.add_argument('--duration', type=float, default=3.0,
+                        help='每种传输的测量时长（秒）')
+    args = parser.parse_args()
+
+    if args.generator == 'onion':
+        from onion_finder import OnionVanityGenerator
+        layout = ONION_LAYOUT
+        fill = RandomFill() if args.raw else OnionVanityGenerator(use_gpu=False, quiet=True).fill_shm_slot
+    else:
+        from trx_vanity_address import TRXVanityGenerator
+        layout = TRX_LAYOUT
+        fill = RandomFill() if args.raw else TRXVanityGenerator(use_gpu=False, quiet=True).fill_shm_slot
+
+    print(f"🔬 {args.generator} 传输基准: {args.processes} 个生产进程, 每槽位 {args.rows} 行, "
+          f"{'随机字节' if args.raw else '真实派生'}")
+    results = benchmark(fill, layout, args.duration, args.processes, args.rows)
+    for label, r in results.items():
+        print(f"  {label:<6} {r['rows_per_s']:>12,.0f} 行/秒  {r['mb_per_s']:>8.1f} MB/s  "
+              f"接收耗时占比 {r['receive_share'] * 100:.1f}%")
+    speedup = results['shm']['rows_per_s'] / results['pickle']['rows_per_s']
+    print(f"  共享内存 / pickle: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
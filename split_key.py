@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分离密钥靓号生成
+客户在本地生成私钥a并只提供公钥A = a·G；算力节点搜索标量b，使 A + b·G 的地址
+匹配模式，只交回b。最终私钥 a + b (mod n) 由客户离线合成，算力节点始终看不到
+最终私钥，可以放心使用租用的不可信机器。
+
+搜索按增量游走进行：从随机起点b0开始按连续标量分段，每段内 P0 + j·G 使用
+预计算的 j·G 表做仿射点加，整段共用一次模逆（Montgomery批量求逆），
+每个候选只需要几次大整数乘法；相邻两段的起点之间只差一次点加。
+"""
+
+import argparse
+import secrets
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# secp256k1 曲线参数
+P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+G = (0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+     0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
+
+Point = Optional[Tuple[int, int]]  # None为无穷远点
+
+
+def point_add(a: Point, b: Point) -> Point:
+    """仿射坐标点加"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a[0] == b[0]:
+        if (a[1] + b[1]) % P == 0:
+            return None
+        lam = 3 * a[0] * a[0] * pow(2 * a[1], -1, P) % P
+    else:
+        lam = (b[1] - a[1]) * pow(b[0] - a[0], -1, P) % P
+    x = (lam * lam - a[0] - b[0]) % P
+    return x, (lam * (a[0] - x) - a[1]) % P
+
+
+def point_mul(k: int, point: Point = G) -> Point:
+    """标量乘（二进制展开，每个分块只用一次）"""
+    result = None
+    addend = point
+    k %= N
+    while k:
+        if k & 1:
+            result = point_add(result, addend)
+        addend = point_add(addend, addend)
+        k >>= 1
+    return result
+
+
+def parse_public_key(data: bytes) -> Tuple[int, int]:
+    """解析SEC1公钥（65字节非压缩或33字节压缩，也接受去掉0x04的64字节）"""
+    if len(data) == 64:
+        data = b'\x04' + data
+    if len(data) == 65 and data[0] == 0x04:
+        x, y = int.from_bytes(data[1:33], 'big'), int.from_bytes(data[33:], 'big')
+    elif len(data) == 33 and data[0] in (0x02, 0x03):
+        x = int.from_bytes(data[1:], 'big')
+        y = pow((x * x * x + 7) % P, (P + 1) // 4, P)
+        if y & 1 != data[0] & 1:
+            y = P - y
+    else:
+        raise ValueError("公钥必须是33字节压缩或65字节非压缩的SEC1格式")
+    if x >= P or y >= P or (y * y - x * x * x - 7) % P != 0:
+        raise ValueError("公钥不在secp256k1曲线上")
+    return x, y
+
+
+def public_key_bytes(point: Tuple[int, int], compressed: bool = False) -> bytes:
+    x, y = point
+    if compressed:
+        return bytes([0x02 | (y & 1)]) + x.to_bytes(32, 'big')
+    return b'\x04' + x.to_bytes(32, 'big') + y.to_bytes(32, 'big')
+
+
+def combine_private_keys(private_key: bytes, partial_key: bytes) -> bytes:
+    """最终私钥 a + b (mod n)"""
+    total = (int.from_bytes(private_key, 'big') + int.from_bytes(partial_key, 'big')) % N
+    if total == 0:
+        raise ValueError("合成的私钥无效")
+    return total.to_bytes(32, 'big')
+
+
+class PointWalk:
+    """A + b·G 的批量增量游走
+
+    每次 fill() 取下一段连续标量 b0..b0+rows-1：P0 = A + b0·G 由上一段的起点加上
+    预计算的 rows·G 得到（只在开始时做一次标量乘），段内各点为 P0 + j·G，
+    使用预计算的 j·G 表做仿射点加，分母 (x_j - x_P0) 用Montgomery批量求逆，
+    整段共用一次模逆。多个派生线程可以同时调用 fill()。
+    """
+
+    def __init__(self, base: Tuple[int, int], rows: int, start: int = None):
+        self.base = base
+        self.rows = rows
+        self._offsets: List[Tuple[int, int]] = [G]  # j·G，j = 1..rows-1
+        for _ in range(rows - 2):
+            self._offsets.append(point_add(self._offsets[-1], G))
+        self._stride = point_mul(rows)
+        self._lock = threading.Lock()
+        self._seek(start)
+
+    def _seek(self, start: int = None):
+        """从新的起点（默认随机）开始游走，保证整段标量不越过n"""
+        while True:
+            self._start = start if start is not None else 1 + secrets.randbelow(N - 2 * self.rows)
+            self._point = point_add(self.base, point_mul(self._start))
+            if self._point is not None:
+                return
+            start = None
+
+    def _take(self) -> Tuple[int, Tuple[int, int]]:
+        with self._lock:
+            start, point = self._start, self._point
+            self._start += self.rows
+            self._point = point_add(self._point, self._stride)
+            if self._point is None or self._start + self.rows >= N:
+                self._seek()
+            return start, point
+
+    def fill(self, keys: np.ndarray, pubkeys: np.ndarray) -> bool:
+        """填充 len(keys) 行：keys为标量b的32字节大端编码，pubkeys为点的64字节 x||y
+
+        极少数情况下段内某个点与P0的x坐标相同（结果为无穷远点或需要倍点），
+        返回False，调用方丢弃这一段。
+        """
+        n = keys.shape[0]
+        start, (x0, y0) = self._take()
+        offsets = self._offsets[:n - 1]
+        # Montgomery批量求逆：prefix[i] = d_0 * ... * d_{i-1}
+        prefix = [1] * (len(offsets) + 1)
+        acc = 1
+        for i, (x, _) in enumerate(offsets):
+            d = x - x0
+            if d == 0:
+                return False
+            acc = acc * d % P
+            prefix[i + 1] = acc
+        inv = pow(acc, -1, P)
+        rows = [b''] * n
+        rows[0] = x0.to_bytes(32, 'big') + y0.to_bytes(32, 'big')
+        for i in range(len(offsets) - 1, -1, -1):
+            x, y = offsets[i]
+            lam = (y - y0) * inv * prefix[i] % P
+            inv = inv * (x - x0) % P
+            x3 = (lam * lam - x0 - x) % P
+            rows[i + 1] = x3.to_bytes(32, 'big') + ((lam * (x0 - x3) - y0) % P).to_bytes(32, 'big')
+        pubkeys[:n] = np.frombuffer(b''.join(rows), dtype=np.uint8).reshape(n, 64)
+        keys[:n] = np.frombuffer(b''.join((start + j).to_bytes(32, 'big') for j in range(n)),
+                                 dtype=np.uint8).reshape(n, 32)
+        return True
+
+
+def main():
+    """客户端工具：生成基础密钥对、合成最终私钥"""
+    parser = argparse.ArgumentParser(description='分离密钥靓号：客户端工具')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('new', help='生成基础私钥a和公钥A（A交给算力节点，a自己保存）')
+    combine = sub.add_parser('combine', help='用算力节点返回的部分私钥b合成最终私钥')
+    combine.add_argument('--private-key', required=True, help='基础私钥a（hex）')
+    combine.add_argument('--partial-key', required=True, help='部分私钥b（hex）')
+    args = parser.parse_args()
+
+    if args.command == 'new':
+        private_key = secrets.randbelow(N - 1) + 1
+        public_key = public_key_bytes(point_mul(private_key))
+        print(f"基础私钥 a（保密）: {private_key.to_bytes(32, 'big').hex()}")
+        print(f"基础公钥 A（交给算力节点 --split-key）: {public_key.hex()}")
+        return
+
+    from trx_vanity_address import TRXVanityGenerator
+    final_key = combine_private_keys(bytes.fromhex(args.private_key), bytes.fromhex(args.partial_key))
+    generator = TRXVanityGenerator(use_gpu=False, quiet=True)
+    print(f"最终私钥: {final_key.hex()}")
+    print(f"地址: {generator._private_key_to_address(final_key)}")
+
+
+if __name__ == "__main__":
+    main()
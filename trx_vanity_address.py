@@ -6,20 +6,36 @@ TRX靓号地址生成器
 """
 
 import hashlib
+import heapq
+import math
 import base58
 import ecdsa
 import time
 import json
 import os
-from typing import List, Tuple
-from dataclasses import dataclass
+import re
+import threading
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 import argparse
+import asyncio
 import sys
 
+from affix_index import AffixIndex
+from match_plugins import PluginSet
+from batch_buffer import DEFAULT_BUFFER_ROWS, BatchBuffer
+from batch_matcher import BatchPatternMatcher
+from config_manager import ConfigManager, PatternWatcher
+from pipeline import Pipeline, Stage
+from progress_reporter import ProgressReporter
+from ripemd160 import ripemd160_batch
+from shm_transport import SHM_RECEIVE_TIMEOUT, TRX_LAYOUT, ShmTransport
+from split_key import PointWalk, parse_public_key
+from vanity_inventory import DEFAULT_INVENTORY, InventorySink, VanityInventory
+
 try:
     import numpy as np
-    from tqdm import tqdm
     from colorama import init, Fore, Style
     init(autoreset=True)
     from Crypto.Hash import keccak
@@ -61,6 +77,154 @@ except ImportError as e:
     print("请运行: pip install -r requirements.txt")
     sys.exit(1)
 
+PIPELINE_QUEUE_SIZE = 4  # 流水线各阶段之间的队列长度（以分块计）
+TRX_ADDRESS_LENGTH = 34  # 0x41版本字节 + 20字节Keccak哈希 + 4字节校验和的Base58编码
+TRX_ADDRESS_VERSION = 0x41
+BTC_ADDRESS_VERSION = 0x00  # P2PKH主网
+BTC_BODY_LENGTH = 33        # 常见P2PKH地址去掉开头 '1' 后的长度（其余约4%较短，逐个匹配）
+ETH_BODY_LENGTH = 40        # 去掉 '0x' 后的小写十六进制字符
+SUPPORTED_CHAINS = ("trx", "eth", "btc")
+_CHAIN_PREFIX_LENGTH = {"trx": 1, "eth": 2, "btc": 1}  # 模式匹配时跳过的地址前缀长度
+
+_B58_ALPHABET = np.frombuffer(base58.alphabet, dtype=np.uint8)
+_HEX_ALPHABET = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_B58_INDEX = {c: i for i, c in enumerate(base58.alphabet.decode('ascii'))}
+
+
+def longest_palindrome(text: str) -> int:
+    """最长回文子串的长度（Manacher算法，线性时间）"""
+    padded = '^#' + '#'.join(text) + '#$'
+    radius = [0] * len(padded)
+    center = right = 0
+    for i in range(1, len(padded) - 1):
+        if i < right:
+            radius[i] = min(right - i, radius[2 * center - i])
+        while padded[i + radius[i] + 1] == padded[i - radius[i] - 1]:
+            radius[i] += 1
+        if i + radius[i] > right:
+            center, right = i, i + radius[i]
+    return max(radius)
+
+
+def longest_step_run(text: str, step: int) -> int:
+    """按Base58字母表顺序每步前进step的最长连续段长度（1为递增，-1为递减；单次遍历）"""
+    best = run = 1 if text else 0
+    previous = None
+    for c in text:
+        index = _B58_INDEX.get(c)
+        if previous is not None and index is not None and index - previous == step:
+            run += 1
+            if run > best:
+                best = run
+        else:
+            run = 1
+        previous = index
+    return best
+
+
+def _base58_matrix(raw: np.ndarray, chars: int) -> np.ndarray:
+    """(N, bytes) uint8 -> (N, chars) 定宽Base58字符矩阵（整批做大数除法）
+
+    每行按3字节一组转换成24位整数数组，对58逐位长除；结果不足chars位时
+    高位补 '1'，与base58编码前导零字节的规则一致。
+    """
+    n, width = raw.shape
+    pad = -width % 3
+    padded = np.zeros((n, width + pad), dtype=np.int64)
+    padded[:, pad:] = raw
+    groups = padded.reshape(n, -1, 3)
+    limbs = (groups[:, :, 0] << 16) | (groups[:, :, 1] << 8) | groups[:, :, 2]
+    digits = np.empty((n, chars), dtype=np.int64)
+    for pos in range(chars - 1, -1, -1):
+        rem = np.zeros(n, dtype=np.int64)
+        for j in range(limbs.shape[1]):
+            limbs[:, j], rem = np.divmod((rem << 24) | limbs[:, j], 58)
+        digits[:, pos] = rem
+    return _B58_ALPHABET[digits]
+
+
+def pattern_probability(pattern: str, length: int = TRX_ADDRESS_LENGTH - 1, alphabet: int = 58) -> float:
+    """长度为length、字符等概率的随机地址主体匹配pattern的近似概率（用于估计剩余时间）"""
+    if pattern.startswith('ends_consecutive_'):
+        count = int(pattern.split('_')[-1])
+        return 0.0 if count > length else float(alphabet) ** -max(0, count - 1)
+    if pattern.startswith('consecutive_'):
+        count = int(pattern.split('_')[1])
+        if count > length:
+            return 0.0
+        return 1.0 - (1.0 - float(alphabet) ** -max(0, count - 1)) ** (length - max(count, 1) + 1)
+    if pattern.startswith('palindrome_'):
+        # 存在长度≥N的回文 ⇔ 存在长度为N或N+1的回文窗口
+        count = int(pattern.split('_')[1])
+        if count > length:
+            return 0.0
+        if count <= 1:
+            return 1.0
+        miss = 1.0
+        for k in (count, count + 1):
+            miss *= (1.0 - float(alphabet) ** -(k // 2)) ** max(0, length - k + 1)
+        return 1.0 - miss
+    if pattern.startswith(('ascending_', 'descending_')):
+        count = int(pattern.split('_')[1])
+        if count > min(length, alphabet):
+            return 0.0
+        if count <= 1:
+            return 1.0
+        # 首字符须留出N-1步的余量，其后每个字符各有1/alphabet的概率恰好前进一步
+        window = (alphabet - count + 1) / alphabet * float(alphabet) ** -(count - 1)
+        return 1.0 - (1.0 - window) ** (length - count + 1)
+    if pattern.startswith('repeat_'):
+        count = int(pattern.split('_')[2])
+        p = 1.0 / alphabet
+        return min(1.0, sum(math.comb(length, i) * p ** i * (1 - p) ** (length - i)
+                            for i in range(max(0, count), length + 1)))
+    text = pattern.split('_', 1)[1] if pattern.startswith('custom_') else pattern
+    if not text:
+        return 1.0
+    windows = length - len(text) + 1
+    return 0.0 if windows <= 0 else 1.0 - (1.0 - float(alphabet) ** -len(text)) ** windows
+
+
+_CHAIN_ALPHABETS = {"trx": base58.alphabet.decode('ascii'), "btc": base58.alphabet.decode('ascii'),
+                    "eth": "0123456789abcdef"}
+
+
+def pattern_syntax_ok(pattern: str, chain: str = "trx") -> bool:
+    """只检查模式语法能否被匹配器解析，字符须属于该链地址的字母表
+
+    （TRX/BTC为Base58，ETH为小写十六进制）；不限制长度和次数的取值范围。
+    递增/递减按Base58字母表顺序定义，ETH不支持。
+    """
+    alphabet = _CHAIN_ALPHABETS[chain]
+    for prefix in ('ends_consecutive_', 'consecutive_', 'palindrome_', 'ascending_', 'descending_'):
+        if pattern.startswith(prefix):
+            if prefix in ('ascending_', 'descending_') and chain == 'eth':
+                return False
+            return pattern[len(prefix):].isdigit()
+    if pattern.startswith('repeat_'):
+        parts = pattern.split('_')
+        return len(parts) == 3 and len(parts[1]) == 1 and parts[1] in alphabet and parts[2].isdigit()
+    text = pattern.split('_', 1)[1] if pattern.startswith('custom_') else pattern
+    return bool(text) and all(c in alphabet for c in text)
+
+
+def parse_pattern_quotas(spec: str) -> Dict[str, int]:
+    """解析每模式数量，如 "consecutive_3:5,consecutive_6:1" -> {模式: 数量}"""
+    quotas = {}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        pattern, sep, count = item.rpartition(':')
+        if not sep or not pattern or not count.isdigit() or int(count) < 1:
+            raise ValueError(f"无效的模式数量 {item!r}，格式为 模式:数量")
+        if pattern in quotas:
+            raise ValueError(f"模式 {pattern} 重复指定数量")
+        quotas[pattern] = int(count)
+    if not quotas:
+        raise ValueError("至少需要一个 模式:数量")
+    return quotas
+
 @dataclass
 class VanityAddress:
     """靓号地址数据类"""
@@ -70,11 +234,185 @@ class VanityAddress:
     pattern: str = ""
     score: int = 0
     timestamp: float = 0.0
+    chain: str = "trx"  # trx / eth / btc（多链模式）
+    partial_key: str = ""  # 分离密钥模式的部分私钥b（private_key为空，最终私钥为 a + b）
+
+@dataclass
+class Order:
+    """一个客户订单：模式集合与需要交付的地址数量"""
+    order_id: str
+    patterns: List[str]
+    quota: int
+    addresses: List[VanityAddress] = field(default_factory=list)
+    scanned: int = 0  # 本次扫描（而非库存）交付的数量
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.quota - len(self.addresses))
+
+class OrderBook:
+    """共享同一个密钥流的订单簿
+
+    所有未完成订单的模式合并编译成一个匹配器；命中按订单加入顺序交给第一个
+    有模式匹配且未满额的订单（同一个私钥只交付一次）。订单满额或新增订单时
+    version递增，匹配阶段据此重新编译，只保留仍有订单需要的模式。
+    """
+
+    def __init__(self):
+        self.orders: Dict[str, Order] = {}
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def add(self, order_id: str, patterns: List[str], quota: int) -> Order:
+        if order_id in self.orders:
+            raise ValueError(f"订单 {order_id} 已存在")
+        if not patterns or quota < 1:
+            raise ValueError(f"订单 {order_id} 需要至少一个模式且数量至少为1")
+        order = Order(order_id, list(patterns), quota)
+        with self._lock:
+            self.orders[order_id] = order
+            self.version += 1
+        return order
+
+    @classmethod
+    def from_file(cls, filename: str) -> 'OrderBook':
+        """从JSON文件加载订单：[{"id": ..., "patterns": [...], "quota": N}, ...]"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        book = cls()
+        for entry in entries:
+            book.add(str(entry['id']), entry['patterns'], int(entry.get('quota', 1)))
+        return book
+
+    @classmethod
+    def from_quotas(cls, quotas: Dict[str, int]) -> 'OrderBook':
+        """每个模式一个订单（订单号即模式）
+
+        按估计概率从难到易排列，同时匹配多个模式的命中优先交给更难的模式，
+        例如 consecutive_6 的命中不会被 consecutive_3 占用。
+        """
+        book = cls()
+        for pattern in sorted(quotas, key=pattern_probability):
+            book.add(pattern, [pattern], quotas[pattern])
+        return book
+
+    def open_orders(self) -> List[Order]:
+        return [order for order in self.orders.values() if order.remaining > 0]
+
+    @property
+    def done(self) -> bool:
+        return not self.open_orders()
+
+    @property
+    def quota(self) -> int:
+        return sum(order.quota for order in self.orders.values())
+
+    @property
+    def filled(self) -> int:
+        return sum(len(order.addresses) for order in self.orders.values())
+
+    def active_patterns(self) -> List[str]:
+        """未完成订单的模式（去重，保持订单顺序）"""
+        patterns = []
+        for order in self.open_orders():
+            patterns.extend(p for p in order.patterns if p not in patterns)
+        return patterns
+
+    def route(self, vanity_addr: VanityAddress, body: str,
+              matches: Callable[[str, str], bool]) -> Optional[Order]:
+        """把命中交给第一个匹配且未满额的订单（pattern改为该订单匹配的模式），没有则返回None"""
+        with self._lock:
+            for order in self.open_orders():
+                pattern = next((p for p in order.patterns if matches(body, p)), None)
+                if pattern is None:
+                    continue
+                vanity_addr.pattern = pattern
+                order.addresses.append(vanity_addr)
+                order.scanned += 1
+                if order.remaining == 0:
+                    self.version += 1
+                return order
+        return None
+
+    def eta(self, rate: float, checked: int) -> Optional[float]:
+        """所有订单满额的预计剩余时间（秒），无法估计时返回None
+
+        取各未完成订单 剩余数量 / (检查速率 × 命中概率) 的最大值；订单已有至少
+        3个扫描命中时用实测命中率，否则用其模式的估计概率。
+        """
+        if rate <= 0:
+            return None
+        worst = 0.0
+        for order in self.open_orders():
+            if order.scanned >= 3 and checked > 0:
+                probability = order.scanned / checked
+            else:
+                miss = 1.0
+                for pattern in order.patterns:
+                    miss *= 1.0 - pattern_probability(pattern)
+                probability = 1.0 - miss
+            if probability <= 0:
+                return None
+            worst = max(worst, order.remaining / (rate * probability))
+        return worst
+
+class PatternMatcher:
+    """编译后的靓号模式匹配器
+
+    只用于确定批量匹配（BatchPatternMatcher）命中行匹配的第一个模式：命中行很少，
+    按声明顺序逐个检查即可，自适应求值顺序只在整批匹配中进行。
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = list(patterns)
+        self._checks = [self._compile(p) for p in self.patterns]
+
+    @staticmethod
+    def _compile(pattern: str) -> Callable[[str], bool]:
+        """把单个模式编译成 address -> bool 的检查函数（语义与 _matches_pattern 一致）"""
+        if pattern.startswith('ends_consecutive_'):
+            count = int(pattern.split('_')[-1])
+
+            def check(address: str) -> bool:
+                tail = address[-count:]
+                return len(tail) == count and len(set(tail)) == 1
+            return check
+        if pattern.startswith('consecutive_'):
+            count = int(pattern.split('_')[1])
+            if count <= 0:
+                return lambda address: False
+            regex = re.compile(r'(.)\1{%d}' % (count - 1), re.DOTALL)
+            return lambda address: regex.search(address) is not None
+        if pattern.startswith('repeat_'):
+            digit = pattern.split('_')[1]
+            count = int(pattern.split('_')[2])
+            if len(digit) != 1:
+                return lambda address: 0 >= count
+            return lambda address: address.count(digit) >= count
+        if pattern.startswith('palindrome_'):
+            count = int(pattern.split('_')[1])
+            return lambda address: longest_palindrome(address) >= count
+        if pattern.startswith(('ascending_', 'descending_')):
+            step = 1 if pattern.startswith('ascending_') else -1
+            count = int(pattern.split('_')[1])
+            return lambda address: longest_step_run(address, step) >= count
+        if pattern.startswith('custom_'):
+            custom = pattern.split('_', 1)[1]
+            return lambda address: custom in address
+        return lambda address: pattern in address
+
+    def match(self, address: str) -> int:
+        """返回声明顺序中第一个匹配的模式下标，不匹配返回-1"""
+        for idx, check in enumerate(self._checks):
+            if check(address):
+                return idx
+        return -1
 
 class TRXVanityGenerator:
     """TRX靓号地址生成器"""
     
-    def __init__(self, use_gpu: bool = True):
+    def __init__(self, use_gpu: bool = True, quiet: bool = False):
+        self.quiet = quiet
         self.use_gpu = use_gpu and self._check_gpu_availability()
         self.found_addresses = []
         self.stats = {
@@ -86,17 +424,22 @@ class TRXVanityGenerator:
         
         if self.use_gpu:
             gpu_info = self._get_gpu_info()
-            print(f"{Fore.GREEN}✓ GPU加速已启用{Style.RESET_ALL}")
+            self._log(f"{Fore.GREEN}✓ GPU加速已启用{Style.RESET_ALL}")
             if gpu_info:
-                print(f"{Fore.CYAN}GPU信息: {gpu_info}{Style.RESET_ALL}")
+                self._log(f"{Fore.CYAN}GPU信息: {gpu_info}{Style.RESET_ALL}")
         else:
-            print(f"{Fore.YELLOW}⚠ GPU不可用，使用CPU模式{Style.RESET_ALL}")
+            self._log(f"{Fore.YELLOW}⚠ GPU不可用，使用CPU模式{Style.RESET_ALL}")
 
         if COINCURVE_AVAILABLE:
-            print(f"{Fore.GREEN}✓ 使用coincurve快速CPU路径{Style.RESET_ALL}")
+            self._log(f"{Fore.GREEN}✓ 使用coincurve快速CPU路径{Style.RESET_ALL}")
         if TRONPY_AVAILABLE:
-            print(f"{Fore.GREEN}✓ 使用tronpy地址派生{Style.RESET_ALL}")
+            self._log(f"{Fore.GREEN}✓ 使用tronpy地址派生{Style.RESET_ALL}")
     
+    def _log(self, *args, **kwargs):
+        """输出提示信息（quiet模式下不输出）"""
+        if not self.quiet:
+            print(*args, **kwargs)
+
     def _check_gpu_availability(self) -> bool:
         """检查GPU可用性"""
         if not CUPY_AVAILABLE:
@@ -131,25 +474,23 @@ class TRXVanityGenerator:
     
     def _public_key_to_address(self, public_key: bytes) -> str:
         """从公钥生成TRX地址"""
+        # 组合并Base58编码
+        return base58.b58encode(self._public_key_to_payload(public_key)).decode('utf-8')
+
+    @staticmethod
+    def _public_key_to_payload(public_key: bytes) -> bytes:
+        """从公钥生成25字节地址载荷（版本字节 + Keccak-256后20字节 + 校验和）"""
         # TRON使用Keccak-256，对去掉0x04前缀的公钥进行哈希
         if len(public_key) == 65 and public_key[0] == 0x04:
             public_key = public_key[1:]
         sha3_hash = keccak.new(digest_bits=256, data=public_key).digest()
         
-        # RIPEMD160哈希
-        ripemd160_hash = hashlib.new('ripemd160', sha3_hash).digest()
-        
-        # 添加版本字节 (0x41 for TRX)
-        versioned_hash = b'\x41' + ripemd160_hash
+        # 添加版本字节 (0x41 for TRX)，地址哈希与以太坊相同，取Keccak-256的后20字节
+        versioned_hash = bytes([TRX_ADDRESS_VERSION]) + sha3_hash[-20:]
         
         # 双重SHA256校验和
         checksum = hashlib.sha256(hashlib.sha256(versioned_hash).digest()).digest()[:4]
-        
-        # 组合并Base58编码
-        binary_addr = versioned_hash + checksum
-        address = base58.b58encode(binary_addr).decode('utf-8')
-        
-        return address
+        return versioned_hash + checksum
 
     def _private_key_to_address(self, private_key: bytes) -> str:
         """从私钥生成TRX地址"""
@@ -160,7 +501,7 @@ class TRXVanityGenerator:
     
     def _check_vanity_pattern(self, address: str, patterns: List[str]) -> Tuple[bool, str, int]:
         """检查地址是否符合靓号模式"""
-        address_clean = address.replace('T', '')  # 移除T前缀
+        address_clean = address[1:] if address.startswith('T') else address  # 移除T前缀
         
         for pattern in patterns:
             if self._matches_pattern(address_clean, pattern):
@@ -186,6 +527,15 @@ class TRXVanityGenerator:
             count = int(pattern.split('_')[2])
             # 只统计数字字符
             return sum(1 for c in address if c == digit) >= count
+        elif pattern.startswith('palindrome_'):
+            # 回文模式，如 palindrome_7（任意位置长度≥7的回文段）
+            count = int(pattern.split('_')[1])
+            return longest_palindrome(address) >= count
+        elif pattern.startswith(('ascending_', 'descending_')):
+            # 按Base58字母表顺序递增/递减，如 ascending_5（6789A）
+            step = 1 if pattern.startswith('ascending_') else -1
+            count = int(pattern.split('_')[1])
+            return longest_step_run(address, step) >= count
         elif pattern.startswith('custom_'):
             # 自定义模式，如 custom_888
             custom = pattern.split('_', 1)[1]
@@ -221,6 +571,15 @@ class TRXVanityGenerator:
         elif pattern.startswith('repeat_'):
             digit = pattern.split('_')[1]
             return address.count(digit) * 5
+
+        elif pattern.startswith('palindrome_'):
+            # 长度为m的回文约束 m//2 个字符，难度与 consecutive_(m//2+1) 相当
+            return (longest_palindrome(address) // 2 + 1) * 10
+
+        elif pattern.startswith(('ascending_', 'descending_')):
+            # 每个字符都由前一个字符决定，难度与同长度的 consecutive_ 相当
+            step = 1 if pattern.startswith('ascending_') else -1
+            return longest_step_run(address, step) * 10
         
         else:
             return len(pattern) * 2
@@ -233,7 +592,7 @@ class TRXVanityGenerator:
             mnemo = Mnemonic("english")
             return mnemo.generate(strength=256)  # 24个单词
         except Exception as e:
-            print(f"生成助记词失败: {e}")
+            self._log(f"生成助记词失败: {e}")
             return ""
     
     def _mnemonic_to_private_key(self, mnemonic: str) -> str:
@@ -245,7 +604,7 @@ class TRXVanityGenerator:
             # 在实际应用中，应该使用BIP39标准从助记词派生私钥
             return self._generate_private_key().hex()
         except Exception as e:
-            print(f"助记词转私钥失败: {e}")
+            self._log(f"助记词转私钥失败: {e}")
             return ""
 
     def generate_single_address(self) -> Tuple[str, str, str]:
@@ -293,7 +652,7 @@ class TRXVanityGenerator:
             return
 
         if MNEMONIC_AVAILABLE and not self._gpu_mnemonic_warned:
-            print(f"{Fore.YELLOW}⚠ GPU模式不生成助记词，将仅生成私钥{Style.RESET_ALL}")
+            self._log(f"{Fore.YELLOW}⚠ GPU模式不生成助记词，将仅生成私钥{Style.RESET_ALL}")
             self._gpu_mnemonic_warned = True
 
         private_keys = self._generate_private_keys_gpu(batch_size)
@@ -301,99 +660,874 @@ class TRXVanityGenerator:
             address = self._private_key_to_address(private_key)
             yield (address, private_key.hex(), "")
     
+    def _new_buffer(self, batch_size: int) -> BatchBuffer:
+        """按批次大小创建复用的缓冲区（容量不超过 DEFAULT_BUFFER_ROWS）"""
+        with_mnemonics = MNEMONIC_AVAILABLE and not self.use_gpu
+        return BatchBuffer(min(batch_size, DEFAULT_BUFFER_ROWS), output_width=TRX_ADDRESS_LENGTH,
+                           with_mnemonics=with_mnemonics, digest_width=32)
+
+    def fill_buffer(self, buffer: BatchBuffer, n: int, reporter: ProgressReporter = None) -> BatchBuffer:
+        """在缓冲区前n行原地生成私钥和地址（不创建逐地址的元组/十六进制字符串）"""
+        self._hash_buffer(self._derive_buffer(self._fill_keys(buffer, n)))
+        if reporter is not None:
+            reporter.checked += n
+        return buffer
+
+    def _fill_keys(self, buffer: BatchBuffer, n: int) -> BatchBuffer:
+        """密钥源：在缓冲区前n行生成随机私钥"""
+        if self.use_gpu and CUPY_AVAILABLE:
+            if MNEMONIC_AVAILABLE and not self._gpu_mnemonic_warned:
+                self._log(f"{Fore.YELLOW}⚠ GPU模式不生成助记词，将仅生成私钥{Style.RESET_ALL}")
+                self._gpu_mnemonic_warned = True
+            buffer.fill_random_keys(n, xp=cp)
+        else:
+            buffer.fill_random_keys(n)
+        return buffer
+
+    def _derive_buffer(self, buffer: BatchBuffer) -> BatchBuffer:
+        """派生：由缓冲区中的私钥计算公钥的Keccak-256摘要（助记词模式下同时生成助记词）"""
+        for i in range(buffer.size):
+            if buffer.mnemonics is not None:
+                buffer.mnemonics[i] = self._generate_mnemonic()
+            public_key = self._private_key_to_public_key(buffer.key(i))[1:]
+            buffer.digests[i] = np.frombuffer(keccak.new(digest_bits=256, data=public_key).digest(), dtype=np.uint8)
+        return buffer
+
+    @staticmethod
+    def _split_chunk(buffer: BatchBuffer, n: int) -> BatchBuffer:
+        """分离密钥模式的密钥源：标量由派生阶段的游走连续分配，这里只设定分块大小"""
+        buffer.size = n
+        return buffer
+
+    @staticmethod
+    def _derive_split(buffer: BatchBuffer, walk: PointWalk) -> BatchBuffer:
+        """分离密钥派生：游走得到连续标量b和 A + b·G，再计算Keccak-256摘要"""
+        n = buffer.size
+        pubkeys = buffer.channels['pubkey']
+        if not walk.fill(buffer.keys[:n], pubkeys[:n]):
+            buffer.size = 0  # 段内出现倍点/无穷远点（概率可忽略），丢弃这一段
+            return buffer
+        for i in range(n):
+            buffer.digests[i] = np.frombuffer(keccak.new(digest_bits=256, data=pubkeys[i].tobytes()).digest(),
+                                              dtype=np.uint8)
+        return buffer
+
+    def _hash_buffer(self, buffer: BatchBuffer) -> BatchBuffer:
+        """哈希：由Keccak摘要整批计算校验和并Base58编码成地址字符"""
+        n = buffer.size
+        buffer.outputs[:n] = _base58_matrix(self._payload_matrix(buffer.digests[:n, 12:32]), TRX_ADDRESS_LENGTH)
+        return buffer
+
+    @staticmethod
+    def _payload_matrix(hashes: np.ndarray, version: int = TRX_ADDRESS_VERSION) -> np.ndarray:
+        """(N, 20) 地址哈希 -> (N, 25) 地址载荷（版本字节 + 哈希 + 双SHA256校验和）
+
+        TRX的地址哈希是公钥Keccak-256的后20字节，BTC的是压缩公钥SHA256的RIPEMD160。
+        """
+        n = hashes.shape[0]
+        payload = np.empty((n, 25), dtype=np.uint8)
+        payload[:, 0] = version
+        payload[:, 1:21] = hashes
+        sha256 = hashlib.sha256
+        checksums = b"".join(sha256(sha256(row.tobytes()).digest()).digest()[:4] for row in payload[:, :21])
+        payload[:, 21:] = np.frombuffer(checksums, dtype=np.uint8).reshape(n, 4)
+        return payload
+
+    def fill_shm_slot(self, fields) -> int:
+        """共享内存生产进程：原地填充一个槽位的私钥、64字节公钥和25字节地址载荷
+
+        在生产进程中调用（不生成助记词）；地址字符由匹配进程用 _base58_matrix 整批编码。
+        """
+        keys, pubkeys, payloads = fields['key'], fields['pubkey'], fields['payload']
+        n = keys.shape[0]
+        keys[:] = np.frombuffer(os.urandom(keys.size), dtype=np.uint8).reshape(keys.shape)
+        digests = np.empty((n, 32), dtype=np.uint8)
+        for i in range(n):
+            public_key = self._private_key_to_public_key(keys[i].tobytes())[1:]
+            pubkeys[i] = np.frombuffer(public_key, dtype=np.uint8)
+            digests[i] = np.frombuffer(keccak.new(digest_bits=256, data=public_key).digest(), dtype=np.uint8)
+        payloads[:] = self._payload_matrix(digests[:, 12:])
+        return n
+
+    @staticmethod
+    def _receive_shm(transport: ShmTransport, buffer: BatchBuffer) -> BatchBuffer:
+        """共享内存密钥源：取一个就绪槽位，复制私钥并整批编码地址后立即归还槽位"""
+        slot, fields = transport.receive(timeout=SHM_RECEIVE_TIMEOUT)
+        n = fields['key'].shape[0]
+        buffer.size = n
+        buffer.keys[:n] = fields['key']
+        buffer.outputs[:n] = _base58_matrix(fields['payload'], TRX_ADDRESS_LENGTH)
+        transport.release(slot)
+        return buffer
+
+    def _fill_chunks(self, buffer: BatchBuffer, batch_size: int, reporter: ProgressReporter):
+        """把一个批次按缓冲区容量分块生成，依次产出填充好的缓冲区"""
+        for n in buffer.chunks(batch_size):
+            yield self.fill_buffer(buffer, n, reporter)
+
+    @staticmethod
+    def _buffer_row(buffer: BatchBuffer, row: int) -> Tuple[str, str, str]:
+        """把命中的一行复制成 (地址, 私钥hex, 助记词)"""
+        mnemonic = buffer.mnemonics[row] if buffer.mnemonics is not None else ""
+        return buffer.output(row).decode('ascii'), buffer.key(row).hex(), mnemonic
+
+    @staticmethod
+    def _format_hit(vanity_addr: VanityAddress) -> List[str]:
+        """命中结果的显示内容（在报告线程中调用）"""
+        chain = f" [{vanity_addr.chain.upper()}]" if vanity_addr.chain != "trx" else ""
+        return [
+            f"\n{Fore.GREEN}找到靓号!{chain}{Style.RESET_ALL}",
+            f"地址: {Fore.YELLOW}{vanity_addr.address}{Style.RESET_ALL}",
+            f"模式: {vanity_addr.pattern}",
+            f"分数: {vanity_addr.score}",
+            f"部分私钥: {vanity_addr.partial_key}" if vanity_addr.partial_key else f"私钥: {vanity_addr.private_key}",
+            f"助记词: {vanity_addr.mnemonic}",  # 显示助记词
+            "-" * 30,
+        ]
+
+    def _buffer_hits(self, buffer: BatchBuffer, rows, all_patterns: List[str], matcher: PatternMatcher,
+                     affix_index: AffixIndex = None, partial: bool = False,
+                     plugin_labels: Dict[int, Tuple[str, int]] = None) -> List[Tuple[int, int, VanityAddress]]:
+        """批量匹配的候选行逐个确定模式与分数，返回 (行, 模式下标, 命中地址)
+
+        模式下标为-1表示只命中精确前缀/后缀索引或匹配插件（plugin_labels为行 → (标签, 分数)）；
+        partial为True时缓冲区中的密钥是分离密钥模式的部分私钥。
+        """
+        hits = []
+        for row in rows:
+            address, private_key, mnemonic = self._buffer_row(buffer, row)
+            address_clean = address[1:]
+            matched = matcher.match(address_clean)
+            if matched >= 0:
+                pattern = all_patterns[matched]
+                score = self._calculate_vanity_score(address_clean, pattern)
+            else:
+                pattern = affix_index.match(address_clean) if affix_index is not None else None
+                if pattern is not None:
+                    score = self._calculate_vanity_score(address_clean, pattern.split(':', 1)[1])
+                elif plugin_labels is not None and int(row) in plugin_labels:
+                    pattern, score = plugin_labels[int(row)]
+                else:
+                    continue
+            vanity_addr = VanityAddress(
+                address=address,
+                private_key=private_key if not partial else "",
+                mnemonic=mnemonic, # 添加助记词
+                pattern=pattern,
+                score=score,
+                timestamp=time.time(),
+                partial_key=private_key if partial else ""
+            )
+            hits.append((int(row), matched, vanity_addr))
+        return hits
+
     def find_vanity_addresses(self, 
                             patterns: List[str], 
                             max_addresses: int = 100,
                             batch_size: int = 10000,
-                            save_to_file: bool = True) -> List[VanityAddress]:
-        """寻找靓号地址"""
-        print(f"{Fore.CYAN}开始寻找TRX靓号地址...{Style.RESET_ALL}")
-        print(f"目标模式: {patterns}")
-        print(f"最大地址数: {max_addresses}")
-        print(f"批次大小: {batch_size}")
-        print("-" * 50)
+                            save_to_file: bool = True,
+                            **kwargs) -> List[VanityAddress]:
+        """寻找靓号地址（阻塞直到找到max_addresses个），其余参数见 search_iter"""
+        for _ in self.search_iter(patterns, max_addresses, batch_size, **kwargs):
+            pass
+
+        # 保存结果
+        if save_to_file:
+            self.save_results()
+        
+        return self.found_addresses
+
+    async def search(self, patterns: List[str], max_addresses: Optional[int] = None,
+                     batch_size: int = 10000, **kwargs) -> AsyncIterator[VanityAddress]:
+        """异步搜索：async for 逐个得到命中地址，不阻塞事件循环
+
+        search_iter 在线程池中运行（CPU工作在流水线线程或 processes 个生产进程中），
+        命中经 call_soon_threadsafe 交回事件循环。提前退出迭代或任务被取消时
+        设置停止信号，在当前分块结束后停止流水线；运行中可随时读取 live_stats()。
+        """
+        loop = asyncio.get_running_loop()
+        hits: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        finished = object()
+
+        def run():
+            try:
+                for vanity_addr in self.search_iter(patterns, max_addresses, batch_size, stop=stop, **kwargs):
+                    loop.call_soon_threadsafe(hits.put_nowait, vanity_addr)
+            except BaseException as e:
+                loop.call_soon_threadsafe(hits.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(hits.put_nowait, finished)
+
+        worker = loop.run_in_executor(None, run)
+        try:
+            while True:
+                item = await hits.get()
+                if item is finished:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            await asyncio.shield(worker)
+
+    def live_stats(self) -> Dict:
+        """运行中的统计快照（可在其他线程或事件循环中调用）"""
+        snapshot = dict(self.stats)
+        elapsed = time.time() - snapshot['start_time']
+        snapshot['elapsed'] = elapsed
+        snapshot['rate'] = snapshot['total_generated'] / elapsed if elapsed > 0 else 0.0
+        return snapshot
+
+    def search_iter(self,
+                    patterns: List[str],
+                    max_addresses: Optional[int] = 100,
+                    batch_size: int = 10000,
+                    inventory: VanityInventory = None,
+                    secondary_patterns: List[str] = None,
+                    watcher: PatternWatcher = None,
+                    derive_workers: int = 1,
+                    processes: int = 0,
+                    affix_index: AffixIndex = None,
+                    split_key: bytes = None,
+                    plugins: PluginSet = None,
+                    stop: threading.Event = None) -> Iterator[VanityAddress]:
+        """搜索引擎：逐个产出命中地址（同时追加到 found_addresses），CLI与异步接口共用
+
+        max_addresses为None时一直搜索（不从库存交付），直到stop被设置或调用方停止迭代；
+        stop在分块之间检查。
+        指定inventory时先从库存交付已有的匹配地址，只为剩余数量搜索；
+        本次新找到的地址写入库存并标记为已交付。
+        secondary_patterns为次级模式：与主模式在同一次批量匹配中求值，命中的
+        地址（以及超出max_addresses的主模式命中）批量写入库存备货，不计入max_addresses。
+        指定watcher时在批次之间检查配置文件，模式变化后重新编译匹配器并整体替换。
+        搜索以流水线运行：密钥源 → derive_workers个派生线程 → 整批哈希 → 匹配 → 结果处理，
+        各阶段统计写入 stats['pipeline']。processes大于0时密钥与地址载荷由processes个
+        生产进程经共享内存（shm_transport.py）传入，替代派生线程，不生成助记词。
+        affix_index为精确前缀/后缀索引（affix_index.py），与模式匹配器在同一批上查询，
+        命中地址的模式标签为 prefix:XXX / suffix:XXX，计入max_addresses。
+        split_key为客户的基础公钥A（SEC1格式）：搜索 A + b·G 的地址（split_key.py
+        增量游走），结果只含部分私钥b（partial_key），不能与processes、库存同时使用。
+        plugins为批量匹配插件（match_plugins.py）：匹配插件每批调用一次，命中的模式标签为
+        plugin:NAME；过滤插件只对候选行调用，不满足的候选被丢弃；各插件的耗时写入 stats['plugins']。
+        """
+        if split_key is not None and (processes > 0 or inventory is not None):
+            raise ValueError("分离密钥模式不能与多进程或库存同时使用")
+        secondary_patterns = [p for p in (secondary_patterns or []) if p not in patterns]
+        if secondary_patterns and inventory is None:
+            raise ValueError("次级模式需要指定库存 inventory")
+        self._log(f"{Fore.CYAN}开始寻找TRX靓号地址...{Style.RESET_ALL}")
+        self._log(f"目标模式: {patterns}")
+        if affix_index is not None:
+            self._log(f"精确前缀/后缀: {len(affix_index):,} 个条目 ({affix_index.nbytes / 1e6:.2f} MB)")
+        if split_key is not None:
+            self._log(f"分离密钥模式，基础公钥: {split_key.hex()}")
+        if plugins:
+            if plugins.matchers:
+                self._log(f"匹配插件: {[p.name for p in plugins.matchers]}")
+            if plugins.filters:
+                self._log(f"过滤插件: {[p.name for p in plugins.filters]}")
+        self._log(f"最大地址数: {max_addresses if max_addresses is not None else '不限'}")
+        self._log(f"批次大小: {batch_size}")
+        if secondary_patterns:
+            self._log(f"次级模式 (写入库存): {secondary_patterns}")
+        self._log("-" * 50)
         
+        limit = float('inf') if max_addresses is None else max_addresses
         found_count = 0
+        if inventory is not None and max_addresses is not None:
+            found_count = self._claim_from_inventory(inventory, patterns, max_addresses)
+            yield from self.found_addresses[len(self.found_addresses) - found_count:]
+
+        # 匹配状态只在匹配阶段（单线程）中读写，热加载时整体替换
+        state = {'primary': len(patterns)}
+        state['all_patterns'], state['batch_matcher'], state['matcher'] = \
+            self._compile_tiers(patterns, secondary_patterns)
+        chunk_size = min(batch_size, DEFAULT_BUFFER_ROWS)
+        new_hits = []
         total_generated = 0
+        sink = InventorySink(inventory) if inventory is not None else None
         
-        with tqdm(total=None, desc="已检查", unit="addr", dynamic_ncols=True) as pbar:
-            mode_msg = self.use_gpu and f"{Fore.GREEN}使用GPU生成地址...{Style.RESET_ALL}" or f"{Fore.YELLOW}使用CPU生成地址...{Style.RESET_ALL}"
-            tqdm.write(mode_msg)
-            while found_count < max_addresses:
-                # 生成地址批次
-                
-                if self.use_gpu:
-                    address_iter = self.generate_batch_gpu_iter(batch_size)
+        postfix = (lambda: {"stock": sink.received}) if secondary_patterns else None
+        reporter = ProgressReporter(target=max_addresses, quiet=self.quiet,
+                                    format_hit=self._format_hit, postfix=postfix)
+
+        def reload_patterns():
+            """批次之间热加载模式，新匹配器编译完成后一次性替换"""
+            try:
+                update = watcher.poll()
+            except ValueError as e:
+                reporter.write(f"{Fore.YELLOW}⚠ 忽略配置修改: {e}{Style.RESET_ALL}")
+                return
+            if update is None:
+                return
+            new_patterns, new_secondary = update
+            if inventory is None:
+                new_secondary = []
+            new_secondary = [p for p in new_secondary if p not in new_patterns]
+            compiled = self._compile_tiers(new_patterns, new_secondary)
+            state['primary'] = len(new_patterns)
+            state['all_patterns'], state['batch_matcher'], state['matcher'] = compiled
+            self.stats['pattern_reloads'] = self.stats.get('pattern_reloads', 0) + 1
+            reporter.write(f"{Fore.CYAN}已重新加载模式: {new_patterns}{Style.RESET_ALL}")
+
+        def match(buffer: BatchBuffer):
+            """匹配阶段：整批匹配，只对命中的行确定模式与分数"""
+            if watcher is not None:
+                reload_patterns()
+            all_patterns, matcher = state['all_patterns'], state['matcher']
+            body = buffer.matrix[:, 1:]  # 移除T前缀
+            rows = state['batch_matcher'].match_batch(body)
+            if affix_index is not None:
+                rows = np.union1d(rows, affix_index.match_batch(body))
+            plugin_labels = None
+            if plugins:
+                plugin_labels = plugins.match_batch(buffer.matrix)
+                if plugin_labels:
+                    rows = np.union1d(rows, np.fromiter(plugin_labels, dtype=np.int64, count=len(plugin_labels)))
+                rows = plugins.filter(buffer.matrix, rows)
+            hits = [(vanity_addr, matched < state['primary'])
+                    for _, matched, vanity_addr in self._buffer_hits(buffer, rows, all_patterns, matcher,
+                                                                     affix_index, split_key is not None,
+                                                                     plugin_labels)]
+            reporter.checked += buffer.size
+            return buffer, hits
+
+        transport = None
+        if processes > 0:
+            transport = ShmTransport(self.fill_shm_slot, TRX_LAYOUT, rows=chunk_size, processes=processes)
+            stages = [Stage("match", match)]
+            buffers = [BatchBuffer(chunk_size, output_width=TRX_ADDRESS_LENGTH)
+                       for _ in range(PIPELINE_QUEUE_SIZE * 2 + 2)]
+            pipe = Pipeline(lambda buffer: self._receive_shm(transport, buffer), stages, buffers,
+                            queue_size=PIPELINE_QUEUE_SIZE, source_name="shm")
+            transport.start()
+        elif split_key is not None:
+            walk = PointWalk(parse_public_key(split_key), chunk_size)
+            stages = [
+                Stage("derive", lambda buffer: self._derive_split(buffer, walk), workers=derive_workers),
+                Stage("hash", self._hash_buffer),
+                Stage("match", match),
+            ]
+            buffers = [BatchBuffer(chunk_size, output_width=TRX_ADDRESS_LENGTH, digest_width=32,
+                                   channels={'pubkey': 64})
+                       for _ in range(PIPELINE_QUEUE_SIZE * (len(stages) + 1) + derive_workers + 2)]
+            pipe = Pipeline(lambda buffer: self._split_chunk(buffer, chunk_size), stages, buffers,
+                            queue_size=PIPELINE_QUEUE_SIZE, source_name="keys")
+        else:
+            stages = [
+                Stage("derive", self._derive_buffer, workers=derive_workers),
+                Stage("hash", self._hash_buffer),
+                Stage("match", match),
+            ]
+            buffers = [self._new_buffer(chunk_size)
+                       for _ in range(PIPELINE_QUEUE_SIZE * (len(stages) + 1) + derive_workers + 2)]
+            pipe = Pipeline(lambda buffer: self._fill_keys(buffer, chunk_size), stages, buffers,
+                            queue_size=PIPELINE_QUEUE_SIZE, source_name="keys")
+
+        try:
+            with reporter, pipe:
+                if found_count >= limit:
+                    # 库存已满足全部需求，无需搜索
+                    pipe.close()
+                if transport is not None:
+                    reporter.write(f"{Fore.GREEN}使用 {processes} 个生产进程（共享内存传输）...{Style.RESET_ALL}")
+                else:
+                    mode_msg = self.use_gpu and f"{Fore.GREEN}使用GPU生成地址...{Style.RESET_ALL}" or f"{Fore.YELLOW}使用CPU生成地址...{Style.RESET_ALL}"
+                    reporter.write(mode_msg)
+                # 结果处理阶段在当前线程中运行
+                for buffer, hits in pipe:
+                    total_generated += buffer.size
+                    for vanity_addr, primary in hits:
+                        if not primary or found_count >= limit:
+                            # 次级命中或超额的主模式命中：备货，不计入max_addresses
+                            if sink is not None:
+                                sink.put(vanity_addr)
+                            continue
+
+                        self.found_addresses.append(vanity_addr)
+                        new_hits.append(vanity_addr)
+                        found_count += 1
+                        reporter.found = found_count
+                        reporter.hit(vanity_addr)
+                        yield vanity_addr
+                    pipe.recycle(buffer)
+
+                    # 更新统计信息
+                    self.stats['total_generated'] = total_generated
+                    self.stats['found_vanity'] = found_count
+                    self.stats['match_plan'] = state['batch_matcher'].plan_stats()
+                    self.stats['pipeline'] = pipe.metrics()
+                    if plugins:
+                        self.stats['plugins'] = plugins.stats()
+                    if sink is not None:
+                        self.stats['stocked'] = sink.received
+                    if found_count >= limit or (stop is not None and stop.is_set()):
+                        break
+        finally:
+            if transport is not None:
+                transport.close()
+            self.stats['pipeline'] = pipe.metrics()
+            if inventory is not None:
+                inventory.add(new_hits, claimed=True)
+                sink.flush()
+    
+    def fill_orders(self,
+                    book: OrderBook,
+                    batch_size: int = 10000,
+                    save_to_file: bool = True,
+                    inventory: VanityInventory = None,
+                    derive_workers: int = 1) -> OrderBook:
+        """多订单共享扫描：所有订单共用一个密钥流和一个编译好的匹配器
+
+        命中按订单簿路由给所属订单；订单满额后匹配器在批次之间重新编译，
+        去掉只有已完成订单需要的模式，所有订单满额时结束。剩余时间按未完成
+        订单的命中概率估计。指定inventory时先从库存为每个订单交付。
+        """
+        self._log(f"{Fore.CYAN}开始多订单共享扫描...{Style.RESET_ALL}")
+        for order in book.orders.values():
+            self._log(f"订单 {order.order_id}: {order.patterns} × {order.quota}")
+        self._log(f"批次大小: {batch_size}")
+        self._log("-" * 50)
+
+        if inventory is not None:
+            served = 0
+            for order in book.open_orders():
+                for row in inventory.claim(order.patterns, self._matches_pattern, order.remaining):
+                    row['score'] = self._calculate_vanity_score(row['address'][1:], row['pattern'])
+                    vanity_addr = VanityAddress(**row)
+                    order.addresses.append(vanity_addr)
+                    self.found_addresses.append(vanity_addr)
+                    served += 1
+            self.stats['from_inventory'] = served
+            book.version += 1
+            if served:
+                self._log(f"{Fore.GREEN}✓ 从库存交付 {served} 个靓号{Style.RESET_ALL}")
+
+        state = {'version': None}
+        chunk_size = min(batch_size, DEFAULT_BUFFER_ROWS)
+        new_hits = []
+        total_generated = 0
+        reporter = ProgressReporter(target=book.quota, quiet=self.quiet, format_hit=self._format_hit,
+                                    postfix=lambda: {"open": len(book.open_orders())},
+                                    eta=lambda rate: book.eta(rate, reporter.checked))
+        reporter.found = book.filled
+
+        def match(buffer: BatchBuffer):
+            """匹配阶段：订单簿变化后先重新编译匹配器，再整批匹配"""
+            if state['version'] != book.version:
+                state['version'] = book.version
+                state['patterns'], state['batch_matcher'], state['matcher'] = \
+                    self._compile_tiers(book.active_patterns(), [])
+                self.stats['matcher_compiles'] = self.stats.get('matcher_compiles', 0) + 1
+            hits = []
+            if state['patterns']:
+                for row in state['batch_matcher'].match_batch(buffer.matrix[:, 1:]):
+                    address, private_key, mnemonic = self._buffer_row(buffer, row)
+                    matched = state['matcher'].match(address[1:])
+                    if matched >= 0:
+                        hits.append(VanityAddress(address=address, private_key=private_key, mnemonic=mnemonic,
+                                                  pattern=state['patterns'][matched], timestamp=time.time()))
+            reporter.checked += buffer.size
+            return buffer, hits
+
+        stages = [
+            Stage("derive", self._derive_buffer, workers=derive_workers),
+            Stage("hash", self._hash_buffer),
+            Stage("match", match),
+        ]
+        buffers = [self._new_buffer(chunk_size)
+                   for _ in range(PIPELINE_QUEUE_SIZE * (len(stages) + 1) + derive_workers + 2)]
+        pipe = Pipeline(lambda buffer: self._fill_keys(buffer, chunk_size), stages, buffers,
+                        queue_size=PIPELINE_QUEUE_SIZE, source_name="keys")
+
+        with reporter, pipe:
+            if book.done:
+                pipe.close()
+            for buffer, hits in pipe:
+                total_generated += buffer.size
+                for vanity_addr in hits:
+                    body = vanity_addr.address[1:]
+                    order = book.route(vanity_addr, body, self._matches_pattern)
+                    if order is None:
+                        continue  # 所属订单在这一批处理期间已满额
+                    vanity_addr.score = self._calculate_vanity_score(body, vanity_addr.pattern)
+                    self.found_addresses.append(vanity_addr)
+                    new_hits.append(vanity_addr)
+                    reporter.found = book.filled
+                    reporter.hit(vanity_addr)
+                    if order.remaining == 0:
+                        reporter.write(f"{Fore.CYAN}订单 {order.order_id} 已完成{Style.RESET_ALL}")
+                pipe.recycle(buffer)
+
+                self.stats['total_generated'] = total_generated
+                self.stats['found_vanity'] = book.filled
+                self.stats['orders'] = {order_id: len(order.addresses) for order_id, order in book.orders.items()}
+                if book.done:
+                    break
+        self.stats['pipeline'] = pipe.metrics()
+
+        if inventory is not None:
+            inventory.add(new_hits, claimed=True)
+        if save_to_file:
+            self.save_order_results(book)
+        return book
+
+    def save_order_results(self, book: OrderBook, filename: str = None):
+        """按订单保存结果"""
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"trx_orders_{timestamp}.json"
+        results = {
+            'timestamp': datetime.now().isoformat(),
+            'stats': self.stats,
+            'orders': [
+                {
+                    'id': order.order_id,
+                    'patterns': order.patterns,
+                    'quota': order.quota,
+                    'addresses': [asdict(addr) for addr in order.addresses],
+                }
+                for order in book.orders.values()
+            ]
+        }
+        tmp_filename = f"{filename}.tmp"
+        with open(tmp_filename, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_filename, filename)
+        self._log(f"\n{Fore.GREEN}订单结果已保存到: {filename}{Style.RESET_ALL}")
+
+    @staticmethod
+    def _compile_tiers(patterns: List[str], secondary_patterns: List[str]):
+        """编译主模式+次级模式的匹配器，返回 (全部模式, 批量匹配器, 标量匹配器)
+
+        主模式在前，命中时声明顺序保证主模式优先；两级共享同一次批量匹配。
+        批量匹配器负责找出命中行，标量匹配器按声明顺序确定命中的模式。
+        """
+        all_patterns = list(patterns) + list(secondary_patterns)
+        return all_patterns, BatchPatternMatcher(all_patterns), PatternMatcher(all_patterns)
+
+    def _claim_from_inventory(self, inventory: VanityInventory, patterns: List[str], limit: int) -> int:
+        """从库存交付已有的匹配地址，返回交付数量"""
+        served = []
+        for row in inventory.claim(patterns, self._matches_pattern, limit):
+            row['score'] = self._calculate_vanity_score(row['address'][1:], row['pattern'])
+            served.append(VanityAddress(**row))
+        self.found_addresses.extend(served)
+        self.stats['from_inventory'] = len(served)
+        self.stats['found_vanity'] = len(served)
+        if served:
+            self._log(f"{Fore.GREEN}✓ 从库存交付 {len(served)} 个靓号，剩余 {limit - len(served)} 个需要搜索{Style.RESET_ALL}")
+        return len(served)
+
+    def _new_multichain_buffer(self, batch_size: int, chains: List[str]) -> BatchBuffer:
+        """多链模式缓冲区：digests前32字节为Keccak-256，后32字节为压缩公钥的SHA256"""
+        channels = {}
+        if 'eth' in chains:
+            channels['eth'] = ETH_BODY_LENGTH
+        if 'btc' in chains:
+            channels.update(btc=BTC_BODY_LENGTH, btc_payload=25)
+        return BatchBuffer(min(batch_size, DEFAULT_BUFFER_ROWS), output_width=TRX_ADDRESS_LENGTH,
+                           digest_width=64, channels=channels)
+
+    def _derive_multichain(self, buffer: BatchBuffer) -> BatchBuffer:
+        """派生：每个私钥只做一次椭圆曲线运算，同时得到Keccak-256（TRX/ETH）和压缩公钥的SHA256（BTC）"""
+        with_btc = 'btc' in buffer.channels
+        for i in range(buffer.size):
+            public_key = self._private_key_to_public_key(buffer.key(i))
+            buffer.digests[i, :32] = np.frombuffer(keccak.new(digest_bits=256, data=public_key[1:]).digest(),
+                                                   dtype=np.uint8)
+            if with_btc:
+                compressed = bytes([2 + (public_key[64] & 1)]) + public_key[1:33]
+                buffer.digests[i, 32:] = np.frombuffer(hashlib.sha256(compressed).digest(), dtype=np.uint8)
+        return buffer
+
+    def _hash_multichain(self, buffer: BatchBuffer, chains: List[str]) -> BatchBuffer:
+        """哈希：整批生成各链的地址字符（ETH为Keccak后20字节的十六进制）"""
+        n = buffer.size
+        if 'trx' in chains:
+            buffer.outputs[:n] = _base58_matrix(self._payload_matrix(buffer.digests[:n, 12:32]), TRX_ADDRESS_LENGTH)
+        if 'eth' in chains:
+            tail = buffer.digests[:n, 12:32]
+            eth = buffer.channels['eth']
+            eth[:n, 0::2] = _HEX_ALPHABET[tail >> 4]
+            eth[:n, 1::2] = _HEX_ALPHABET[tail & 0x0F]
+        if 'btc' in chains:
+            payload = self._payload_matrix(ripemd160_batch(buffer.digests[:n, 32:]), BTC_ADDRESS_VERSION)
+            buffer.channels['btc_payload'][:n] = payload
+            buffer.channels['btc'][:n] = _base58_matrix(payload, BTC_BODY_LENGTH)
+        return buffer
+
+    @staticmethod
+    def _chain_address(buffer: BatchBuffer, chain: str, row: int) -> str:
+        """把一行复制成指定链的地址字符串"""
+        if chain == 'eth':
+            return "0x" + buffer.channels['eth'][row].tobytes().decode('ascii')
+        if chain == 'btc':
+            # 每个前导零字节编码为一个 '1'，其余部分是去掉前导零位的Base58
+            payload = buffer.channels['btc_payload'][row]
+            zeros = int(np.argmax(payload != 0)) if payload.any() else payload.size
+            return "1" * zeros + buffer.channels['btc'][row].tobytes().decode('ascii').lstrip("1")
+        return buffer.output(row).decode('ascii')
+
+    def find_multichain_addresses(self,
+                                  chain_patterns: Dict[str, List[str]],
+                                  max_addresses: int = 10,
+                                  batch_size: int = 10000,
+                                  save_to_file: bool = True,
+                                  derive_workers: int = 1) -> List[VanityAddress]:
+        """多链单次派生模式：同一个secp256k1私钥同时检查TRX、ETH和BTC(P2PKH)的模式
+
+        chain_patterns为 {链: 模式列表}，每条链最多收集max_addresses个，所有链都达到
+        数量后结束。公钥和Keccak-256只计算一次，TRX与ETH共用；BTC使用压缩公钥。
+        私钥均为十六进制，BTC地址对应压缩公钥（导入时使用压缩格式WIF）。
+        """
+        unknown = [chain for chain in chain_patterns if chain not in SUPPORTED_CHAINS]
+        if unknown:
+            raise ValueError(f"不支持的链: {unknown}")
+        chains = [chain for chain in SUPPORTED_CHAINS if chain_patterns.get(chain)]
+        if not chains:
+            raise ValueError("至少需要为一条链指定模式")
+
+        self._log(f"{Fore.CYAN}开始多链寻找靓号地址...{Style.RESET_ALL}")
+        for chain in chains:
+            self._log(f"{chain.upper()} 模式: {chain_patterns[chain]}")
+        self._log(f"每条链最大地址数: {max_addresses}")
+        self._log(f"批次大小: {batch_size}")
+        self._log("-" * 50)
+
+        compiled = {}
+        for chain in chains:
+            patterns = list(chain_patterns[chain])
+            compiled[chain] = (patterns, BatchPatternMatcher(patterns), PatternMatcher(patterns))
+        found = {chain: 0 for chain in chains}
+        chunk_size = min(batch_size, DEFAULT_BUFFER_ROWS)
+        total_generated = 0
+        reporter = ProgressReporter(target=max_addresses * len(chains), quiet=self.quiet,
+                                    format_hit=self._format_hit,
+                                    postfix=lambda: {chain: found[chain] for chain in chains})
+
+        def resolve(buffer: BatchBuffer, chain: str, row: int):
+            patterns, _, matcher = compiled[chain]
+            address = self._chain_address(buffer, chain, row)
+            body = address[_CHAIN_PREFIX_LENGTH[chain]:]
+            matched = matcher.match(body)
+            if matched < 0:
+                return None
+            return VanityAddress(
+                address=address,
+                private_key=buffer.key(row).hex(),
+                pattern=patterns[matched],
+                score=self._calculate_vanity_score(body, patterns[matched]),
+                timestamp=time.time(),
+                chain=chain
+            )
+
+        def match(buffer: BatchBuffer):
+            """匹配阶段：各链分别整批匹配，只对命中的行生成地址字符串"""
+            n = buffer.size
+            hits = []
+            for chain in chains:
+                if found[chain] >= max_addresses:
+                    continue
+                batch_matcher = compiled[chain][1]
+                if chain == 'trx':
+                    rows = batch_matcher.match_batch(buffer.matrix[:, 1:])
+                elif chain == 'eth':
+                    rows = batch_matcher.match_batch(buffer.channels['eth'][:n])
                 else:
-                    address_iter = self.generate_batch_cpu_iter(batch_size)
-
-                # 检查每个地址
-                update_interval = max(1000, batch_size // 100)
-                pending_updates = 0
-                for address, private_key, mnemonic in address_iter:
-                    total_generated += 1
-                    is_vanity, pattern, score = self._check_vanity_pattern(address, patterns)
-                    pending_updates += 1
-                    
-                    if is_vanity:
+                    # 主体不足33个字符的BTC地址长度不同，不能放入同一矩阵，逐个匹配
+                    regular = buffer.channels['btc'][:n, 0] != ord('1')
+                    full = np.flatnonzero(regular)
+                    rows = np.concatenate([full[batch_matcher.match_batch(buffer.channels['btc'][full])],
+                                           np.flatnonzero(~regular)])
+                for row in rows:
+                    vanity_addr = resolve(buffer, chain, row)
+                    if vanity_addr is not None:
+                        hits.append(vanity_addr)
+            reporter.checked += n
+            return buffer, hits
+
+        stages = [
+            Stage("derive", self._derive_multichain, workers=derive_workers),
+            Stage("hash", lambda buffer: self._hash_multichain(buffer, chains)),
+            Stage("match", match),
+        ]
+        buffers = [self._new_multichain_buffer(chunk_size, chains)
+                   for _ in range(PIPELINE_QUEUE_SIZE * (len(stages) + 1) + derive_workers + 2)]
+        pipe = Pipeline(lambda buffer: self._fill_keys(buffer, chunk_size), stages, buffers,
+                        queue_size=PIPELINE_QUEUE_SIZE, source_name="keys")
+
+        with reporter, pipe:
+            reporter.write(f"{Fore.YELLOW}使用CPU生成地址（{'/'.join(c.upper() for c in chains)}）...{Style.RESET_ALL}")
+            for buffer, hits in pipe:
+                total_generated += buffer.size
+                for vanity_addr in hits:
+                    if found[vanity_addr.chain] >= max_addresses:
+                        continue
+                    self.found_addresses.append(vanity_addr)
+                    found[vanity_addr.chain] += 1
+                    reporter.found = sum(found.values())
+                    reporter.hit(vanity_addr)
+                pipe.recycle(buffer)
+
+                self.stats['total_generated'] = total_generated
+                self.stats['found_vanity'] = sum(found.values())
+                self.stats['found_by_chain'] = dict(found)
+                if all(count >= max_addresses for count in found.values()):
+                    break
+        self.stats['pipeline'] = pipe.metrics()
+
+        if save_to_file:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.save_results(f"multichain_vanity_addresses_{timestamp}.json")
+
+        return self.found_addresses
+
+    def find_best_addresses(self,
+                            patterns: List[str],
+                            top_k: int = 10,
+                            time_budget: float = None,
+                            max_attempts: int = None,
+                            batch_size: int = 10000,
+                            flush_interval: float = 60.0,
+                            output: str = None,
+                            inventory: VanityInventory = None) -> List[VanityAddress]:
+        """在时间或尝试次数预算内保留分数最高的K个靓号（随时可中断）
+
+        用大小为K的最小堆保存结果，插入为O(log K)；堆满后把模式收紧到只能
+        产生高于堆顶分数的形式作为预筛，分数门槛随堆的填充不断提高。
+        结果按flush_interval周期性写入output，结束后写入inventory（如指定）。
+        """
+        if time_budget is None and max_attempts is None:
+            raise ValueError("必须指定 time_budget 或 max_attempts")
+        if top_k < 1:
+            raise ValueError("top_k 至少为1")
+        if output is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output = f"trx_best_addresses_{timestamp}.json"
+
+        self._log(f"{Fore.CYAN}开始收集分数最高的TRX靓号地址...{Style.RESET_ALL}")
+        self._log(f"目标模式: {patterns}")
+        self._log(f"保留数量: {top_k}")
+        if time_budget is not None:
+            self._log(f"时间预算: {self._format_duration(time_budget)}")
+        if max_attempts is not None:
+            self._log(f"尝试次数预算: {max_attempts:,}")
+        self._log(f"输出文件: {output}")
+        self._log("-" * 50)
+
+        heap = []  # (score, -seq, VanityAddress)，堆顶是当前第K名
+        seq = 0
+        threshold = -1
+        prefilter = BatchPatternMatcher(patterns)
+        buffer = self._new_buffer(batch_size)
+        total_generated = 0
+        start_time = time.time()
+        last_flush = start_time
+
+        def postfix():
+            best = self.found_addresses[0].score if self.found_addresses else 0
+            return {"best": best, "threshold": max(threshold, 0), "kept": f"{len(heap)}/{top_k}"}
+
+        with ProgressReporter(total=max_attempts, quiet=self.quiet, postfix=postfix) as reporter:
+            while True:
+                elapsed = time.time() - start_time
+                if time_budget is not None and elapsed >= time_budget:
+                    break
+                if max_attempts is not None and total_generated >= max_attempts:
+                    break
+                size = batch_size if max_attempts is None else min(batch_size, max_attempts - total_generated)
+                for chunk in self._fill_chunks(buffer, size, reporter):
+                    total_generated += chunk.size
+                    matrix = chunk.matrix[:, 1:]  # 移除T前缀
+                    for row in prefilter.match_batch(matrix):
+                        address, private_key, mnemonic = self._buffer_row(chunk, row)
+                        pattern, score = self._best_pattern(address[1:], patterns)
+                        if not pattern or score <= threshold:
+                            continue
                         vanity_addr = VanityAddress(
                             address=address,
                             private_key=private_key,
-                            mnemonic=mnemonic, # 添加助记词
+                            mnemonic=mnemonic,
                             pattern=pattern,
                             score=score,
                             timestamp=time.time()
                         )
-                        
-                        self.found_addresses.append(vanity_addr)
-                        found_count += 1
-                        
-                        # 显示找到的靓号
-                        print(f"\n{Fore.GREEN}找到靓号!{Style.RESET_ALL}")
-                        print(f"地址: {Fore.YELLOW}{address}{Style.RESET_ALL}")
-                        print(f"模式: {pattern}")
-                        print(f"分数: {score}")
-                        print(f"私钥: {private_key}")
-                        print(f"助记词: {mnemonic}") # 显示助记词
-                        print("-" * 30)
-                        
-                        if found_count >= max_addresses:
-                            break
-
-                    if pending_updates >= update_interval:
-                        pbar.update(pending_updates)
-                        pending_updates = 0
-                
-                # 更新统计信息
-                if pending_updates > 0:
-                    pbar.update(pending_updates)
+                        seq += 1
+                        if len(heap) < top_k:
+                            heapq.heappush(heap, (score, -seq, vanity_addr))
+                        else:
+                            heapq.heapreplace(heap, (score, -seq, vanity_addr))
+                        if len(heap) >= top_k and heap[0][0] > threshold:
+                            # 门槛提高，重新收紧预筛模式
+                            threshold = heap[0][0]
+                            prefilter = BatchPatternMatcher(self._threshold_patterns(patterns, threshold),
+                                                            sample_batches=0)
 
+                self.found_addresses = [entry[2] for entry in sorted(heap, reverse=True)]
                 self.stats['total_generated'] = total_generated
-                self.stats['found_vanity'] = found_count
-
-                elapsed = time.time() - self.stats['start_time']
-                rate = found_count / elapsed if elapsed > 0 else 0
-                remaining = max_addresses - found_count
-                eta = remaining / rate if rate > 0 else 0
-                pbar.set_description(f"已检查 {total_generated:,}")
-                pbar.set_postfix({
-                    "elapsed": self._format_duration(elapsed),
-                    "eta": self._format_duration(eta),
-                    "found": f"{found_count}/{max_addresses}"
-                })
-        
-        # 保存结果
-        if save_to_file:
-            self.save_results()
-        
+                self.stats['found_vanity'] = len(heap)
+                self.stats['top_k_threshold'] = threshold
+
+                now = time.time()
+                if now - last_flush >= flush_interval:
+                    self._write_results(output, self.found_addresses)
+                    last_flush = now
+
+        if inventory is not None:
+            inventory.add(self.found_addresses, claimed=True)
+        self.save_results(output)
         return self.found_addresses
-    
+
+    def _best_pattern(self, address: str, patterns: List[str]) -> Tuple[str, int]:
+        """地址匹配的所有模式中分数最高的一个"""
+        best_pattern, best_score = "", 0
+        for pattern in patterns:
+            if self._matches_pattern(address, pattern):
+                score = self._calculate_vanity_score(address, pattern)
+                if not best_pattern or score > best_score:
+                    best_pattern, best_score = pattern, score
+        return best_pattern, best_score
+
+    @staticmethod
+    def _threshold_patterns(patterns: List[str], threshold: int) -> List[str]:
+        """把模式收紧为只会产生高于threshold分数的形式（与 _calculate_vanity_score 对应）"""
+        tightened = []
+        for pattern in patterns:
+            if pattern.startswith('consecutive_'):
+                # 分数 = 最长连续段 * 10
+                count = int(pattern.split('_')[1])
+                tightened.append(f"consecutive_{max(count, threshold // 10 + 1)}")
+            elif pattern.startswith('repeat_'):
+                # 分数 = 出现次数 * 5
+                _, digit, count = pattern.split('_')
+                tightened.append(f"repeat_{digit}_{max(int(count), threshold // 5 + 1)}")
+            elif pattern.startswith('palindrome_'):
+                # 分数 = (最长回文长度 // 2 + 1) * 10
+                count = int(pattern.split('_')[1])
+                tightened.append(f"palindrome_{max(count, 2 * (threshold // 10))}")
+            elif pattern.startswith(('ascending_', 'descending_')):
+                # 分数 = 最长递增/递减段 * 10
+                kind, count = pattern.split('_')
+                tightened.append(f"{kind}_{max(int(count), threshold // 10 + 1)}")
+            elif len(pattern) * 2 > threshold:
+                # 其他模式分数固定
+                tightened.append(pattern)
+        return tightened
+
     def save_results(self, filename: str = None):
         """保存结果到文件"""
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"trx_vanity_addresses_{timestamp}.json"
         
+        self._write_results(filename, self.found_addresses)
+        self._log(f"\n{Fore.GREEN}结果已保存到: {filename}{Style.RESET_ALL}")
+
+    def _write_results(self, filename: str, addresses: List[VanityAddress]):
+        """写入结果文件（先写临时文件再替换，中途被打断也不会留下半个文件）"""
         results = {
             'timestamp': datetime.now().isoformat(),
             'stats': self.stats,
@@ -404,16 +1538,18 @@ class TRXVanityGenerator:
                     'mnemonic': addr.mnemonic, # 添加助记词
                     'pattern': addr.pattern,
                     'score': addr.score,
-                    'timestamp': addr.timestamp
+                    'timestamp': addr.timestamp,
+                    'chain': addr.chain,
+                    'partial_key': addr.partial_key
                 }
-                for addr in self.found_addresses
+                for addr in addresses
             ]
         }
         
-        with open(filename, 'w', encoding='utf-8') as f:
+        tmp_filename = f"{filename}.tmp"
+        with open(tmp_filename, 'w', encoding='utf-8') as f:
             json.dump(results, f, indent=2, ensure_ascii=False)
-        
-        print(f"\n{Fore.GREEN}结果已保存到: {filename}{Style.RESET_ALL}")
+        os.replace(tmp_filename, filename)
 
     def _format_duration(self, seconds: float) -> str:
         """格式化时长显示"""
@@ -430,15 +1566,41 @@ class TRXVanityGenerator:
         elapsed_time = time.time() - self.stats['start_time']
         rate = self.stats['total_generated'] / elapsed_time if elapsed_time > 0 else 0
         
-        print(f"\n{Fore.CYAN}统计信息:{Style.RESET_ALL}")
-        print(f"总生成地址数: {self.stats['total_generated']:,}")
-        print(f"找到靓号数: {self.stats['found_vanity']}")
-        print(f"运行时间: {elapsed_time:.2f}秒")
-        print(f"生成速率: {rate:.0f} 地址/秒")
+        self._log(f"\n{Fore.CYAN}统计信息:{Style.RESET_ALL}")
+        self._log(f"总生成地址数: {self.stats['total_generated']:,}")
+        self._log(f"找到靓号数: {self.stats['found_vanity']}")
+        self._log(f"运行时间: {elapsed_time:.2f}秒")
+        self._log(f"生成速率: {rate:.0f} 地址/秒")
         
         if self.stats['total_generated'] > 0:
             success_rate = (self.stats['found_vanity'] / self.stats['total_generated']) * 100
-            print(f"成功率: {success_rate:.6f}%")
+            self._log(f"成功率: {success_rate:.6f}%")
+
+        plan = self.stats.get('match_plan')
+        if plan and plan['adaptive']:
+            order = " → ".join(
+                f"{p['pattern']}({p['hit_rate'] * 100:.3f}%, {p['cost_us']:.2f}µs)" for p in plan['order'])
+            self._log(f"匹配顺序: {order}")
+            self._log(f"每地址期望匹配耗时: {plan['expected_cost_us']:.2f}µs (抽样 {plan['samples']} 个)")
+
+        stages = self.stats.get('pipeline')
+        if stages:
+            self._log("流水线阶段: 阶段 | 线程 | 分块数 | 忙碌(s) | 阻塞(s) | 等待(s) | 利用率 | 平均队列深度")
+            for m in stages:
+                self._log(f"  {m['stage']:<6} | {m['workers']} | {m['items']} | {m['busy_s']:.2f} | "
+                          f"{m['blocked_s']:.2f} | {m['starved_s']:.2f} | {m['utilization'] * 100:.1f}% | "
+                          f"{m['avg_queue_depth']:.2f}")
+            bottleneck = max(stages, key=lambda m: m['utilization'])
+            self._log(f"瓶颈阶段: {bottleneck['stage']}")
+
+        plugins = self.stats.get('plugins')
+        if plugins:
+            self._log("插件: 名称 | 类型 | 调用 | 地址数 | 命中 | 耗时(s) | 每地址(µs)")
+            for p in plugins:
+                kind = ("匹配" if p['kind'] == 'match' else "过滤") + ("/原始字节" if p['raw'] else "/字符串")
+                self._log(f"  {p['plugin']} | {kind} | {p['calls']} | {p['rows']:,} | {p['hits']} | "
+                          f"{p['seconds']:.3f} | {p['us_per_address']:.3f}")
+
     def _get_gpu_info(self):
         """获取GPU算力信息"""
         if not CUPY_AVAILABLE:
@@ -459,42 +1621,237 @@ def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='TRX靓号地址生成器')
     parser.add_argument('--patterns', nargs='+', 
-                       default=['consecutive_3', 'consecutive_4', 'repeat_8_3', 'repeat_9_3'],
-                       help='靓号模式列表')
+                       help='靓号模式列表 (默认: consecutive_3 consecutive_4 repeat_8_3 repeat_9_3)')
     parser.add_argument('--max-addresses', type=int, default=10,
                        help='最大找到的靓号数量')
-    parser.add_argument('--batch-size', type=int, default=10000,
-                       help='每批次生成的地址数量')
+    parser.add_argument('--batch-size', type=int,
+                       help='每批次生成的地址数量 (默认读取本机校准配置，否则10000)')
     parser.add_argument('--no-gpu', action='store_true',
                        help='禁用GPU加速')
+    parser.add_argument('--derive-workers', type=int, default=1,
+                       help='流水线派生阶段的线程数 (默认: 1)')
+    parser.add_argument('--processes', type=int,
+                       help='共享内存生产进程数，替代派生线程 (默认读取本机校准配置的 processes，否则0，不使用生产进程)')
     parser.add_argument('--output', type=str,
                        help='输出文件名')
+    parser.add_argument('--top-k', type=int,
+                       help='收集模式：在预算内保留分数最高的K个靓号')
+    parser.add_argument('--time-budget', type=float,
+                       help='收集模式的时间预算（秒）')
+    parser.add_argument('--max-attempts', type=int,
+                       help='收集模式的尝试次数预算')
+    parser.add_argument('--flush-interval', type=float, default=60.0,
+                       help='收集模式下结果写盘间隔（秒）')
+    parser.add_argument('--quiet', action='store_true',
+                       help='静默模式：不显示进度条和命中信息，只写结果文件')
+    parser.add_argument('--inventory', type=str, default=DEFAULT_INVENTORY,
+                       help='靓号库存数据库（搜索前先从库存交付匹配地址）')
+    parser.add_argument('--no-inventory', action='store_true',
+                       help='不使用靓号库存')
+    parser.add_argument('--secondary-patterns', nargs='*',
+                       help='次级模式列表：顺带收集写入库存（默认读取配置文件 secondary_patterns）')
+    parser.add_argument('--config', type=str, default='config.json',
+                       help='配置文件路径')
+    parser.add_argument('--watch-config', action='store_true',
+                       help='从配置文件加载模式并在运行中热加载修改')
+    parser.add_argument('--eth-patterns', nargs='+',
+                       help='多链模式：以太坊地址模式（匹配0x之后的小写十六进制）')
+    parser.add_argument('--btc-patterns', nargs='+',
+                       help='多链模式：比特币P2PKH地址模式（匹配开头1之后的部分）')
+    parser.add_argument('--orders', type=str,
+                       help='订单文件（JSON）：多个订单共享一次扫描，每个订单有自己的模式和数量')
+    parser.add_argument('--patterns-file', type=str,
+                       help='精确前缀/后缀列表文件（每行 prefix:XXX 或 suffix:XXX，不带类型按后缀处理），可与 --patterns 同时使用')
+    parser.add_argument('--split-key', type=str, metavar='PUBKEY',
+                       help='分离密钥模式：客户的基础公钥A（hex），只输出部分私钥b，最终私钥由客户用 split_key.py combine 合成')
+    parser.add_argument('--plugin', action='append', metavar='MODULE',
+                       help='批量匹配插件（文件路径或模块名，可重复），命中标签为 plugin:NAME')
+    parser.add_argument('--plugin-filter', action='append', metavar='MODULE',
+                       help='过滤插件（可重复）：只保留满足插件条件的命中')
+    parser.add_argument('--pattern-quotas', type=str,
+                       help='每模式数量，如 consecutive_3:5,consecutive_6:1（替代 --patterns 和 --max-addresses）')
     
     args = parser.parse_args()
+    multichain = bool(args.eth_patterns or args.btc_patterns)
+    if args.orders and args.pattern_quotas:
+        parser.error('--orders 与 --pattern-quotas 不能同时使用')
+    for flag, value in (('--orders', args.orders), ('--pattern-quotas', args.pattern_quotas)):
+        if value and (multichain or args.top_k is not None or args.watch_config or args.processes
+                      or args.secondary_patterns or args.patterns):
+            parser.error(f'{flag} 不能与 --patterns、多链模式、--top-k、--watch-config、--processes、--secondary-patterns 同时使用')
+    if args.patterns_file and (args.orders or args.pattern_quotas or multichain or args.top_k is not None):
+        parser.error('--patterns-file 不能与 --orders、--pattern-quotas、多链模式、--top-k 同时使用')
+    if (args.plugin or args.plugin_filter) and (args.orders or args.pattern_quotas or multichain
+                                                 or args.top_k is not None):
+        parser.error('--plugin/--plugin-filter 不能与 --orders、--pattern-quotas、多链模式、--top-k 同时使用')
+    if args.split_key and (args.orders or args.pattern_quotas or multichain or args.top_k is not None
+                           or args.processes or args.secondary_patterns):
+        parser.error('--split-key 不能与 --orders、--pattern-quotas、多链模式、--top-k、--processes、--secondary-patterns 同时使用')
+    split_key = None
+    if args.split_key:
+        try:
+            split_key = bytes.fromhex(args.split_key)
+            parse_public_key(split_key)
+        except ValueError as e:
+            parser.error(f'无效的基础公钥: {e}')
+    if multichain and (args.top_k is not None or args.watch_config or args.processes
+                       or args.secondary_patterns):
+        parser.error('--eth-patterns/--btc-patterns 不能与 --top-k、--watch-config、--processes、--secondary-patterns 同时使用')
+    if args.top_k is not None and args.top_k < 1:
+        parser.error('--top-k 至少为1')
+    if args.top_k is not None and args.time_budget is None and args.max_attempts is None:
+        parser.error('--top-k 需要同时指定 --time-budget 或 --max-attempts')
     
     # 创建生成器
-    generator = TRXVanityGenerator(use_gpu=not args.no_gpu)
+    config = ConfigManager(args.config)
+    watcher = None
+    if args.watch_config:
+        if args.patterns or args.secondary_patterns is not None:
+            parser.error('--watch-config 从配置文件加载模式，不能与 --patterns/--secondary-patterns 同时使用')
+        try:
+            watcher = PatternWatcher(args.config)
+        except ValueError as e:
+            parser.error(str(e))
+        args.patterns, secondary_patterns = watcher.current
+        if args.no_inventory or args.split_key:
+            secondary_patterns = []
+    elif args.secondary_patterns is not None:
+        if args.no_inventory and args.secondary_patterns:
+            parser.error('--secondary-patterns 需要使用靓号库存，不能与 --no-inventory 同时使用')
+        secondary_patterns = args.secondary_patterns
+    elif args.no_inventory or multichain or args.orders or args.pattern_quotas or args.split_key:
+        secondary_patterns = []
+    else:
+        secondary_patterns = list(config.get_secondary_patterns())
+    book = None
+    if args.orders:
+        try:
+            book = OrderBook.from_file(args.orders)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            parser.error(f'无法加载订单文件: {e}')
+    elif args.pattern_quotas:
+        try:
+            quotas = parse_pattern_quotas(args.pattern_quotas)
+        except ValueError as e:
+            parser.error(str(e))
+        invalid = [p for p in quotas if not config.validate_pattern(p)]
+        if invalid:
+            parser.error(f'无效的模式: {invalid}')
+        book = OrderBook.from_quotas(quotas)
+    if book is not None:
+        invalid = [p for order in book.orders.values() for p in order.patterns if not config.validate_pattern(p)]
+        if invalid:
+            parser.error(f'订单中有无效的模式: {invalid}')
+    chain_patterns = {'trx': args.patterns or [], 'eth': args.eth_patterns or [], 'btc': args.btc_patterns or []}
+    invalid = [p for chain, patterns in chain_patterns.items() for p in patterns if not pattern_syntax_ok(p, chain)]
+    if invalid:
+        parser.error(f'无效的模式: {invalid}')
+    affix_index = None
+    if args.patterns_file:
+        try:
+            affix_index = AffixIndex.from_file(args.patterns_file)
+        except (OSError, ValueError) as e:
+            parser.error(f'无法加载前缀/后缀列表: {e}')
+        if not len(affix_index):
+            parser.error(f'{args.patterns_file} 中没有任何条目')
+    plugins = None
+    if args.plugin or args.plugin_filter:
+        try:
+            plugins = PluginSet.load(args.plugin, args.plugin_filter)
+        except ValueError as e:
+            parser.error(str(e))
+    if affix_index is not None or (plugins is not None and plugins.matchers):
+        args.patterns = args.patterns or []
+    elif not args.patterns:
+        args.patterns = ['consecutive_3', 'consecutive_4', 'repeat_8_3', 'repeat_9_3']
+    invalid = [p for p in secondary_patterns if not config.validate_pattern(p)]
+    if invalid:
+        parser.error(f'无效的次级模式: {invalid}')
+
+    # 本机校准配置（config_manager.py --calibrate）
+    settings = config.get_effective_settings('trx')
+    if args.batch_size is None:
+        args.batch_size = settings.get('batch_size', 10000)
+    use_gpu = not args.no_gpu and settings.get('use_gpu', True)
+    if args.processes is None:
+        # 只有普通搜索支持生产进程，其他模式不套用校准的进程数
+        plain = book is None and not multichain and args.top_k is None and not args.watch_config and not split_key
+        args.processes = config.get_default_processes('trx') if plain else 0
+
+    generator = TRXVanityGenerator(use_gpu=use_gpu, quiet=args.quiet)
+    if config.get_host_profile('trx'):
+        generator._log(f"{Fore.CYAN}使用本机校准配置: batch_size={args.batch_size}, "
+                       f"GPU={'是' if use_gpu else '否'}, 生产进程={args.processes}{Style.RESET_ALL}")
+    # 多链模式的结果不属于TRX，分离密钥模式的结果没有完整私钥，都不使用TRX靓号库存
+    inventory = None if args.no_inventory or multichain or split_key else VanityInventory(args.inventory)
     
     try:
-        # 开始寻找靓号
-        found_addresses = generator.find_vanity_addresses(
-            patterns=args.patterns,
-            max_addresses=args.max_addresses,
-            batch_size=args.batch_size,
-            save_to_file=True
-        )
+        if book is not None:
+            # 所有订单共享一次扫描（每模式数量时每个模式是一个订单，结果按普通格式保存）
+            generator.fill_orders(
+                book,
+                batch_size=args.batch_size,
+                save_to_file=not args.pattern_quotas,
+                inventory=inventory,
+                derive_workers=args.derive_workers
+            )
+            found_addresses = generator.found_addresses
+            if args.pattern_quotas and found_addresses:
+                generator.save_results()
+        elif multichain:
+            # 同一次派生检查多条链的模式（未指定 --patterns 时不检查TRX）
+            found_addresses = generator.find_multichain_addresses(
+                chain_patterns=chain_patterns,
+                max_addresses=args.max_addresses,
+                batch_size=args.batch_size,
+                save_to_file=True,
+                derive_workers=args.derive_workers
+            )
+        elif args.top_k is not None:
+            # 收集预算内分数最高的靓号
+            found_addresses = generator.find_best_addresses(
+                patterns=args.patterns,
+                top_k=args.top_k,
+                time_budget=args.time_budget,
+                max_attempts=args.max_attempts,
+                batch_size=args.batch_size,
+                flush_interval=args.flush_interval,
+                output=args.output,
+                inventory=inventory
+            )
+        else:
+            # 开始寻找靓号
+            found_addresses = generator.find_vanity_addresses(
+                patterns=args.patterns,
+                max_addresses=args.max_addresses,
+                batch_size=args.batch_size,
+                save_to_file=True,
+                inventory=inventory,
+                secondary_patterns=secondary_patterns,
+                watcher=watcher,
+                derive_workers=args.derive_workers,
+                processes=args.processes,
+                affix_index=affix_index,
+                split_key=split_key,
+                plugins=plugins
+            )
         
         # 打印统计信息
         generator.print_stats()
         
         # 显示找到的靓号
-        if found_addresses:
+        if found_addresses and not args.quiet:
             print(f"\n{Fore.CYAN}找到的靓号地址:{Style.RESET_ALL}")
             for i, addr in enumerate(found_addresses, 1):
                 print(f"\n{i}. {Fore.YELLOW}{addr.address}{Style.RESET_ALL}")
+                if addr.chain != "trx":
+                    print(f"   链: {addr.chain.upper()}")
                 print(f"   模式: {addr.pattern}")
                 print(f"   分数: {addr.score}")
-                print(f"   私钥: {addr.private_key}")
+                if addr.partial_key:
+                    print(f"   部分私钥: {addr.partial_key}（与基础私钥相加得到最终私钥）")
+                else:
+                    print(f"   私钥: {addr.private_key}")
                 print(f"   助记词: {addr.mnemonic}") # 显示助记词
         
     except KeyboardInterrupt:
@@ -503,6 +1860,9 @@ def main():
     except Exception as e:
         print(f"\n{Fore.RED}错误: {e}{Style.RESET_ALL}")
         sys.exit(1)
+    finally:
+        if inventory is not None:
+            inventory.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -115,11 +115,8 @@ class TRXVanityGenerator:
             public_key = public_key[1:]
         sha3_hash = keccak.new(digest_bits=256, data=public_key).digest()
         
-        # RIPEMD160哈希
-        ripemd160_hash = hashlib.new('ripemd160', sha3_hash).digest()
-        
-        # 添加版本字节 (0x41 for TRX)
-        versioned_hash = b'\x41' + ripemd160_hash
+        # 添加版本字节 (0x41 for TRX)，地址哈希为Keccak-256的后20字节
+        versioned_hash = b'\x41' + sha3_hash[-20:]
         
         # 双重SHA256校验和
         checksum = hashlib.sha256(hashlib.sha256(versioned_hash).digest()).digest()[:4]
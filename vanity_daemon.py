@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常驻靓号守护进程
+简单模式（3-4个字符）的任务耗时主要花在解释器启动、导入和流水线启动上，而不是搜索本身。
+守护进程常驻内存，保持TRX/onion生成器已导入、已初始化，并在后台维护一个预先派生好的
+地址储备池：任务到达时先对整个储备池做一次批量匹配，命中的行立即交付并标记为已用
+（每个密钥只交付一次），后台线程重新派生用过的分块；储备池不够时再启动完整的搜索
+引擎（search_iter）补足剩余数量。任务经本地Unix套接字提交，命中逐条流式返回。
+
+协议：每行一个JSON对象。客户端发送一个请求，守护进程依次返回
+{"event": "hit", ...}、最后 {"event": "done", ...} 或 {"event": "error", ...}；
+客户端断开连接或发送 {"command": "cancel"} 时任务在下一个分块边界停止。
+
+套接字放在本用户私有（0700）的目录中：$XDG_RUNTIME_DIR，或临时目录下的 vanity-<uid>。
+服务端拒绝在其他用户可写的目录中监听，客户端只连接本用户创建的套接字，
+防止其他用户抢先占用套接字路径、向客户端下发他们掌握私钥的地址。
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import statistics
+import struct
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from batch_buffer import DEFAULT_BUFFER_ROWS
+from vanity_engines import ENGINES, new_engine
+
+
+
+def default_socket_path() -> str:
+    """本用户私有目录中的默认套接字路径"""
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if not runtime or not os.path.isdir(runtime):
+        runtime = os.path.join(tempfile.gettempdir(), f"vanity-{os.getuid()}")
+    return os.path.join(runtime, "vanity_daemon.sock")
+
+
+DEFAULT_SOCKET_PATH = default_socket_path()
+DEFAULT_RESERVOIR_ROWS = 16 * DEFAULT_BUFFER_ROWS
+MATCHER_CACHE_SIZE = 64
+
+
+class Reservoir:
+    """预派生地址储备池
+
+    由若干个满容量的BatchBuffer分块组成，每个分块带一个已用行掩码和派生时一次性
+    准备好的匹配视图（TRX为地址主体字符矩阵，onion为已编码的_OnionBatch）。take() 在锁内
+    对所有分块整批匹配并把命中的行标记为已用，保证同一个密钥只交付一次；后台线程
+    把已用行最多的分块整体重新派生后替换（派生在锁外进行，只有替换时加锁）。
+    """
+
+    def __init__(self, engine, rows: int = DEFAULT_RESERVOIR_ROWS, chunk_rows: int = DEFAULT_BUFFER_ROWS):
+        self.engine = engine
+        self.chunk_rows = chunk_rows
+        self.chunks: List[list] = []  # [buffer, 匹配视图, used]
+        self.target_chunks = max(1, rows // chunk_rows)
+        self.served = 0
+        self.refilled = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._cache: Dict[tuple, object] = {}
+        self._thread = threading.Thread(target=self._refill_loop, name=f"reservoir-{engine.name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def close(self):
+        self._closed.set()
+        self._wakeup.set()
+        self._thread.join()
+
+    @property
+    def rows(self) -> int:
+        with self._lock:
+            return sum(int(buffer.size - used.sum()) for buffer, _, used in self.chunks)
+
+    def compile(self, request: Dict):
+        """编译请求的匹配器（按模式缓存，只在储备池锁内使用）"""
+        key = self.engine.key(request)
+        compiled = self._cache.get(key)
+        if compiled is None:
+            compiled = self.engine.compile(request)
+            if len(self._cache) >= MATCHER_CACHE_SIZE:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = compiled
+        return compiled
+
+    def take(self, request: Dict, limit: int) -> list:
+        """从储备池取出最多limit个命中并标记为已用"""
+        hits = []
+        with self._lock:
+            compiled = self.compile(request)
+            for buffer, view, used in self.chunks:
+                for row, hit in self.engine.hits(compiled, buffer, view, used):
+                    used[row] = True
+                    hits.append(hit)
+                    if len(hits) >= limit:
+                        break
+                if len(hits) >= limit:
+                    break
+            self.served += len(hits)
+        if hits:
+            self._wakeup.set()
+        return hits
+
+    def _next_slot(self) -> Optional[int]:
+        """需要（重新）派生的分块：未满时追加，否则取已用行最多的分块"""
+        with self._lock:
+            if len(self.chunks) < self.target_chunks:
+                return len(self.chunks)
+            used = [int(used.sum()) for _, _, used in self.chunks]
+            slot = int(np.argmax(used))
+            return slot if used[slot] > 0 else None
+
+    def _refill_loop(self):
+        generator = self.engine.new_generator()
+        while not self._closed.is_set():
+            slot = self._next_slot()
+            if slot is None:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            buffer = self.engine.new_buffer(self.chunk_rows)
+            generator.fill_buffer(buffer, self.chunk_rows)
+            chunk = [buffer, self.engine.prepare(buffer), np.zeros(self.chunk_rows, dtype=bool)]
+            with self._lock:
+                if slot < len(self.chunks):
+                    self.chunks[slot] = chunk
+                    self.refilled += 1
+                else:
+                    self.chunks.append(chunk)
+
+
+class VanityDaemon:
+    """守护进程状态：各引擎的储备池与任务统计"""
+
+    def __init__(self, engines: List[str] = ENGINES, reservoir_rows: int = DEFAULT_RESERVOIR_ROWS,
+                 use_gpu: bool = True):
+        self.engines = {name: new_engine(name, use_gpu) for name in engines}
+        self.reservoirs = {name: Reservoir(engine, reservoir_rows) for name, engine in self.engines.items()}
+        self.started = time.time()
+        self.jobs = 0
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        for reservoir in self.reservoirs.values():
+            reservoir.start()
+
+    def close(self):
+        for reservoir in self.reservoirs.values():
+            reservoir.close()
+
+    def status(self) -> Dict:
+        return {
+            'uptime': time.time() - self.started,
+            'jobs': self.jobs,
+            'active': self.active,
+            'reservoirs': {name: {'rows': reservoir.rows, 'served': reservoir.served,
+                                  'refilled_chunks': reservoir.refilled}
+                           for name, reservoir in self.reservoirs.items()},
+        }
+
+    def run_job(self, request: Dict, stop: threading.Event) -> Iterator[Dict]:
+        """执行一个任务，依次产出命中事件，最后产出done事件（请求无效时抛出ValueError）"""
+        name = request.get('engine', 'trx')
+        if name not in self.engines:
+            raise ValueError(f"守护进程未启用引擎 {name!r}（可用: {sorted(self.engines)}）")
+        count = int(request.get('count', 1))
+        if count < 1:
+            raise ValueError("count 必须大于0")
+        engine, reservoir = self.engines[name], self.reservoirs[name]
+        began = time.perf_counter()
+        with self._lock:
+            self.jobs += 1
+            self.active += 1
+        try:
+            found = 0
+            for hit in reservoir.take(request, count):
+                found += 1
+                yield {'event': 'hit', 'source': 'reservoir', 'hit': asdict(hit)}
+            checked = 0
+            if found < count and not stop.is_set():
+                generator = engine.new_generator()
+                for hit in engine.search(generator, request, count - found, stop):
+                    found += 1
+                    yield {'event': 'hit', 'source': 'search', 'hit': asdict(hit)}
+                checked = generator.stats['total_generated']
+            yield {'event': 'done', 'engine': name, 'found': found, 'checked': checked,
+                   'cancelled': stop.is_set() and found < count,
+                   'elapsed': time.perf_counter() - began}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    """一个连接一个任务：读取请求行，流式写回事件；另一线程监视断开/取消"""
+
+    def _send(self, event: Dict):
+        self.wfile.write(json.dumps(event, ensure_ascii=False).encode('utf-8') + b"\n")
+        self.wfile.flush()
+
+    def _watch(self, stop: threading.Event):
+        try:
+            for line in self.rfile:
+                if json.loads(line).get('command') == 'cancel':
+                    break
+        except (OSError, ValueError):
+            pass
+        stop.set()
+
+    def handle(self):
+        daemon: VanityDaemon = self.server.daemon
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError as e:
+            self._send({'event': 'error', 'message': f"请求不是有效的JSON: {e}"})
+            return
+        if request.get('command') == 'status':
+            self._send({'event': 'status', **daemon.status()})
+            return
+        stop = threading.Event()
+        threading.Thread(target=self._watch, args=(stop,), daemon=True).start()
+        events = daemon.run_job(request, stop)
+        try:
+            for event in events:
+                self._send(event)
+        except ValueError as e:
+            self._send({'event': 'error', 'message': str(e)})
+        except OSError:
+            stop.set()  # 客户端已断开
+        finally:
+            events.close()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _private_socket_dir(socket_path: str) -> str:
+    """创建（如不存在）并检查套接字所在目录：必须是本用户所有、其他用户不可访问的真实目录"""
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"套接字目录 {directory} 必须是本用户所有且权限为0700的目录")
+    return directory
+
+
+def _check_socket_owner(socket_path: str):
+    """连接前确认套接字由本用户创建"""
+    info = os.lstat(socket_path)
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"{socket_path} 不是本用户的守护进程套接字，拒绝连接")
+
+
+def _check_peer(sock: socket.socket, socket_path: str):
+    """连接后确认对端进程属于本用户（支持SO_PEERCRED的平台）"""
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return
+    _, uid, _ = struct.unpack('3i', sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i')))
+    if uid != os.getuid():
+        raise PermissionError(f"{socket_path} 上的守护进程属于其他用户（uid {uid}），拒绝连接")
+
+
+def serve(socket_path: str = DEFAULT_SOCKET_PATH, engines: List[str] = ENGINES,
+          reservoir_rows: int = DEFAULT_RESERVOIR_ROWS, use_gpu: bool = True, ready: threading.Event = None,
+          shutdown: threading.Event = None):
+    """运行守护进程直到被中断（或shutdown被设置）
+
+    套接字所在目录必须是本用户私有的0700目录（不存在时创建），套接字权限为0600。
+    """
+    _private_socket_dir(socket_path)
+    if os.path.lexists(socket_path):
+        if not stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+            raise PermissionError(f"{socket_path} 已存在且不是套接字")
+        os.unlink(socket_path)  # 上次运行遗留的套接字
+    daemon = VanityDaemon(engines, reservoir_rows, use_gpu)
+    daemon.start()
+    old_umask = os.umask(0o177)
+    try:
+        server = _Server(socket_path, _JobHandler)
+    finally:
+        os.umask(old_umask)
+    server.daemon = daemon
+    if shutdown is not None:
+        threading.Thread(target=lambda: (shutdown.wait(), server.shutdown()), daemon=True).start()
+    if ready is not None:
+        ready.set()
+    try:
+        server.serve_forever(poll_interval=0.2)
+    finally:
+        server.server_close()
+        daemon.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def submit(request: Dict, socket_path: str = DEFAULT_SOCKET_PATH) -> Iterator[Dict]:
+    """提交请求并逐个产出守护进程返回的事件；提前停止迭代即取消任务"""
+    _check_socket_owner(socket_path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        _check_peer(sock, socket_path)
+        sock.sendall(json.dumps(request).encode('utf-8') + b"\n")
+        with sock.makefile('rb') as stream:
+            for line in stream:
+                event = json.loads(line)
+                yield event
+                if event['event'] in ('done', 'error', 'status'):
+                    return
+
+
+def _job_request(args) -> Dict:
+    request = {'engine': args.engine, 'count': args.count, 'patterns': args.patterns or []}
+    if args.engine == 'onion':
+        request.update(prefixes=args.prefix or [], expression=args.expr,
+                       case_sensitive=args.case_sensitive, require_all=args.require_all)
+    return request
+
+
+def main():
+    """守护进程与客户端命令行"""
+    parser = argparse.ArgumentParser(description='常驻靓号守护进程（Unix套接字）')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH, help=f'套接字路径（默认 {DEFAULT_SOCKET_PATH}）')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = sub.add_parser('serve', help='启动守护进程')
+    serve_parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES), help='启用的引擎')
+    serve_parser.add_argument('--reservoir', type=int, default=DEFAULT_RESERVOIR_ROWS,
+                              help='每个引擎预派生的地址数')
+    serve_parser.add_argument('--no-gpu', action='store_true', help='禁用GPU')
+
+    for name, help_text in (('submit', '提交任务并流式输出命中'), ('bench', '重复提交同一任务，统计延迟')):
+        job = sub.add_parser(name, help=help_text)
+        job.add_argument('--engine', choices=ENGINES, default='trx', help='引擎')
+        job.add_argument('--patterns', nargs='+', help='模式列表（TRX模式或onion通用模式）')
+        job.add_argument('--prefix', nargs='+', help='onion前缀模式')
+        job.add_argument('--expr', help='onion布尔模式表达式')
+        job.add_argument('--case-sensitive', action='store_true', help='onion大小写敏感')
+        job.add_argument('--require-all', action='store_true', help='onion前缀与通用模式必须同时匹配')
+        job.add_argument('--count', type=int, default=1, help='需要的地址数量')
+        if name == 'submit':
+            job.add_argument('--output', help='结果文件（JSON）')
+        else:
+            job.add_argument('--jobs', type=int, default=50, help='提交次数')
+    sub.add_parser('status', help='查看守护进程状态')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        print(f"🛰️  守护进程监听 {args.socket}（引擎: {', '.join(args.engines)}，"
+              f"每个引擎储备 {args.reservoir:,} 个地址）")
+        signal.signal(signal.SIGTERM, signal.default_int_handler)  # kill 与 Ctrl+C 一样清理套接字
+        try:
+            serve(args.socket, args.engines, args.reservoir, not args.no_gpu)
+        except PermissionError as e:
+            parser.error(str(e))
+        except KeyboardInterrupt:
+            print("守护进程已停止")
+        return
+
+    try:
+        if args.command == 'status':
+            print(json.dumps(next(submit({'command': 'status'}, args.socket)), indent=2, ensure_ascii=False))
+            return
+        request = _job_request(args)
+        if args.command == 'bench':
+            latencies = []
+            for _ in range(args.jobs):
+                began = time.perf_counter()
+                for event in submit(request, args.socket):
+                    if event['event'] == 'error':
+                        parser.error(event['message'])
+                latencies.append((time.perf_counter() - began) * 1000)
+            latencies.sort()
+            print(f"{args.jobs} 个任务: P50 {statistics.median(latencies):.1f}ms, "
+                  f"P95 {latencies[int(len(latencies) * 0.95) - 1]:.1f}ms, 最大 {latencies[-1]:.1f}ms")
+            return
+
+        hits = []
+        for event in submit(request, args.socket):
+            if event['event'] == 'hit':
+                hit = event['hit']
+                hits.append(hit)
+                print(f"{hit.get('address') or hit.get('onion')}  {hit['pattern']}  ({event['source']})")
+            elif event['event'] == 'error':
+                parser.error(event['message'])
+            else:
+                print(f"完成: {event['found']} 个命中，用时 {event['elapsed'] * 1000:.1f}ms")
+    except (FileNotFoundError, ConnectionRefusedError):
+        parser.error(f"无法连接守护进程 {args.socket}，请先运行: python vanity_daemon.py serve")
+    except PermissionError as e:
+        parser.error(str(e))
+    except KeyboardInterrupt:
+        return
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': datetime.now().isoformat(), 'request': request, 'results': hits},
+                      f, indent=2, ensure_ascii=False)
+        print(f"结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成器引擎适配
+把TRX与onion生成器包装成统一的接口，供常驻守护进程（vanity_daemon.py）和任务调度器
+（job_scheduler.py）按分块驱动：new_buffer/fill_buffer 派生一个分块，prepare 准备匹配
+视图，compile 把任务请求编译成匹配器，hits 对分块整批匹配并构造命中结果。
+任务请求是JSON风格的字典：TRX使用 patterns，onion使用 prefixes、patterns、expression、
+case_sensitive、require_all。
+"""
+
+import threading
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from batch_buffer import BatchBuffer
+
+ENGINES = ("trx", "onion")
+
+
+class TRXEngine:
+    """TRX生成器适配：请求字段 patterns"""
+
+    name = "trx"
+
+    def __init__(self, use_gpu: bool):
+        from trx_vanity_address import TRXVanityGenerator
+        self._factory = lambda: TRXVanityGenerator(use_gpu=use_gpu, quiet=True)
+        self.generator = self._factory()
+
+    def new_generator(self):
+        return self._factory()
+
+    def new_buffer(self, rows: int) -> BatchBuffer:
+        return self.generator._new_buffer(rows)
+
+    @staticmethod
+    def key(request: Dict) -> tuple:
+        return tuple(request.get('patterns') or ())
+
+    def compile(self, request: Dict):
+        from config_manager import ConfigManager
+        patterns = list(request.get('patterns') or [])
+        invalid = [p for p in patterns if not ConfigManager.validate_pattern(p)]
+        if not patterns or invalid:
+            raise ValueError(f"无效的TRX模式: {invalid or patterns}")
+        return self.generator._compile_tiers(patterns, [])
+
+    @staticmethod
+    def probability(request: Dict) -> Optional[float]:
+        """单个候选地址命中任一模式的估计概率"""
+        from trx_vanity_address import pattern_probability
+        miss = 1.0
+        for pattern in request.get('patterns') or ():
+            miss *= 1.0 - pattern_probability(pattern)
+        return 1.0 - miss
+
+    @staticmethod
+    def prepare(buffer: BatchBuffer):
+        return buffer.matrix[:, 1:]  # 移除T前缀
+
+    def hits(self, compiled, buffer: BatchBuffer, body: np.ndarray, used: np.ndarray) -> list:
+        all_patterns, batch_matcher, matcher = compiled
+        rows = batch_matcher.match_batch(body)
+        rows = rows[~used[rows]]
+        return [(row, hit) for row, _, hit in self.generator._buffer_hits(buffer, rows, all_patterns, matcher)]
+
+    @staticmethod
+    def search(generator, request: Dict, remaining: int, stop: threading.Event) -> Iterator:
+        return generator.search_iter(list(request['patterns']), remaining,
+                                     request.get('batch_size', 10000), stop=stop)
+
+
+class OnionEngine:
+    """onion生成器适配：请求字段 prefixes、patterns、expression、case_sensitive、require_all"""
+
+    name = "onion"
+
+    def __init__(self, use_gpu: bool):
+        from onion_finder import OnionVanityGenerator
+        self._factory = lambda: OnionVanityGenerator(use_gpu=use_gpu, quiet=True)
+        self.generator = self._factory()
+
+    def new_generator(self):
+        return self._factory()
+
+    @staticmethod
+    def new_buffer(rows: int) -> BatchBuffer:
+        return BatchBuffer(rows, output_width=32)
+
+    @staticmethod
+    def key(request: Dict) -> tuple:
+        return (tuple(request.get('prefixes') or ()), tuple(request.get('patterns') or ()),
+                request.get('expression'), bool(request.get('case_sensitive')), bool(request.get('require_all')))
+
+    def compile(self, request: Dict):
+        from onion_finder import OnionPatternMatcher
+        case_sensitive = bool(request.get('case_sensitive'))
+        if request.get('expression'):
+            return OnionPatternMatcher.from_expression(request['expression'], case_sensitive).ensure_possible()
+        if not request.get('prefixes') and not request.get('patterns'):
+            raise ValueError("onion任务需要 prefixes、patterns 或 expression")
+        return OnionPatternMatcher(list(request.get('prefixes') or []), list(request.get('patterns') or []),
+                                   case_sensitive, bool(request.get('require_all'))).ensure_possible()
+
+    @staticmethod
+    def probability(request: Dict) -> Optional[float]:
+        """onion模式可以是任意布尔表达式，不做估计"""
+        return None
+
+    @staticmethod
+    def prepare(buffer: BatchBuffer):
+        from onion_finder import _OnionBatch
+        return _OnionBatch(buffer.matrix)  # 前51个字符只编码一次，校验和按需计算并缓存
+
+    def hits(self, matcher, buffer: BatchBuffer, batch, used: np.ndarray) -> list:
+        rows = matcher.match_batch(batch)
+        rows = rows[~used[rows]]
+        return self.generator._buffer_hits(buffer.keys[:buffer.size], buffer.matrix, rows, matcher)
+
+    @staticmethod
+    def search(generator, request: Dict, remaining: int, stop: threading.Event) -> Iterator:
+        return generator.search_iter(list(request.get('prefixes') or []), list(request.get('patterns') or []),
+                                     remaining, request.get('batch_size', 10000),
+                                     bool(request.get('case_sensitive')), bool(request.get('require_all')),
+                                     request.get('expression'), stop=stop)
+
+
+def new_engine(name: str, use_gpu: bool = True):
+    """按名称创建引擎适配器"""
+    adapters = {"trx": TRXEngine, "onion": OnionEngine}
+    if name not in adapters:
+        raise ValueError(f"未知的引擎 {name!r}（可用: {', '.join(ENGINES)}）")
+    return adapters[name](use_gpu)
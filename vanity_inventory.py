@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+靓号库存
+基于SQLite保存历次运行找到的靓号地址，搜索前先从库存中直接交付已有的匹配地址，
+只为剩余数量启动搜索。所有查询都走索引（地址、模式、前缀、反转后缀、连续段长度），
+库存达到千万级时查询仍然只扫描候选区间。
+"""
+
+import argparse
+import glob
+import json
+import sqlite3
+from typing import Callable, Dict, Iterable, List, Tuple
+
+DEFAULT_INVENTORY = "vanity_inventory.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS addresses (
+    address     TEXT PRIMARY KEY,
+    private_key TEXT NOT NULL,
+    mnemonic    TEXT NOT NULL DEFAULT '',
+    pattern     TEXT NOT NULL DEFAULT '',
+    score       INTEGER NOT NULL DEFAULT 0,
+    timestamp   REAL NOT NULL DEFAULT 0,
+    prefix      TEXT NOT NULL,
+    suffix      TEXT NOT NULL,
+    run_length  INTEGER NOT NULL,
+    tail_run    INTEGER NOT NULL,
+    claimed     INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_addresses_pattern ON addresses (claimed, pattern);
+CREATE INDEX IF NOT EXISTS idx_addresses_prefix ON addresses (claimed, prefix);
+CREATE INDEX IF NOT EXISTS idx_addresses_suffix ON addresses (claimed, suffix);
+CREATE INDEX IF NOT EXISTS idx_addresses_run ON addresses (claimed, run_length);
+CREATE INDEX IF NOT EXISTS idx_addresses_tail ON addresses (claimed, tail_run);
+"""
+
+_COLUMNS = ("address", "private_key", "mnemonic", "pattern", "score", "timestamp")
+_DEFAULTS = {"mnemonic": "", "pattern": "", "score": 0, "timestamp": 0.0}
+
+# 文本区间查询的上界哨兵（大于任何地址字符）
+_HIGH = "\U0010ffff"
+
+
+def _run_lengths(body: str) -> Tuple[int, int]:
+    """(最长连续相同字符长度, 末尾连续相同字符长度)"""
+    if not body:
+        return 0, 0
+    best = cur = 1
+    for prev, char in zip(body, body[1:]):
+        cur = cur + 1 if char == prev else 1
+        if cur > best:
+            best = cur
+    return best, cur
+
+
+class VanityInventory:
+    """SQLite靓号库存
+
+    prefix列保存去掉链前缀字符后的地址主体，suffix列保存反转后的地址，
+    前缀和后缀查询都转换成索引上的区间扫描。claimed标记已交付的地址，
+    同一个地址不会被交付两次。
+    """
+
+    def __init__(self, path: str = DEFAULT_INVENTORY, body_offset: int = 1):
+        self.path = path
+        self.body_offset = body_offset
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> 'VanityInventory':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _row(self, record, claimed: bool) -> tuple:
+        if isinstance(record, dict):
+            values = [record.get(name, _DEFAULTS.get(name)) for name in _COLUMNS]
+        else:
+            values = [getattr(record, name) for name in _COLUMNS]
+        address = values[0]
+        body = address[self.body_offset:]
+        run_length, tail_run = _run_lengths(body)
+        return (*values, body, address[::-1], run_length, tail_run, int(claimed))
+
+    def add(self, records: Iterable, claimed: bool = False) -> int:
+        """批量写入（地址已存在时忽略），返回新写入的条数"""
+        rows = [self._row(record, claimed) for record in records]
+        if not rows:
+            return 0
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO addresses (address, private_key, mnemonic, pattern, score, timestamp,"
+                " prefix, suffix, run_length, tail_run, claimed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows)
+            return self.conn.total_changes - before
+
+    def _candidate_queries(self, pattern: str) -> List[Tuple[str, tuple, str]]:
+        """把模式转换成若干条走索引的候选查询 (where, 参数, 排序)
+
+        排序都沿索引方向，游标按需读取，不会对大区间排序。包含型模式只能通过
+        模式标签和前缀/后缀区间命中，出现在地址中间且标签不同的地址查不到。
+        候选结果仍需用匹配函数复核。
+        """
+        if pattern.startswith('ends_consecutive_'):
+            return [("tail_run >= ?", (int(pattern.split('_')[-1]),), "tail_run DESC")]
+        if pattern.startswith('consecutive_'):
+            return [("run_length >= ?", (int(pattern.split('_')[1]),), "run_length DESC")]
+        if pattern.startswith('repeat_'):
+            digit = pattern.split('_')[1]
+            stem = f"repeat_{digit}_"
+            return [("pattern >= ? AND pattern < ?", (stem, stem + _HIGH), "pattern DESC")]
+        if pattern.startswith(('palindrome_', 'ascending_', 'descending_')):
+            # 这几类没有专门的索引列，按同类模式标签扫描（palindrome_9 的库存也满足 palindrome_7）
+            stem = pattern.split('_')[0] + '_'
+            return [("pattern >= ? AND pattern < ?", (stem, stem + _HIGH), "pattern DESC")]
+        text = pattern.split('_', 1)[1] if pattern.startswith('custom_') else pattern
+        return [
+            ("pattern IN (?, ?)", (text, f"custom_{text}"), "pattern"),
+            ("prefix >= ? AND prefix < ?", (text, text + _HIGH), "prefix"),
+            ("suffix >= ? AND suffix < ?", (text[::-1], text[::-1] + _HIGH), "suffix"),
+        ]
+
+    def lookup(self, pattern: str, matches: Callable[[str, str], bool],
+               limit: int = None, include_claimed: bool = False) -> List[Dict]:
+        """查找匹配pattern的库存地址（最多limit个，结果按分数降序）
+
+        matches(body, pattern) 用于复核候选行，保证语义与生成器的匹配逻辑一致。
+        """
+        claimed_values = (0, 1) if include_claimed else (0,)
+        seen = set()
+        results = []
+        for where, params, order in self._candidate_queries(pattern):
+            for claimed in claimed_values:
+                cursor = self.conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)}, prefix FROM addresses"
+                    f" WHERE claimed = ? AND {where} ORDER BY {order}",
+                    (claimed, *params))
+                for row in cursor:
+                    if limit is not None and len(results) >= limit:
+                        break
+                    if row["address"] in seen or not matches(row["prefix"], pattern):
+                        continue
+                    seen.add(row["address"])
+                    results.append({name: row[name] for name in _COLUMNS})
+        results.sort(key=lambda r: r["score"], reverse=True)
+        return results
+
+    def claim(self, patterns: List[str], matches: Callable[[str, str], bool], limit: int) -> List[Dict]:
+        """交付最多limit个匹配任一模式的未交付地址，并标记为已交付
+
+        返回的每条记录的pattern改为它匹配的第一个请求模式。BEGIN IMMEDIATE先取得
+        写锁再查询，共用同一个库存文件的多个进程（命令行、守护进程）不会交付同一个地址；
+        更新时再确认 claimed = 0，只交付确实由本次事务标记的行。
+        """
+        claimed = []
+        seen = set()
+        self.conn.execute("BEGIN IMMEDIATE")
+        with self.conn:
+            for pattern in patterns:
+                if len(claimed) >= limit:
+                    break
+                # 候选中最多有len(seen)个已处理过的地址，多取这么多行才能凑够剩余数量
+                for row in self.lookup(pattern, matches, limit=limit - len(claimed) + len(seen)):
+                    if row["address"] in seen:
+                        continue
+                    seen.add(row["address"])
+                    cursor = self.conn.execute(
+                        "UPDATE addresses SET claimed = 1 WHERE address = ? AND claimed = 0", (row["address"],))
+                    if cursor.rowcount != 1:
+                        continue
+                    row["pattern"] = pattern
+                    claimed.append(row)
+                    if len(claimed) >= limit:
+                        break
+        return claimed
+
+    def import_json(self, filename: str, claimed: bool = False) -> int:
+        """导入生成器保存的结果JSON文件，返回新写入的条数"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return self.add(data.get('addresses', []), claimed=claimed)
+
+    def stats(self) -> Dict[str, int]:
+        total, claimed = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(claimed), 0) FROM addresses").fetchone()
+        return {'total': total, 'claimed': claimed, 'available': total - claimed}
+
+
+class InventorySink:
+    """库存批量写入缓冲区
+
+    搜索循环只把记录追加到内存缓冲区，累计到flush_size条时用一次事务批量写入，
+    写入的地址均为未交付状态。
+    """
+
+    def __init__(self, inventory: VanityInventory, flush_size: int = 1000):
+        self.inventory = inventory
+        self.flush_size = flush_size
+        self.received = 0
+        self.written = 0
+        self._buffer = []
+
+    def put(self, record):
+        self._buffer.append(record)
+        self.received += 1
+        if len(self._buffer) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.written += self.inventory.add(self._buffer, claimed=False)
+            self._buffer = []
+
+    def __enter__(self) -> 'InventorySink':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+
+def main():
+    """库存管理命令行"""
+    parser = argparse.ArgumentParser(description='靓号库存管理')
+    parser.add_argument('--db', default=DEFAULT_INVENTORY, help='库存数据库文件')
+    sub = parser.add_subparsers(dest='command')
+    imp = sub.add_parser('import', help='导入历史结果JSON文件')
+    imp.add_argument('files', nargs='*', help='结果文件（默认 trx_vanity_addresses_*.json）')
+    sub.add_parser('stats', help='显示库存统计')
+    args = parser.parse_args()
+
+    with VanityInventory(args.db) as inventory:
+        if args.command == 'import':
+            files = args.files or sorted(glob.glob("trx_vanity_addresses_*.json"))
+            for filename in files:
+                added = inventory.import_json(filename)
+                print(f"{filename}: 新增 {added} 个地址")
+        stats = inventory.stats()
+        print(f"库存: {stats['total']:,} 个地址，可交付 {stats['available']:,}，已交付 {stats['claimed']:,}")
+
+
+if __name__ == "__main__":
+    main()
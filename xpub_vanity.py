@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+扩展公钥（xpub）靓号搜索
+客户提供账户级扩展公钥（如 m/44'/195'/0'/0 的xpub），在非硬化子索引 i = 0..N 中
+查找地址匹配模式的子地址，只报告命中的索引，全程不接触任何私钥。每个子公钥只需
+一次HMAC-SHA512、一次定基标量乘IL·G和一次点加，地址载荷的校验和、
+Base58编码和模式匹配整批完成；索引区间可以分给多个进程并行扫描。
+"""
+
+import argparse
+import hmac
+import json
+import multiprocessing
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import base58
+import ecdsa
+import numpy as np
+
+from batch_buffer import DEFAULT_BUFFER_ROWS
+from progress_reporter import ProgressReporter
+
+try:
+    from coincurve import PublicKey as CoincurvePublicKey
+    COINCURVE_AVAILABLE = True
+except ImportError:
+    COINCURVE_AVAILABLE = False
+
+XPUB_VERSIONS = (0x0488B21E, 0x043587CF)  # 主网xpub、测试网tpub
+HARDENED_INDEX = 0x80000000
+DEFAULT_ACCOUNT_PATH = "m/44'/195'/0'/0"  # TRX (SLIP-44 195) 外部地址链
+
+
+def parse_xpub(xpub: str) -> Tuple[bytes, bytes]:
+    """解析Base58Check扩展公钥，返回 (chain code, 33字节压缩公钥)"""
+    try:
+        data = base58.b58decode_check(xpub)
+    except ValueError as e:
+        raise ValueError(f"扩展公钥校验失败: {e}") from None
+    if len(data) != 78 or int.from_bytes(data[:4], 'big') not in XPUB_VERSIONS:
+        raise ValueError("不是扩展公钥（xpub/tpub）")
+    key = data[45:]
+    if key[0] not in (0x02, 0x03):
+        raise ValueError("扩展公钥中的公钥格式不正确")
+    return data[13:45], key
+
+
+class ChildKeyDeriver:
+    """BIP32非硬化子公钥派生（父公钥只解析一次）
+
+    子公钥 K_i = K + IL·G，IL为 HMAC-SHA512(chain code, K || i) 的前32字节。
+    有coincurve时IL·G走libsecp256k1的定基标量乘（预计算表），再与K做一次点加，
+    比直接tweak-add（通用标量乘）快约40%；否则用ecdsa。
+
+    整块索引的 K + IL_i·G 也可以像分离密钥模式那样做仿射点加、共用一次Montgomery
+    批量求逆（各行分母不同并不妨碍批量求逆），但每个索引约80%的耗时在HMAC和IL·G上，
+    实测Python层批量点加（约8µs/索引）与libsecp256k1的combine_keys加序列化（约10µs）
+    相差无几，整体吞吐量在测量误差以内，所以保留逐个索引的C路径。
+    """
+
+    def __init__(self, chain_code: bytes, parent: bytes):
+        self.chain_code = chain_code
+        self.parent = parent
+        if COINCURVE_AVAILABLE:
+            self._point = CoincurvePublicKey(parent)
+        else:
+            self._point = ecdsa.VerifyingKey.from_string(parent, curve=ecdsa.SECP256k1).pubkey.point
+
+    def public_key(self, index: int) -> Optional[bytes]:
+        """子公钥（64字节 x||y）；IL ≥ n 或结果为无穷远点时该索引无效，返回None"""
+        if not 0 <= index < HARDENED_INDEX:
+            raise ValueError("只能派生非硬化子索引")
+        digest = hmac.digest(self.chain_code, self.parent + index.to_bytes(4, 'big'), 'sha512')
+        tweak = digest[:32]
+        if int.from_bytes(tweak, 'big') >= ecdsa.SECP256k1.order:
+            return None
+        if COINCURVE_AVAILABLE:
+            try:
+                child = CoincurvePublicKey.combine_keys([self._point, CoincurvePublicKey.from_secret(tweak)])
+            except ValueError:
+                return None
+            return child.format(compressed=False)[1:]
+        curve = ecdsa.SECP256k1
+        child = self._point + curve.generator * int.from_bytes(tweak, 'big')
+        if child == ecdsa.ellipticcurve.INFINITY:
+            return None
+        return ecdsa.VerifyingKey.from_public_point(child, curve=curve).to_string()
+
+
+def scan_range(chain_code: bytes, parent: bytes, start: int, stop: int,
+               patterns: List[str]) -> List[Dict]:
+    """扫描子索引 [start, stop)，返回命中的 {index, address, pattern, score}"""
+    from trx_vanity_address import TRXVanityGenerator, TRX_ADDRESS_LENGTH, _base58_matrix, keccak
+
+    generator = TRXVanityGenerator(use_gpu=False, quiet=True)
+    deriver = ChildKeyDeriver(chain_code, parent)
+    all_patterns, batch_matcher, matcher = generator._compile_tiers(patterns, [])
+    hits = []
+    for chunk_start in range(start, stop, DEFAULT_BUFFER_ROWS):
+        indices = []
+        digests = []
+        for index in range(chunk_start, min(stop, chunk_start + DEFAULT_BUFFER_ROWS)):
+            public_key = deriver.public_key(index)
+            if public_key is None:
+                continue
+            indices.append(index)
+            digests.append(keccak.new(digest_bits=256, data=public_key).digest()[12:])
+        if not indices:
+            continue
+        hashes = np.frombuffer(b"".join(digests), dtype=np.uint8).reshape(len(indices), 20)
+        matrix = _base58_matrix(generator._payload_matrix(hashes), TRX_ADDRESS_LENGTH)
+        for row in batch_matcher.match_batch(matrix[:, 1:]):
+            address = matrix[row].tobytes().decode('ascii')
+            matched = matcher.match(address[1:])
+            if matched < 0:
+                continue
+            pattern = all_patterns[matched]
+            hits.append({
+                'index': indices[row],
+                'address': address,
+                'pattern': pattern,
+                'score': generator._calculate_vanity_score(address[1:], pattern),
+            })
+    return hits
+
+
+def _scan_worker(args: tuple) -> Tuple[int, List[Dict]]:
+    chain_code, parent, start, stop, patterns = args
+    return stop - start, scan_range(chain_code, parent, start, stop, patterns)
+
+
+def scan(xpub: str, patterns: List[str], start: int = 0, count: int = 1000000,
+         processes: int = 1, max_hits: int = None, quiet: bool = False,
+         range_size: int = 4 * DEFAULT_BUFFER_ROWS) -> List[Dict]:
+    """扫描子索引 [start, start+count)，按range_size切分给processes个进程并行处理
+
+    结果按索引升序；达到max_hits个命中后停止派发新区间。
+    """
+    chain_code, parent = parse_xpub(xpub)
+    stop = min(start + count, HARDENED_INDEX)
+    tasks = [(chain_code, parent, lo, min(lo + range_size, stop), list(patterns))
+             for lo in range(start, stop, range_size)]
+    hits: List[Dict] = []
+    reporter = ProgressReporter(total=stop - start, target=max_hits, desc="已扫描索引", unit="idx",
+                                quiet=quiet, format_hit=lambda hit: [f"#{hit['index']} {hit['address']} ({hit['pattern']})"])
+    with reporter:
+        if processes <= 1:
+            results = map(_scan_worker, tasks)
+            pool = None
+        else:
+            pool = multiprocessing.get_context("spawn").Pool(processes)
+            results = pool.imap(_scan_worker, tasks)
+        try:
+            for scanned, found in results:
+                reporter.checked += scanned
+                for hit in found:
+                    hits.append(hit)
+                    reporter.hit(hit)
+                reporter.found = len(hits)
+                if max_hits is not None and len(hits) >= max_hits:
+                    break
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+    hits.sort(key=lambda hit: hit['index'])
+    return hits[:max_hits] if max_hits is not None else hits
+
+
+def main():
+    """xpub子索引靓号扫描"""
+    parser = argparse.ArgumentParser(description='扩展公钥（xpub）子索引靓号搜索')
+    parser.add_argument('--xpub', required=True, help=f'账户级扩展公钥（通常为 {DEFAULT_ACCOUNT_PATH}）')
+    parser.add_argument('--patterns', nargs='+', required=True, help='靓号模式列表')
+    parser.add_argument('--start', type=int, default=0, help='起始子索引')
+    parser.add_argument('--count', type=int, default=1000000, help='扫描的索引数量')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help='并行进程数')
+    parser.add_argument('--max-hits', type=int, help='找到指定数量后停止')
+    parser.add_argument('--path', default=DEFAULT_ACCOUNT_PATH, help='xpub对应的派生路径（只用于结果显示）')
+    parser.add_argument('--output', help='结果文件（默认 xpub_vanity_时间戳.json）')
+    parser.add_argument('--quiet', action='store_true', help='静默模式')
+    args = parser.parse_args()
+
+    from config_manager import ConfigManager
+    invalid = [p for p in args.patterns if not ConfigManager.validate_pattern(p)]
+    if invalid:
+        parser.error(f'无效的模式: {invalid}')
+    try:
+        parse_xpub(args.xpub)
+    except ValueError as e:
+        parser.error(str(e))
+
+    began = time.time()
+    hits = scan(args.xpub, args.patterns, args.start, args.count, args.processes,
+                args.max_hits, args.quiet)
+    elapsed = time.time() - began
+    for hit in hits:
+        hit['path'] = f"{args.path}/{hit['index']}"
+    output = args.output or f"xpub_vanity_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'timestamp': datetime.now().isoformat(), 'xpub': args.xpub, 'patterns': args.patterns,
+                   'start': args.start, 'count': args.count, 'hits': hits}, f, indent=2, ensure_ascii=False)
+    print(f"用时 {elapsed:.1f}s，命中 {len(hits)} 个，结果已保存到: {output}")
+    if not args.quiet:
+        for hit in hits:
+            print(f"  {hit['path']}  {hit['address']}  {hit['pattern']}")
+
+
+if __name__ == "__main__":
+    main()